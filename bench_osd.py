@@ -0,0 +1,301 @@
+"""
+Benchmarks of the osd sizing hot paths.
+
+Run from the command line to time every benchmark at each scale, write the
+results to JSON and optionally compare them to a stored baseline::
+
+    python bench_osd.py --output bench.json
+    python bench_osd.py --scales 1,1000 --compare bench.json
+
+The command exits with status 1 when a benchmark is slower than the
+baseline by more than the threshold.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import warnings
+import numpy as np
+import nec_tables as nec
+import osd
+from calc_flow import base_wire_size
+
+SCALES = (1, 1000, 100000, 1000000)
+BENCH_VERSION = 1
+
+# Tables and orientations timed with osd.lookup, with the range of lookup
+# values inside each table. Tables keyed by conductor size are only looked
+# up by value.
+LOOKUP_TABLES = {
+    'ocpd_sizes': (lambda: nec.ocpd_sizes, True, (1, 6000)),
+    'ccc_count_derate': (lambda: nec.ccc_count_derate, True, (1, 41)),
+    'ccc_count_derate_values': (lambda: nec.ccc_count_derate, False,
+                                (0.35, 1.0)),
+    'amb_temp_derate': (lambda: nec.amb_temp_derate, True, (10, 85)),
+    'cable_ampacity_310_16_values': (
+        lambda: nec.cable_ampacity_310_16['Cu'][90], False, (25, 555)),
+    'cable_ampacity_310_17_values': (
+        lambda: nec.cable_ampacity_310_17['Al'][75], False, (20, 1150)),
+    'egc_sizes': (lambda: nec.egc_sizes, True, (15, 6000)),
+    'conduit_area': (lambda: nec.conduit_area['PVC40'], True, (0.5, 6)),
+    'conduit_area_values': (lambda: nec.conduit_area['PVC40'], False,
+                            (0.1, 12)),
+    'cond_circular_mils_values': (lambda: nec.cond_circular_mils, False,
+                                  (4110, 1000000)),
+}
+
+
+def _lookup_bench(table, keys, value_range):
+    def setup(n, rng):
+        values = rng.uniform(*value_range, n).tolist()
+        lookup_table = table()
+        return lambda: [osd.lookup(value, lookup_table, keys=keys)
+                        for value in values]
+    return setup
+
+
+def _circuits(n, rng):
+    """Random circuit inputs inside the NEC tables."""
+    return {'current': rng.uniform(5, 400, n).round(1),
+            'cond_material': rng.choice(['Cu', 'Al'], n),
+            'wire_insulation_temp': rng.choice([75, 90], n),
+            'ccc_count': rng.integers(1, 10, n),
+            'ambient_temp': rng.uniform(10, 50, n).round(1),
+            'voltage_type': rng.choice(['AC', 'DC'], n)}
+
+
+def _amb_scalar(n, rng):
+    c = _circuits(n, rng)
+    args = list(zip(c['ambient_temp'].tolist(),
+                    c['wire_insulation_temp'].tolist()))
+    return lambda: [osd.get_ambient_temp_derate(*arg) for arg in args]
+
+
+def _amb_array(n, rng):
+    c = _circuits(n, rng)
+    return lambda: osd.get_ambient_temp_derate_array(
+        c['ambient_temp'], c['wire_insulation_temp'])
+
+
+def _amb_table_array(n, rng):
+    c = _circuits(n, rng)
+    return lambda: osd.get_ambient_temp_derate_array(
+        c['ambient_temp'], c['wire_insulation_temp'], method='table')
+
+
+def _ocpd_scalar(n, rng):
+    c = _circuits(n, rng)
+    args = list(zip(c['current'].tolist(), c['voltage_type'].tolist()))
+    return lambda: [osd.get_ocpd(*arg) for arg in args]
+
+
+def _ocpd_array(n, rng):
+    c = _circuits(n, rng)
+    return lambda: osd.get_ocpd(c['current'], c['voltage_type'])
+
+
+def _cable_ocpd_scalar(n, rng):
+    ocpds = rng.choice(nec.ocpd_sizes[1:], n).tolist()
+    return lambda: [osd.get_cable_sizing_ocpd(ocpd) for ocpd in ocpds]
+
+
+def _cable_ocpd_array(n, rng):
+    ocpds = rng.choice(nec.ocpd_sizes[1:], n)
+    return lambda: osd.get_cable_sizing_ocpd(ocpds)
+
+
+def _base_size_scalar(n, rng):
+    c = _circuits(n, rng)
+    args = list(zip(c['current'].tolist(), c['cond_material'].tolist(),
+                    c['wire_insulation_temp'].tolist()))
+    kwargs = [{'ccc_count': ccc, 'ambient_temp': amb}
+              for ccc, amb in zip(c['ccc_count'].tolist(),
+                                  c['ambient_temp'].tolist())]
+
+    def run():
+        osd.get_base_wire_size.cache_clear()
+        return [osd.get_base_wire_size(*arg, **kwarg)
+                for arg, kwarg in zip(args, kwargs)]
+    return run
+
+
+def _base_size_fused(n, rng):
+    c = _circuits(n, rng)
+    return lambda: osd.size_conductors(
+        c['current'], c['cond_material'], c['wire_insulation_temp'],
+        ccc_count=c['ccc_count'], ambient_temp=c['ambient_temp'])
+
+
+def _base_size_graph(n, rng):
+    c = _circuits(n, rng)
+    inputs = {'current': c['current'], 'wire_material': c['cond_material'],
+              'wire_insulation_temp': c['wire_insulation_temp'],
+              'terminal_temp_rating': 75, 'ccc_count': c['ccc_count'],
+              'amb_temp': c['ambient_temp'], 'parallel_conductors': 1,
+              'ocpd_derate': 0.8}
+    return lambda: base_wire_size(**inputs)
+
+
+# Benchmark name to setup function. Setup functions take the scale and a
+# random generator and return the callable to time. Names ending in
+# '_scalar' or starting with 'lookup_' call the scalar functions in a loop.
+BENCHMARKS = {'lookup_' + name: _lookup_bench(*spec)
+              for name, spec in LOOKUP_TABLES.items()}
+BENCHMARKS.update({
+    'ambient_derate_scalar': _amb_scalar,
+    'ambient_derate_array': _amb_array,
+    'ambient_derate_table_array': _amb_table_array,
+    'ocpd_scalar': _ocpd_scalar,
+    'ocpd_array': _ocpd_array,
+    'cable_sizing_ocpd_scalar': _cable_ocpd_scalar,
+    'cable_sizing_ocpd_array': _cable_ocpd_array,
+    'base_wire_size_scalar': _base_size_scalar,
+    'base_wire_size_fused': _base_size_fused,
+    'base_wire_size_graph': _base_size_graph,
+})
+
+
+def environment():
+    """Describe the machine and versions the benchmarks ran on."""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'cpu_count': os.cpu_count(),
+            'commit': commit,
+            'timestamp': datetime.datetime.now(
+                datetime.timezone.utc).isoformat()}
+
+
+def run_benchmarks(scales=SCALES, names=None, repeat=3, seed=0):
+    """
+    Time the benchmarks at each scale.
+
+    Parameters
+    ----------
+    scales : sequence of int
+        Number of circuits or lookups per call.
+    names : sequence of str, optional
+        Benchmarks to run, all of `BENCHMARKS` by default.
+    repeat : int, default 3
+        Number of timed calls after one untimed call, the fastest is kept.
+    seed : int, default 0
+        Seed of the random inputs.
+
+    Returns
+    -------
+    results : dict
+        Environment metadata and, for each benchmark and scale, the best
+        time in seconds and the throughput in items per second.
+
+    """
+    if names is None:
+        names = list(BENCHMARKS)
+    benchmarks = {}
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for name in names:
+            setup = BENCHMARKS[name]
+            benchmarks[name] = {}
+            for n in scales:
+                run = setup(n, np.random.default_rng(seed))
+                # Untimed call so index building is not counted.
+                run()
+                times = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    run()
+                    times.append(time.perf_counter() - start)
+                best = min(times)
+                benchmarks[name][str(n)] = {
+                    'seconds': best,
+                    'per_second': n / best if best else None}
+    return {'version': BENCH_VERSION, 'environment': environment(),
+            'repeat': repeat, 'benchmarks': benchmarks}
+
+
+def compare(results, baseline, threshold=1.25):
+    """
+    Find benchmarks slower than a baseline.
+
+    Parameters
+    ----------
+    results, baseline : dict
+        Results from `run_benchmarks`.
+    threshold : float, default 1.25
+        Ratio of current to baseline time above which a benchmark has
+        regressed.
+
+    Returns
+    -------
+    rows : list of dict
+        Benchmark name, scale, baseline and current seconds, their ratio and
+        whether it regressed, for every benchmark and scale in both.
+
+    """
+    rows = []
+    for name, scales in results['benchmarks'].items():
+        for scale, timing in scales.items():
+            base = baseline['benchmarks'].get(name, {}).get(scale)
+            if base is None:
+                continue
+            ratio = timing['seconds'] / base['seconds']
+            rows.append({'name': name, 'scale': int(scale),
+                         'baseline': base['seconds'],
+                         'current': timing['seconds'], 'ratio': ratio,
+                         'regressed': ratio > threshold})
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scales', default=','.join(map(str, SCALES)),
+                        help='comma separated scales')
+    parser.add_argument('--names', help='comma separated benchmark names')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--compare', help='baseline JSON file to compare to')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='slowdown ratio reported as a regression')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        scales=[int(scale) for scale in args.scales.split(',')],
+        names=args.names.split(',') if args.names else None,
+        repeat=args.repeat)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=1)
+
+    for name, scales in results['benchmarks'].items():
+        for scale, timing in scales.items():
+            print('{:<40} {:>8} {:>12.6f} s'.format(
+                name, scale, timing['seconds']))
+    if not args.compare:
+        return 0
+
+    with open(args.compare) as f:
+        baseline = json.load(f)
+    rows = compare(results, baseline, threshold=args.threshold)
+    regressions = [row for row in rows if row['regressed']]
+    for row in regressions:
+        print('REGRESSION {name} at {scale}: {baseline:.6f} s -> '
+              '{current:.6f} s ({ratio:.2f}x)'.format(**row))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
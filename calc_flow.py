@@ -0,0 +1,272 @@
+import operator
+import time
+import numpy as np
+import osd
+
+
+class Operation(object):
+    """
+    One node of a calculation graph.
+
+    Parameters
+    ----------
+    name : str
+        Name of the operation, used for timings and error messages.
+    needs : sequence of str
+        Names of the values passed to `fn`, in order.
+    provides : sequence of str
+        Names of the values returned by `fn`. When more than one name is
+        given `fn` must return a tuple of the same length.
+    fn : callable
+        Function run by the operation.
+
+    """
+
+    __slots__ = ('name', 'needs', 'provides', 'fn')
+
+    def __init__(self, name, needs, provides, fn):
+        self.name = name
+        self.needs = tuple(needs)
+        self.provides = tuple(provides)
+        self.fn = fn
+
+    def __repr__(self):
+        return 'Operation({!r}, needs={}, provides={})'.format(
+            self.name, list(self.needs), list(self.provides))
+
+
+def operation(name, needs, provides):
+    """
+    Decorator to create an `Operation` from a function.
+
+    Usage matches graphtik, e.g.
+    ``operation(name='amb_derate', needs=['amb_temp', 'insulation_temp'],
+    provides=['amb_derate'])(get_ambient_temp_derate)``.
+
+    """
+    def decorator(fn):
+        return Operation(name, needs, provides, fn)
+    return decorator
+
+
+class ExecutionPlan(object):
+    """
+    Flat, topologically ordered list of operations to run.
+
+    Created by `CalcGraph.compile`. Running the plan calls each operation
+    once, so operations given column arrays size every circuit in one pass.
+
+    Attributes
+    ----------
+    steps : tuple of Operation
+        Operations in execution order.
+    inputs : frozenset of str
+        Names of the input values the plan was compiled for.
+    outputs : tuple of str
+        Names of the values returned by `run`.
+    timings : dict
+        Operation name to a list of call count and cumulative seconds,
+        recorded when the plan is run with ``timed=True``.
+
+    """
+
+    def __init__(self, steps, inputs, outputs):
+        self.steps = tuple(steps)
+        self.inputs = frozenset(inputs)
+        self.outputs = tuple(outputs)
+        self.timings = {}
+
+    def run(self, inputs, timed=False):
+        """
+        Run the plan.
+
+        Parameters
+        ----------
+        inputs : dict
+            Input values, usually column arrays, by name.
+        timed : bool, default False
+            If true, add the time taken by each operation to `timings`.
+
+        Returns
+        -------
+        values : dict
+            The plan outputs by name.
+
+        """
+        missing = self.inputs - set(inputs)
+        if missing:
+            raise KeyError('Missing inputs: '
+                           '{}'.format(', '.join(sorted(missing))))
+        values = dict(inputs)
+        for step in self.steps:
+            args = [values[name] for name in step.needs]
+            if timed:
+                start = time.perf_counter()
+                result = step.fn(*args)
+                timing = self.timings.setdefault(step.name, [0, 0.0])
+                timing[0] += 1
+                timing[1] += time.perf_counter() - start
+            else:
+                result = step.fn(*args)
+            if len(step.provides) == 1:
+                values[step.provides[0]] = result
+            else:
+                values.update(zip(step.provides, result))
+        return {name: values[name] for name in self.outputs}
+
+    def reset_timings(self):
+        """Clear the recorded operation timings."""
+        self.timings.clear()
+
+
+class CalcGraph(object):
+    """
+    Calculation graph composed of operations.
+
+    The graph is compiled once for a set of input names and outputs into an
+    `ExecutionPlan`. Plans are cached, so calling the graph repeatedly with
+    the same input names does no planning.
+
+    Parameters
+    ----------
+    name : str
+        Name of the graph.
+    *operations : Operation
+        Operations of the graph. Each value may only be provided by one
+        operation.
+
+    """
+
+    def __init__(self, name, *operations):
+        self.name = name
+        self.operations = tuple(operations)
+        self._providers = {}
+        for op in self.operations:
+            for value in op.provides:
+                if value in self._providers:
+                    raise ValueError('{} is provided by more than one '
+                                     'operation.'.format(value))
+                self._providers[value] = op
+        self._plans = {}
+
+    def compile(self, inputs, outputs=None):
+        """
+        Compile the graph into an execution plan.
+
+        Only the operations needed for `outputs` are included. Values passed
+        as inputs are not recalculated.
+
+        Parameters
+        ----------
+        inputs : iterable of str
+            Names of the input values.
+        outputs : iterable of str, optional
+            Names of the values to return. Defaults to every value provided
+            by the graph that can be calculated from `inputs`.
+
+        Returns
+        -------
+        plan : ExecutionPlan
+
+        """
+        inputs = frozenset(inputs)
+        key = (inputs, None if outputs is None else tuple(outputs))
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = self._compile(inputs, outputs)
+            self._plans[key] = plan
+        return plan
+
+    def _compile(self, inputs, outputs):
+        if outputs is None:
+            outputs = [value for value in self._providers
+                       if value not in inputs and
+                       self._can_provide(value, inputs, set())]
+        outputs = tuple(outputs)
+
+        # Depth first walk from the outputs gives a topological order.
+        steps = []
+        placed = set()
+        visiting = set()
+
+        def visit(value):
+            if value in inputs:
+                return
+            op = self._providers.get(value)
+            if op is None:
+                raise KeyError('{} is not an input and no operation provides '
+                               'it.'.format(value))
+            if op.name in placed:
+                return
+            if op.name in visiting:
+                raise ValueError('Cycle in calculation graph at '
+                                 '{}.'.format(op.name))
+            visiting.add(op.name)
+            for need in op.needs:
+                visit(need)
+            visiting.discard(op.name)
+            placed.add(op.name)
+            steps.append(op)
+
+        for value in outputs:
+            visit(value)
+        return ExecutionPlan(steps, inputs, outputs)
+
+    def _can_provide(self, value, inputs, seen):
+        if value in inputs:
+            return True
+        op = self._providers.get(value)
+        if op is None or op.name in seen:
+            return False
+        seen = seen | {op.name}
+        return all(self._can_provide(need, inputs, seen) for need in op.needs)
+
+    def __call__(self, timed=False, **inputs):
+        """Compile for the input names, if needed, and run the graph."""
+        return self.compile(inputs).run(inputs, timed=timed)
+
+
+def amb_temp_derate(amb_temp, wire_insulation_temp):
+    """Ambient derate array, NaN where the ambient exceeds the rating."""
+    derate, _ = osd.get_ambient_temp_derate_array(amb_temp,
+                                                  wire_insulation_temp)
+    return derate
+
+
+def compare_wire_sizes(size_a, size_b):
+    """Larger of two arrays of size ordinals, -1 if either is -1."""
+    return np.where((size_a < 0) | (size_b < 0), -1,
+                    np.maximum(size_a, size_b))
+
+
+# Base wire size graph from graphtik_calc_flow.ipynb, using the array
+# functions from osd so each operation sizes every circuit at once.
+base_wire_size = CalcGraph(
+    'base_wire_size',
+    operation(name='ccc_derate', needs=['ccc_count'],
+              provides=['ccc_derate', 'ccc_invalid'])(osd.get_ccc_derate),
+    operation(name='amb_temp_derate',
+              needs=['amb_temp', 'wire_insulation_temp'],
+              provides=['amb_derate'])(amb_temp_derate),
+    operation(name='cond_of_use_derates', needs=['ccc_derate', 'amb_derate'],
+              provides=['total_derate'])(operator.mul),
+    operation(name='current_per_conductor',
+              needs=['current', 'parallel_conductors'],
+              provides=['parallel_current'])(operator.truediv),
+    operation(name='current_terminal_check',
+              needs=['parallel_current', 'ocpd_derate'],
+              provides=['terminal_check_current'])(operator.truediv),
+    operation(name='cond_use_current',
+              needs=['parallel_current', 'total_derate'],
+              provides=['cond_use_check_current'])(operator.truediv),
+    operation(name='wire_size_terminal',
+              needs=['terminal_check_current', 'wire_material',
+                     'terminal_temp_rating'],
+              provides=['terminal_min_wire'])(osd.get_ampacity_size),
+    operation(name='wire_size_cond_use',
+              needs=['cond_use_check_current', 'wire_material',
+                     'wire_insulation_temp'],
+              provides=['cond_use_min_wire'])(osd.get_ampacity_size),
+    operation(name='compare_wire_sizes',
+              needs=['terminal_min_wire', 'cond_use_min_wire'],
+              provides=['min_wire_size'])(compare_wire_sizes))
@@ -0,0 +1,445 @@
+import numpy as np
+import diagnostics
+import editions
+import osd
+
+# Input columns of a CircuitSet with their dtype and default value.
+# Temperatures are in degrees Celsius, lengths in feet and heights above the
+# roof in inches, -1 for circuits that are not on a roof.
+FIELDS = {'name': (object, None),
+          'start': (object, None),
+          'end': (object, None),
+          'voltage_type': (object, 'AC'),
+          'voltage': (float, np.nan),
+          'current': (float, np.nan),
+          'length': (float, np.nan),
+          'parallel_sets': (np.intp, 1),
+          'ccc_count': (np.intp, 3),
+          'height_above_roof': (float, 3.5),
+          'temp_high_amb': (float, np.nan),
+          'cond_material': (object, 'Cu'),
+          'cond_insulation': (object, 'THWN-2'),
+          'insulation_temp': (float, 90),
+          'terminal_temp_rating': (float, 75),
+          'egc_material': (object, 'Cu'),
+          'neutral': (np.intp, 1),
+          'conduit_size_SF': (float, 1.3),
+          'conduit_type': (object, 'EMT'),
+          'ocpd_derate': (float, 0.8),
+          'power_factor': (float, 0.9),
+          'phase_count': (np.intp, 3),
+          'max_v_drop_percent': (float, 2.0),
+          'edition': (object, editions.DEFAULT_EDITION)}
+
+# Result columns of a CircuitSet with their dtype. Conductor sizes are size
+# ordinals and -1 where no size was found.
+RESULTS = {'ocpd': float,
+           'design_temp': float,
+           'amb_temp_derate': float,
+           'ccc_derate': float,
+           'cond_size_base': np.intp,
+           'base_ampacity': float,
+           'sizing_check': np.intp,
+           'cond_size': np.intp,
+           'v_drop_volts': float,
+           'v_drop_percent': float,
+           'v_drop_in_range': bool,
+           'egc_size_base': np.intp,
+           'conduit_size': float}
+
+# Sizing steps of a CircuitSet in calculation order, with the input columns
+# each step reads and the steps whose results it reads.
+STEPS = {'calc_ocpd': (('current', 'voltage_type', 'ocpd_derate',
+                        'edition'), ()),
+         'calc_derates': (('temp_high_amb', 'height_above_roof', 'edition',
+                           'insulation_temp', 'ccc_count'), ()),
+         'calc_base_size': (('current', 'voltage_type', 'parallel_sets',
+                             'ocpd_derate', 'cond_material',
+                             'terminal_temp_rating', 'insulation_temp',
+                             'edition'),
+                            ('calc_derates',)),
+         'calc_v_drop': (('current', 'voltage_type', 'length', 'voltage',
+                          'max_v_drop_percent', 'cond_material',
+                          'conduit_type', 'parallel_sets', 'power_factor',
+                          'phase_count', 'edition'),
+                         ('calc_base_size',)),
+         'calc_egc': (('egc_material', 'edition'),
+                      ('calc_ocpd', 'calc_v_drop')),
+         'calc_conduit': (('ccc_count', 'neutral', 'conduit_type',
+                           'conduit_size_SF', 'cond_insulation', 'edition'),
+                          ('calc_egc',))}
+
+
+def _input_steps():
+    """Map each input column to the steps that read it."""
+    input_steps = {}
+    for step, (inputs, _) in STEPS.items():
+        for name in inputs:
+            input_steps.setdefault(name, []).append(step)
+    return input_steps
+
+
+def _downstream_steps():
+    """Map each step to the steps downstream of it, in calculation order."""
+    downstream_steps = {}
+    for step in reversed(list(STEPS)):
+        downstream = set()
+        for other, (_, upstream) in STEPS.items():
+            if step in upstream:
+                downstream.add(other)
+                downstream.update(downstream_steps[other])
+        downstream_steps[step] = tuple(other for other in STEPS
+                                       if other in downstream)
+    return downstream_steps
+
+
+# Steps to recalculate when an input column changes and the steps that
+# follow each step.
+INPUT_STEPS = _input_steps()
+DOWNSTREAM_STEPS = _downstream_steps()
+
+
+class CircuitView(object):
+    """
+    Lightweight view of one row of a `CircuitSet`.
+
+    Attributes read and write the columns of the circuit set at the row of
+    the view. Views hold no circuit data of their own.
+
+    """
+
+    __slots__ = ('_circuits', '_index')
+
+    def __init__(self, circuits, index):
+        object.__setattr__(self, '_circuits', circuits)
+        object.__setattr__(self, '_index', index)
+
+    def __getattr__(self, name):
+        # Slots are unset while copying or unpickling.
+        if name in CircuitView.__slots__:
+            raise AttributeError(name)
+        try:
+            return self._circuits[name][self._index]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name, value):
+        if name not in FIELDS:
+            raise AttributeError('{} is not a circuit input.'.format(name))
+        self._circuits.set(name, value, rows=self._index)
+
+    def __reduce__(self):
+        return CircuitView, (self._circuits, self._index)
+
+    def __repr__(self):
+        return 'CircuitView({!r}, {})'.format(self.name, self._index)
+
+
+class CircuitSet(object):
+    """
+    Circuits stored as columns of NumPy arrays.
+
+    Replaces a Python object per circuit with one array per attribute
+    (structure of arrays). Every sizing step runs on whole columns using the
+    array functions in `osd`. Indexing with an integer returns a
+    `CircuitView` of that row and indexing with a column name returns the
+    column array.
+
+    Parameters
+    ----------
+    n : int, optional
+        Number of circuits. Inferred from the column lengths by default.
+    **columns
+        Input columns from `FIELDS`, as arrays or scalars that are repeated
+        for every circuit. Columns not passed are filled with their default.
+
+    Attributes
+    ----------
+    columns : dict
+        Input column arrays.
+    results : dict
+        Result column arrays from the sizing steps. Conductor sizes are size
+        ordinals, see `conductors.to_sizes`.
+
+    Notes
+    -----
+    Changing inputs with `set`, or through a row view, marks only the
+    sizing steps that depend on the changed columns dirty, along with the
+    steps downstream of them, for the changed rows. `update` recalculates
+    just those steps and rows. Reading a result column by name updates
+    first, so results are never stale. For example changing `length`
+    recalculates voltage drop, EGC and conduit sizing, but not the OCPD,
+    derates or base size.
+
+    """
+
+    def __init__(self, n=None, **columns):
+        unknown = set(columns) - set(FIELDS)
+        if unknown:
+            raise KeyError('Unknown circuit inputs: '
+                           '{}'.format(', '.join(sorted(unknown))))
+        if n is None:
+            lengths = [np.size(val) for val in columns.values()
+                       if np.ndim(val) > 0]
+            n = max(lengths, default=1)
+
+        self.columns = {}
+        for name, (dtype, default) in FIELDS.items():
+            values = columns.get(name, default)
+            column = np.empty(n, dtype=dtype)
+            column[:] = values
+            self.columns[name] = column
+        self.results = {}
+        self._dirty = dict.fromkeys(STEPS, True)
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Build a circuit set from a sequence of dictionaries, one per circuit.
+        """
+        records = list(records)
+        names = {name for record in records for name in record}
+        columns = {name: [record.get(name, FIELDS[name][1])
+                          for record in records] for name in names}
+        return cls(n=len(records), **columns)
+
+    def __len__(self):
+        return len(self.columns['current'])
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key in self.columns:
+                return self.columns[key]
+            if self._dirty:
+                self.update()
+            return self.results[key]
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError('Circuit index out of range.')
+        return CircuitView(self, key)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield CircuitView(self, i)
+
+    def set(self, name, values, rows=None):
+        """
+        Set an input column, or part of it.
+
+        The sizing steps that depend on the column, and the steps downstream
+        of them, are marked dirty for the changed rows and are recalculated
+        by the next `update`.
+
+        Parameters
+        ----------
+        name : str
+            Input column name from `FIELDS`.
+        values : scalar or array_like
+            New values.
+        rows : int, slice or array_like, optional
+            Rows to set, all rows by default.
+
+        """
+        if name not in FIELDS:
+            raise KeyError('{} is not a circuit input.'.format(name))
+        if rows is None:
+            self.columns[name][:] = values
+            mask = None
+        else:
+            self.columns[name][rows] = values
+            mask = np.zeros(len(self), dtype=bool)
+            mask[rows] = True
+        for step in INPUT_STEPS.get(name, ()):
+            self._mark_dirty(step, mask)
+
+    def _mark_dirty(self, step, mask):
+        """Mark a step and its downstream steps dirty for the masked rows."""
+        for dirty_step in (step,) + DOWNSTREAM_STEPS[step]:
+            current = self._dirty.get(dirty_step, False)
+            if current is True or mask is None:
+                self._dirty[dirty_step] = True
+            elif current is False:
+                self._dirty[dirty_step] = mask.copy()
+            else:
+                current |= mask
+
+    @property
+    def dirty(self):
+        """Names of the sizing steps waiting to be recalculated."""
+        return [step for step in STEPS if step in self._dirty]
+
+    def update(self):
+        """
+        Recalculate the dirty sizing steps for their dirty rows only.
+
+        Invalid inputs reported while collecting diagnostics are recorded
+        with the circuit names as ids, see `diagnostics.collect`.
+
+        Returns
+        -------
+        steps : list of tuple
+            Step name and number of rows recalculated, in the order run.
+
+        """
+        steps = []
+        for step in STEPS:
+            mask = self._dirty.pop(step, None)
+            if mask is None:
+                continue
+            if mask is True:
+                rows = slice(None)
+                count = len(self)
+            else:
+                rows = np.flatnonzero(mask)
+                count = rows.size
+                if not count:
+                    continue
+            with diagnostics.circuits(self.columns['name'][rows]):
+                getattr(self, step)(rows)
+            steps.append((step, count))
+        return steps
+
+    def _columns_at(self, rows):
+        return {name: column[rows] for name, column in self.columns.items()}
+
+    def _results_at(self, rows):
+        return {name: column[rows] for name, column in self.results.items()}
+
+    def _store(self, name, rows, values):
+        """Write result values for the rows, creating the column if needed."""
+        if name not in self.results:
+            values = np.asarray(values)
+            self.results[name] = np.zeros(len(self), dtype=values.dtype)
+        self.results[name][rows] = values
+
+    def design_current(self, rows=slice(None)):
+        """Circuit current including the 1.25 factor for DC circuits."""
+        is_dc = self.columns['voltage_type'][rows] == 'DC'
+        return np.where(is_dc, 1.25, 1.0) * self.columns['current'][rows]
+
+    def calc_ocpd(self, rows=slice(None)):
+        """Size the OCPD for every circuit, see `osd.get_ocpd`."""
+        c = self._columns_at(rows)
+        self._store('ocpd', rows, osd.get_ocpd(c['current'],
+                                               c['voltage_type'],
+                                               c['ocpd_derate'],
+                                               edition=c['edition']))
+
+    def calc_derates(self, rows=slice(None)):
+        """
+        Calculate ambient temperature and conductor count derates.
+
+        The ambient temperature includes the rooftop adder for the height
+        above the roof, see `osd.get_rooftop_temp`. Rows with no derate are
+        recorded when collecting diagnostics.
+        """
+        c = self._columns_at(rows)
+        design_temp = osd.get_rooftop_temp(
+            c['temp_high_amb'], c['height_above_roof'], edition=c['edition'])
+        amb_temp_derate, amb_invalid = osd.get_ambient_temp_derate_array(
+            design_temp, c['insulation_temp'], edition=c['edition'])
+        diagnostics.record('ambient_correction', design_temp, amb_invalid,
+                           edition=c['edition'])
+        self._store('design_temp', rows, design_temp)
+        self._store('amb_temp_derate', rows, amb_temp_derate)
+        ccc_derate, ccc_invalid = osd.get_ccc_derate(c['ccc_count'],
+                                                     edition=c['edition'])
+        diagnostics.record('ccc_adjustment', c['ccc_count'], ccc_invalid,
+                           edition=c['edition'])
+        self._store('ccc_derate', rows, ccc_derate)
+
+    def calc_base_size(self, rows=slice(None)):
+        """
+        Size conductors for ampacity, see `osd.size_conductors`.
+
+        Requires `calc_derates`. Rows with valid derates but no conductor
+        size are recorded when collecting diagnostics.
+        """
+        c = self._columns_at(rows)
+        r = self._results_at(rows)
+        design_current = self.design_current(rows)
+        cond_size, ampacity, sizing_check = osd.size_conductors(
+            design_current, c['cond_material'],
+            c['insulation_temp'], c['terminal_temp_rating'], c['ccc_count'],
+            r['design_temp'], c['parallel_sets'], c['ocpd_derate'],
+            edition=c['edition'])
+        # Rows with no derate are already recorded by calc_derates.
+        no_size = ((cond_size < 0) & ~np.isnan(r['amb_temp_derate']) &
+                   ~np.isnan(r['ccc_derate']))
+        diagnostics.record('table_range', design_current, no_size,
+                           edition=c['edition'])
+        self._store('cond_size_base', rows, cond_size)
+        self._store('base_ampacity', rows, ampacity)
+        self._store('sizing_check', rows, sizing_check)
+
+    def calc_v_drop(self, rows=slice(None)):
+        """
+        Upsize conductors for voltage drop and calculate the drop.
+
+        Requires `calc_base_size`. See `osd.get_voltage_drop_size`.
+        """
+        c = self._columns_at(rows)
+        r = self._results_at(rows)
+        design_current = self.design_current(rows)
+        circuit = {'voltage_type': c['voltage_type'],
+                   'cond_material': c['cond_material'],
+                   'conduit_type': c['conduit_type'],
+                   'parallel_sets': c['parallel_sets'],
+                   'power_factor': c['power_factor'],
+                   'phase_count': c['phase_count'],
+                   'edition': c['edition']}
+        cond_size, _, _ = osd.get_voltage_drop_size(
+            design_current, c['length'], c['voltage'],
+            max_v_drop_percent=c['max_v_drop_percent'],
+            base_size=r['cond_size_base'], **circuit)
+        # Keep the ampacity size where the drop limit cannot be met.
+        cond_size = np.where(cond_size < 0, r['cond_size_base'], cond_size)
+        v_drop_volts, v_drop_percent = osd.get_voltage_drop(
+            design_current, c['length'], cond_size, c['voltage'], **circuit)
+        self._store('cond_size', rows, cond_size)
+        self._store('v_drop_volts', rows, v_drop_volts)
+        self._store('v_drop_percent', rows, v_drop_percent)
+        self._store('v_drop_in_range', rows,
+                    v_drop_percent <= c['max_v_drop_percent'])
+
+    def calc_egc(self, rows=slice(None)):
+        """
+        Size the EGC, see `osd.get_egc_size`.
+
+        Requires `calc_ocpd` and `calc_v_drop`.
+        """
+        r = self._results_at(rows)
+        self._store('egc_size_base', rows, osd.get_egc_size(
+            r['ocpd'], self.columns['egc_material'][rows],
+            cond_size=r['cond_size'], base_cond_size=r['cond_size_base'],
+            edition=self.columns['edition'][rows]))
+
+    def calc_conduit(self, rows=slice(None)):
+        """
+        Size the conduit for one parallel set, see `osd.get_conduit_size`.
+
+        Requires `calc_egc`. Rows with an insulation type that has no
+        conductor areas have NaN conduit sizes.
+        """
+        c = self._columns_at(rows)
+        r = self._results_at(rows)
+        conduit_size = np.full(len(c['cond_insulation']), np.nan)
+        for insulation in np.unique(c['cond_insulation']):
+            group = c['cond_insulation'] == insulation
+            with diagnostics.circuits(c['name'][group]):
+                conduit_size[group] = osd.get_conduit_size(
+                    c['ccc_count'][group], r['cond_size'][group],
+                    egc_size=r['egc_size_base'][group],
+                    neutral=c['neutral'][group],
+                    conduit_type=c['conduit_type'][group],
+                    conduit_size_SF=c['conduit_size_SF'][group],
+                    cond_insulation=insulation, edition=c['edition'][group])
+        self._store('conduit_size', rows, conduit_size)
+
+    def size(self):
+        """Run every sizing step for every circuit and return the results."""
+        for step in STEPS:
+            self._mark_dirty(step, None)
+        self.update()
+        return self.results
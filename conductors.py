@@ -0,0 +1,149 @@
+import numpy as np
+import nec_tables as nec
+
+# Ordinal of the smallest kcmil size, sizes below this are AWG.
+KCMIL_ORDINAL = nec.cond_sizes.index('250')
+
+# Circular mil area indexed by size ordinal.
+CIRCULAR_MILS = np.array([nec.cond_circular_mils[size]
+                          for size in nec.cond_sizes], dtype=float)
+CIRCULAR_MILS.flags.writeable = False
+
+_ordinals = {size: i for i, size in enumerate(nec.cond_sizes)}
+
+
+class CondSize(int):
+    """
+    Conductor size stored as its ordinal in `nec_tables.cond_sizes`.
+
+    Sizes compare and hash as their ordinal, so larger conductors compare
+    greater, and can be used directly as an index into packed tables. There
+    is one instance per size, created when this module is imported.
+
+    Adding or subtracting an integer steps through the standard sizes, e.g.
+    ``CondSize('4/0') + 1`` is 250 kcmil. Subtracting two sizes gives the
+    number of standard sizes between them.
+
+    Parameters
+    ----------
+    size : str or int
+        Size string as used for the keys of the NEC tables, e.g. '12', '1/0'
+        or '250', or a size ordinal.
+
+    """
+
+    __slots__ = ()
+    _members = ()
+
+    def __new__(cls, size):
+        if isinstance(size, CondSize):
+            return size
+        if isinstance(size, str):
+            try:
+                return cls._members[_ordinals[size]]
+            except KeyError:
+                raise ValueError('{} is not a standard conductor '
+                                 'size.'.format(size)) from None
+        ordinal = int(size)
+        if ordinal != size or not 0 <= ordinal < len(cls._members):
+            raise ValueError('{} is not a conductor size '
+                             'ordinal.'.format(size))
+        return cls._members[ordinal]
+
+    def __str__(self):
+        return nec.cond_sizes[self]
+
+    def __repr__(self):
+        return 'CondSize({!r})'.format(nec.cond_sizes[self])
+
+    def __add__(self, other):
+        if isinstance(other, int) and not isinstance(other, CondSize):
+            return CondSize(int(self) + other)
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if isinstance(other, CondSize):
+            return int(self) - int(other)
+        if isinstance(other, int):
+            return CondSize(int(self) - other)
+        return NotImplemented
+
+    def next_up(self):
+        """Return the next larger standard size, None if the largest."""
+        if self == len(self._members) - 1:
+            return None
+        return self._members[int(self) + 1]
+
+    def next_down(self):
+        """Return the next smaller standard size, None if the smallest."""
+        if self == 0:
+            return None
+        return self._members[int(self) - 1]
+
+    @property
+    def circular_mils(self):
+        """Conductor area in circular mils, NEC Chapter 9 Table 8."""
+        return nec.cond_circular_mils[nec.cond_sizes[self]]
+
+    @property
+    def is_kcmil(self):
+        """True for sizes specified in kcmil, 250 and larger."""
+        return self >= KCMIL_ORDINAL
+
+    @property
+    def is_awg(self):
+        """True for sizes specified in AWG, 4/0 and smaller."""
+        return self < KCMIL_ORDINAL
+
+    @property
+    def unit(self):
+        """Either 'AWG' or 'kcmil'."""
+        return 'kcmil' if self >= KCMIL_ORDINAL else 'AWG'
+
+
+CondSize._members = tuple(int.__new__(CondSize, i)
+                          for i in range(len(nec.cond_sizes)))
+
+
+def to_ordinals(sizes):
+    """
+    Convert conductor size strings to size ordinals.
+
+    Parameters
+    ----------
+    sizes : array_like of str
+        Size strings as used for the keys of the NEC tables.
+
+    Returns
+    -------
+    ordinals : numpy.ndarray
+        Integer size ordinals, -1 where a size is not a standard size.
+
+    """
+    sizes = np.asarray(sizes, dtype=object)
+    unique, inverse = np.unique(sizes, return_inverse=True)
+    lut = np.array([_ordinals.get(size, -1) for size in unique],
+                   dtype=np.intp)
+    return lut[inverse].reshape(sizes.shape)
+
+
+def to_sizes(ordinals):
+    """
+    Convert size ordinals to conductor size strings.
+
+    Parameters
+    ----------
+    ordinals : array_like of int
+        Size ordinals. Negative ordinals are returned as None.
+
+    Returns
+    -------
+    sizes : numpy.ndarray
+        Object array of size strings.
+
+    """
+    ordinals = np.asarray(ordinals, dtype=np.intp)
+    labels = np.array(nec.cond_sizes + [None], dtype=object)
+    return labels[np.where(ordinals < 0, len(nec.cond_sizes), ordinals)]
@@ -0,0 +1,242 @@
+import collections
+import contextlib
+import numpy as np
+import editions
+
+# Rule name to the key of its section in `Edition.references`, None for
+# rules with no single section, and a description of the problem.
+RULES = {'table_range': (None, 'Lookup value is outside of the table.'),
+         'ambient_correction': ('ambient_correction',
+                                'Ambient temperature equals or exceeds the '
+                                'cable rating or has no correction factor.'),
+         'ccc_adjustment': ('ccc_adjustment',
+                            'Current-carrying conductor count has no '
+                            'adjustment factor.'),
+         'conductor_area': ('cond_area',
+                            'Conductor insulation has no conductor area for '
+                            'conduit fill.'),
+         'standard_ocpd': ('standard_ocpd',
+                           'OCPD size is above or below the standard OCPD '
+                           'sizes.')}
+
+Diagnostic = collections.namedtuple('Diagnostic',
+                                    ['circuit', 'rule', 'value', 'reference'])
+
+# Collectors of the enclosing `collect` blocks, innermost last.
+_collectors = []
+
+
+class Collector(object):
+    """
+    Buffer of invalid inputs reported by osd while collecting.
+
+    Created by `collect`. Each call that reports a problem adds one chunk
+    holding the rule and arrays of the circuit ids and input values of the
+    rows affected, so array calls are recorded without a Python object per
+    row.
+
+    Parameters
+    ----------
+    edition : str, optional
+        NEC edition of the section references, see `editions.get_edition`.
+
+    Attributes
+    ----------
+    edition : Edition
+        Default edition of the section references.
+    circuit_ids : array_like or object
+        Ids of the circuits passed to the osd functions, see `circuits`.
+
+    """
+
+    def __init__(self, edition=None):
+        self.edition = editions.get_edition(edition)
+        self.circuit_ids = None
+        self._chunks = []
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def record(self, rule, value, invalid=None, edition=None):
+        """
+        Add the rows of `value` where `invalid` is True.
+
+        Row positions are mapped to `circuit_ids` when it is an array of the
+        same length, otherwise the row position is used as the circuit id. A
+        scalar `value` is one record for the current `circuit_ids`.
+
+        Parameters
+        ----------
+        rule : str
+            Key of `RULES`.
+        value : numeric or array_like
+            Input values checked by the rule.
+        invalid : array_like of bool, optional
+            Rows that failed the rule, every row by default.
+        edition : str or array_like of str, optional
+            Edition of each row, defaults to the collector edition.
+
+        """
+        if rule not in RULES:
+            raise KeyError('{} is not a diagnostics rule.'.format(rule))
+        ids = self.circuit_ids
+        if not np.ndim(value) and not np.ndim(invalid):
+            ids = np.array([None if np.ndim(ids) else ids], dtype=object)
+            values = np.array([value], dtype=object)
+            if np.ndim(edition):
+                edition = None
+        else:
+            if invalid is None:
+                invalid = np.ones(np.shape(value), dtype=bool)
+            value, invalid = np.broadcast_arrays(value, invalid)
+            rows = np.flatnonzero(invalid)
+            values = value.ravel()[rows]
+            if np.ndim(ids) and len(ids) == invalid.size:
+                ids = np.asarray(ids, dtype=object)[rows]
+            else:
+                ids = rows.astype(object)
+            if np.ndim(edition):
+                edition = np.broadcast_to(edition, invalid.shape).ravel()[rows]
+        if values.size:
+            self._chunks.append((rule, ids, values, edition))
+            self._count += values.size
+
+    def _references(self, rule, edition, size):
+        key = RULES[rule][0]
+        if key is None:
+            return [None] * size
+        if edition is None or not np.ndim(edition):
+            reference = editions.get_edition(
+                self.edition if edition is None else edition).references[key]
+            return [reference] * size
+        return [editions.get_edition(name).references[key]
+                for name in np.asarray(edition, dtype=str)]
+
+    def records(self):
+        """
+        Return every record in the order reported.
+
+        Returns
+        -------
+        records : list of Diagnostic
+            Circuit id, rule, input value and NEC reference of each record.
+
+        """
+        records = []
+        for rule, ids, values, edition in self._chunks:
+            references = self._references(rule, edition, values.size)
+            records.extend(Diagnostic(*record) for record in zip(
+                ids.tolist(), [rule] * values.size, values.tolist(),
+                references))
+        return records
+
+    def summary(self):
+        """
+        Return the records aggregated by rule.
+
+        Returns
+        -------
+        summary : dict
+            For each rule reported, the record count, the rule description,
+            the NEC references and the ids of the circuits affected.
+
+        """
+        summary = {}
+        for rule, ids, values, edition in self._chunks:
+            entry = summary.get(rule)
+            if entry is None:
+                entry = summary[rule] = {'count': 0,
+                                         'description': RULES[rule][1],
+                                         'references': set(),
+                                         'circuits': []}
+            entry['count'] += values.size
+            entry['references'].update(
+                self._references(rule, edition, values.size))
+            entry['circuits'].extend(ids.tolist())
+        for entry in summary.values():
+            entry['references'] = sorted(entry['references'] - {None})
+        return summary
+
+    def clear(self):
+        """Discard the records."""
+        self._chunks = []
+        self._count = 0
+
+
+def active_collector():
+    """Return the collector of the innermost `collect` block, or None."""
+    return _collectors[-1] if _collectors else None
+
+
+@contextlib.contextmanager
+def collect(edition=None):
+    """
+    Record invalid osd inputs instead of warning about them.
+
+    Inside the with block `osd.lookup`, `osd.get_ambient_temp_derate`,
+    `osd.get_ocpd` and `osd.get_cable_sizing_ocpd` add records to the
+    returned collector instead of raising warnings, and `CircuitSet` records
+    the rows with no ambient or conductor count derate or no conductor size
+    for the current. Scalar functions
+    still return None for invalid inputs, array functions NaN.
+
+    Parameters
+    ----------
+    edition : str, optional
+        NEC edition of the section references, see `editions.get_edition`.
+
+    Yields
+    ------
+    collector : Collector
+
+    """
+    collector = Collector(edition)
+    _collectors.append(collector)
+    try:
+        yield collector
+    finally:
+        _collectors.remove(collector)
+
+
+@contextlib.contextmanager
+def circuits(ids):
+    """
+    Set the ids of the circuits reported within a with block.
+
+    Does nothing when no collector is active.
+
+    Parameters
+    ----------
+    ids : array_like or object
+        Circuit id of each row of the arrays passed to osd, or the id of the
+        circuit for scalar calls.
+
+    """
+    collector = active_collector()
+    if collector is None:
+        yield
+        return
+    previous = collector.circuit_ids
+    collector.circuit_ids = ids
+    try:
+        yield
+    finally:
+        collector.circuit_ids = previous
+
+
+def record(rule, value, invalid=None, edition=None):
+    """
+    Add records to the active collector, see `Collector.record`.
+
+    Returns
+    -------
+    recorded : bool
+        False when no collector is active.
+
+    """
+    collector = active_collector()
+    if collector is None:
+        return False
+    collector.record(rule, value, invalid=invalid, edition=edition)
+    return True
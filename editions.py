@@ -0,0 +1,192 @@
+import numpy as np
+import nec_tables as nec
+
+EDITIONS = ('2014', '2017', '2020', '2023')
+DEFAULT_EDITION = '2017'
+
+# Loader functions by edition, see `register_edition`.
+_loaders = {}
+# Editions loaded so far.
+_editions = {}
+
+# Section references of the 2014 and 2017 editions. The 2020 edition split
+# 310.15 and renumbered the ampacity tables.
+_references_2017 = {'ampacity_table': 'Table 310.15(B)(16)',
+                    'ampacity_table_free_air': 'Table 310.15(B)(17)',
+                    'ambient_correction': '310.15(B)(2)(a)',
+                    'ccc_adjustment': '310.15(B)(3)(a)',
+                    'rooftop_adder': '310.15(B)(3)(c)',
+                    'small_conductors': '240.4(D)',
+                    'next_size_up': '240.4(B)',
+                    'standard_ocpd': '240.6(A)',
+                    'continuous_load': '210.19(A)(1)',
+                    'egc': '250.122',
+                    'conduit_fill': 'Chapter 9 Table 1',
+                    'cond_area': 'Chapter 9 Table 5',
+                    'cond_properties': 'Chapter 9 Table 8',
+                    'cond_impedance': 'Chapter 9 Table 9'}
+_references_2020 = dict(_references_2017,
+                        ampacity_table='Table 310.16',
+                        ampacity_table_free_air='Table 310.17',
+                        ambient_correction='310.15(B)(1)',
+                        ccc_adjustment='310.15(C)(1)',
+                        rooftop_adder='310.15(B)(2)')
+
+
+class Edition(object):
+    """
+    NEC tables and section references for one code edition.
+
+    Tables are read as attributes with the same names as in `nec_tables`,
+    e.g. ``get_edition('2014').rooftop_adder``. Tables that do not change
+    between editions are shared with `nec_tables`.
+
+    Attributes
+    ----------
+    name : str
+        Edition year, e.g. '2017'.
+    tables : dict
+        Tables by name.
+    references : dict
+        Section or table number of each rule in this edition.
+
+    """
+
+    __slots__ = ('name', 'tables', 'references')
+
+    def __init__(self, name, tables, references):
+        self.name = name
+        self.tables = tables
+        self.references = references
+
+    def __getattr__(self, name):
+        # Slots are unset while copying or unpickling.
+        if name in Edition.__slots__:
+            raise AttributeError(name)
+        try:
+            return self.tables[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __repr__(self):
+        return 'Edition({!r})'.format(self.name)
+
+
+def _base_tables():
+    """Tables shared by every edition."""
+    return {name: value for name, value in vars(nec).items()
+            if not name.startswith('_') and
+            not callable(value) and not isinstance(value, type(nec))}
+
+
+def register_edition(name, loader):
+    """
+    Add or replace the loader of an edition.
+
+    Parameters
+    ----------
+    name : str
+        Edition year.
+    loader : callable
+        Function with no arguments returning a dictionary of tables and a
+        dictionary of section references. Called the first time the edition
+        is used.
+
+    """
+    _loaders[name] = loader
+    _editions.pop(name, None)
+
+
+def get_edition(edition=None):
+    """
+    Return the tables of an NEC edition, loading them on first use.
+
+    Parameters
+    ----------
+    edition : str or Edition, optional
+        Edition year, defaults to `DEFAULT_EDITION`.
+
+    Returns
+    -------
+    edition : Edition
+
+    """
+    if isinstance(edition, Edition):
+        return edition
+    if edition is None:
+        edition = DEFAULT_EDITION
+    edition = str(edition)
+    loaded = _editions.get(edition)
+    if loaded is None:
+        try:
+            loader = _loaders[edition]
+        except KeyError:
+            raise ValueError('{} is not a supported NEC edition, use one of '
+                             '{}.'.format(edition, ', '.join(_loaders))
+                             ) from None
+        tables, references = loader()
+        loaded = Edition(edition, tables, references)
+        _editions[edition] = loaded
+    return loaded
+
+
+def edition_codes(edition):
+    """
+    Group an edition argument by edition.
+
+    Parameters
+    ----------
+    edition : str, Edition, None or array_like of str
+
+    Returns
+    -------
+    groups : list of tuple
+        Each edition used and a boolean mask of its elements, or None for
+        the mask when `edition` is a single edition.
+
+    """
+    if edition is None or isinstance(edition, (str, int, Edition)):
+        return [(get_edition(edition), None)]
+    edition = np.asarray(edition, dtype=object).astype(str)
+    return [(get_edition(name), edition == name)
+            for name in np.unique(edition)]
+
+
+def loaded_editions():
+    """Return the names of the editions loaded so far."""
+    return list(_editions)
+
+
+def clear_editions():
+    """Unload every edition, they are reloaded on next use."""
+    _editions.clear()
+
+
+def _load_2014():
+    tables = _base_tables()
+    tables['rooftop_adder'] = nec.rooftop_adder['2014']
+    return tables, dict(_references_2017)
+
+
+def _load_2017():
+    tables = _base_tables()
+    tables['rooftop_adder'] = nec.rooftop_adder['2017']
+    return tables, dict(_references_2017)
+
+
+def _load_2020():
+    tables = _base_tables()
+    tables['rooftop_adder'] = nec.rooftop_adder['2017']
+    return tables, dict(_references_2020)
+
+
+def _load_2023():
+    tables = _base_tables()
+    tables['rooftop_adder'] = nec.rooftop_adder['2017']
+    return tables, dict(_references_2020)
+
+
+register_edition('2014', _load_2014)
+register_edition('2017', _load_2017)
+register_edition('2020', _load_2020)
+register_edition('2023', _load_2023)
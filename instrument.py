@@ -0,0 +1,302 @@
+import contextlib
+import functools
+import random
+import time
+from collections.abc import Mapping
+import numpy as np
+import nec_tables as nec
+import osd
+from table_store import PackedTable, TableView
+
+# Latency samples kept per function or table, older calls are replaced at
+# random once full so the percentiles cover the whole run.
+MAX_SAMPLES = 10000
+PERCENTILES = (50, 90, 99)
+# Tables that are not NEC tables remembered by id, so lookups on them do
+# not check for replaced NEC tables on every call.
+MAX_OTHER_TABLES = 256
+
+# NEC table behind each cached osd index builder.
+_BUILDER_TABLES = {'_get_amb_temp_derate_index': 'amb_temp_derate',
+                   '_get_rooftop_index': 'rooftop_adder',
+                   '_get_ccc_derate_index': 'ccc_count_derate',
+                   '_get_ocpd_sizes': 'ocpd_sizes',
+                   '_get_egc_index': 'egc_sizes',
+                   '_get_conduit_fill_index': 'conduit_area'}
+
+# Original osd functions by name while they are wrapped.
+_originals = {}
+# Statistics by function name and by table name.
+_functions = {}
+_tables = {}
+# Table name and table by id of each NEC table and nested table.
+_table_names = {}
+# NEC tables by name when `_table_names` was built.
+_indexed_tables = {}
+# Tables that are not NEC tables by id.
+_other_tables = {}
+
+
+class _Stats(object):
+    """Call count, latencies and cache hits of one function or table."""
+
+    __slots__ = ('calls', 'seconds', 'samples', 'hits', 'misses')
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.samples = []
+        self.hits = 0
+        self.misses = 0
+
+    def add(self, seconds, hit=None):
+        self.calls += 1
+        self.seconds += seconds
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(seconds)
+        else:
+            i = random.randrange(self.calls)
+            if i < MAX_SAMPLES:
+                self.samples[i] = seconds
+        if hit is not None:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def summary(self):
+        cached = self.hits + self.misses
+        summary = {'calls': self.calls, 'seconds': self.seconds,
+                   'mean': self.seconds / self.calls if self.calls else None,
+                   'hits': self.hits, 'misses': self.misses,
+                   'hit_rate': self.hits / cached if cached else None}
+        percentiles = (np.percentile(self.samples, PERCENTILES)
+                       if self.samples else [None] * len(PERCENTILES))
+        for p, value in zip(PERCENTILES, percentiles):
+            summary['p{}'.format(p)] = (None if value is None
+                                        else float(value))
+        return summary
+
+
+def _stats(stats, name):
+    value = stats.get(name)
+    if value is None:
+        value = stats[name] = _Stats()
+    return value
+
+
+def _nec_tables():
+    """NEC tables by name."""
+    return {name: table for name, table in vars(nec).items()
+            if not name.startswith('_') and
+            isinstance(table, (PackedTable, dict, list))}
+
+
+def _index_tables(tables):
+    """Map the ids of the NEC tables and their nested tables to names."""
+    def walk(table, name):
+        _table_names[id(table)] = (name, table)
+        if isinstance(table, dict):
+            for value in table.values():
+                if isinstance(value, (dict, list)):
+                    walk(value, name)
+
+    _table_names.clear()
+    _other_tables.clear()
+    _indexed_tables.clear()
+    _indexed_tables.update(tables)
+    for name, table in tables.items():
+        walk(table, name)
+
+
+def _table_name(table):
+    """Name of the NEC table a lookup table belongs to."""
+    if isinstance(table, TableView):
+        table = table.table
+    name, known = _table_names.get(id(table), (None, None))
+    if known is table or _other_tables.get(id(table)) is table:
+        return name or 'other'
+    # Re-index only if NEC tables were replaced, e.g. by a snapshot.
+    tables = _nec_tables()
+    if (len(tables) != len(_indexed_tables) or
+            any(_indexed_tables.get(name) is not value
+                for name, value in tables.items())):
+        _index_tables(tables)
+        name, known = _table_names.get(id(table), (None, None))
+        if known is table:
+            return name
+    if len(_other_tables) >= MAX_OTHER_TABLES:
+        _other_tables.clear()
+    _other_tables[id(table)] = table
+    return 'other'
+
+
+def _lookup_wrapper(lookup):
+    stats = _stats(_functions, 'lookup')
+
+    @functools.wraps(lookup)
+    def wrapper(lookup_value, table, keys=True):
+        hit = False
+        if isinstance(table, (Mapping, list)):
+            index = osd._lookup_indexes.get((id(table), keys))
+            hit = (index is not None and index.table is table and
+                   index.size == len(table))
+        start = time.perf_counter()
+        try:
+            return lookup(lookup_value, table, keys=keys)
+        finally:
+            seconds = time.perf_counter() - start
+            stats.add(seconds, hit)
+            _stats(_tables, _table_name(table)).add(seconds, hit)
+    return wrapper
+
+
+def _function_wrapper(name, fn):
+    stats = _stats(_functions, name)
+    cache_info = getattr(fn, 'cache_info', None)
+
+    if cache_info is None:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                stats.add(time.perf_counter() - start)
+        return wrapper
+
+    @functools.wraps(fn)
+    def cached_wrapper(*args, **kwargs):
+        hits = cache_info().hits
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            hit = cache_info().hits > hits
+            stats.add(seconds, hit)
+            table = _BUILDER_TABLES.get(name)
+            if name == '_get_ampacity_index':
+                table = args[0] if args else kwargs.get('table_name')
+            if table is not None:
+                _stats(_tables, table).add(seconds, hit)
+    cached_wrapper.cache_info = cache_info
+    cached_wrapper.cache_clear = fn.cache_clear
+    return cached_wrapper
+
+
+def default_functions():
+    """Public osd functions and the cached osd index builders."""
+    return [name for name, value in vars(osd).items()
+            if callable(value) and not isinstance(value, type) and
+            getattr(value, '__module__', None) == 'osd' and
+            (not name.startswith('_') or hasattr(value, 'cache_info'))]
+
+
+def enable(functions=None):
+    """
+    Start recording calls to osd functions.
+
+    The functions are replaced in the osd module by wrappers that record the
+    call count, latency and, for cached functions, whether the call was a
+    cache hit. Calls to `lookup` are also recorded by NEC table. Latencies
+    include the time spent in nested osd calls. References to osd functions
+    taken before enabling, such as the operations of a `CalcGraph`, are not
+    recorded.
+
+    Parameters
+    ----------
+    functions : sequence of str, optional
+        Names of the osd functions to record, defaults to
+        `default_functions`. Functions already recorded stay recorded.
+
+    """
+    if functions is None:
+        functions = default_functions()
+    for name in functions:
+        if name in _originals:
+            continue
+        fn = getattr(osd, name)
+        if name == 'lookup':
+            wrapper = _lookup_wrapper(fn)
+        else:
+            wrapper = _function_wrapper(name, fn)
+        _originals[name] = (fn, wrapper)
+        setattr(osd, name, wrapper)
+
+
+def disable():
+    """
+    Stop recording and restore the original osd functions.
+
+    Recorded statistics are kept until `reset`. Functions replaced in osd
+    by something else since `enable`, e.g. by `install_snapshot`, are left
+    as they are.
+
+    """
+    for name, (fn, wrapper) in _originals.items():
+        if getattr(osd, name) is wrapper:
+            setattr(osd, name, fn)
+    _originals.clear()
+
+
+def is_enabled():
+    """Return True if any osd function is being recorded."""
+    return bool(_originals)
+
+
+def reset():
+    """Discard the recorded statistics."""
+    for stats in (_functions, _tables):
+        for value in stats.values():
+            value.clear()
+
+
+def snapshot():
+    """
+    Return the statistics recorded since the last `reset`.
+
+    Returns
+    -------
+    stats : dict
+        'functions' and 'tables' dictionaries of statistics by name, with
+        the call count, total and mean seconds, latency percentiles in
+        seconds ('p50', 'p90', 'p99'), cache hits and misses and the hit
+        rate, None for functions that are not cached. Functions and tables
+        with no calls are omitted.
+
+    """
+    return {kind: {name: value.summary() for name, value in stats.items()
+                   if value.calls}
+            for kind, stats in (('functions', _functions),
+                                ('tables', _tables))}
+
+
+@contextlib.contextmanager
+def instrumented(functions=None):
+    """
+    Record osd calls for the duration of a with block.
+
+    Statistics are reset on entry and the returned dictionary is filled with
+    the `snapshot` on exit. Recording is disabled on exit unless it was
+    already enabled.
+
+    Parameters
+    ----------
+    functions : sequence of str, optional
+        Names of the osd functions to record, see `enable`.
+
+    """
+    was_enabled = is_enabled()
+    reset()
+    enable(functions)
+    stats = {}
+    try:
+        yield stats
+    finally:
+        stats.update(snapshot())
+        if not was_enabled:
+            disable()
@@ -0,0 +1,319 @@
+"""
+Memory-mapped snapshots of the NEC tables and the osd lookup indexes.
+
+`build_snapshot` writes the tables and the default edition indexes to one
+file, and `install_snapshot` replaces `nec_tables` and the cached osd index
+builders with read-only views of the mapped file.
+
+The tables are small, so importing from a snapshot currently takes about
+as long as importing `nec_tables` from its compiled bytecode and building
+the indexes. `runner.size_circuits` does not use snapshots, as each
+worker imports the tables once and a snapshot would not start it faster.
+"""
+import functools
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import types
+import numpy as np
+from table_store import PackedTable
+
+SNAPSHOT_MAGIC = b'PYSCNEC\x00'
+SNAPSHOT_VERSION = 1
+
+# Magic, format version and table of contents length.
+_HEADER = struct.Struct('<8sII')
+_ALIGN = 64
+
+# Modules the snapshot contents are built from. They are found by path so
+# loading a snapshot does not import them.
+SOURCES = tuple(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             name + '.py')
+                for name in ('nec_tables', 'editions', 'osd', 'table_store',
+                             'conductors'))
+
+
+def snapshot_indexes():
+    """Precomputed osd indexes stored in the snapshot, with their arguments."""
+    import editions
+    edition = editions.DEFAULT_EDITION
+    return (('_get_impedance_arrays', (edition,)),
+            ('_get_upsizing_arrays', (edition,)),
+            ('_get_conduit_fill_index', (edition,)),
+            ('_get_egc_index', (edition,)),
+            ('_get_amb_temp_derate_index', (edition,)),
+            ('_get_rooftop_index', (edition,)),
+            ('_get_ccc_derate_index', (edition,)),
+            ('_get_ampacity_index', ('cable_ampacity_310_16', edition)),
+            ('_get_ampacity_index', ('cable_ampacity_310_17', edition)))
+
+
+def _source_hash():
+    """Hash of the modules the snapshot contents are built from."""
+    # Imported here, loading a current snapshot only compares file stats.
+    import hashlib
+    digest = hashlib.sha256()
+    for path in SOURCES:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _source_stats():
+    """Size and modification time of the modules in `SOURCES`."""
+    stats = []
+    for path in SOURCES:
+        stat = os.stat(path)
+        stats.append([stat.st_size, stat.st_mtime_ns])
+    return stats
+
+
+def _table_names(nec):
+    """Names of the tables defined in nec_tables."""
+    return [name for name, value in vars(nec).items()
+            if not name.startswith('_') and
+            isinstance(value, (PackedTable, dict, list))]
+
+
+class _Encoder(object):
+    """Convert tables to JSON with the arrays collected for writing."""
+
+    def __init__(self):
+        self.arrays = []
+        self.offset = 0
+
+    def array(self, values):
+        values = np.ascontiguousarray(values)
+        self.offset += -self.offset % _ALIGN
+        ref = {'offset': self.offset, 'dtype': values.dtype.str,
+               'shape': list(values.shape)}
+        self.arrays.append((self.offset, values))
+        self.offset += values.nbytes
+        return ref
+
+    def encode(self, value):
+        if isinstance(value, PackedTable):
+            return {'__packed__': {
+                'data': self.array(value.data),
+                'present': self.array(value.present),
+                'labels': self.encode([list(axis) for axis in value.labels]),
+                'names': self.encode(list(value.names))}}
+        if isinstance(value, np.ndarray):
+            return {'__array__': self.array(value)}
+        if isinstance(value, dict):
+            return {'__dict__': [[self.encode(key), self.encode(val)]
+                                 for key, val in value.items()]}
+        if isinstance(value, tuple):
+            return {'__tuple__': [self.encode(val) for val in value]}
+        if isinstance(value, list):
+            return [self.encode(val) for val in value]
+        if isinstance(value, (set, frozenset)):
+            return {'__set__': [self.encode(val) for val in sorted(value)]}
+        if isinstance(value, np.generic):
+            return value.item()
+        return value
+
+
+def build_snapshot(path):
+    """
+    Write every NEC table and the precomputed osd indexes to a binary file.
+
+    The file starts with a magic string, the format version and a JSON table
+    of contents, followed by the raw array data with each array aligned to
+    64 bytes. Tables that are not packed are stored in the table of
+    contents with their key types preserved.
+
+    Parameters
+    ----------
+    path : str
+        Path of the snapshot file, overwritten if it exists.
+
+    """
+    import nec_tables as nec
+    import osd
+    encoder = _Encoder()
+    toc = {'source_hash': _source_hash(),
+           'source_stats': _source_stats(),
+           'tables': {name: encoder.encode(getattr(nec, name))
+                      for name in _table_names(nec)},
+           'indexes': [[name, list(args),
+                        encoder.encode(getattr(osd, name)(*args))]
+                       for name, args in snapshot_indexes()]}
+    toc = json.dumps(toc).encode('utf-8')
+    start = _HEADER.size + len(toc)
+    start += -start % _ALIGN
+
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(toc)))
+        f.write(toc)
+        for offset, values in encoder.arrays:
+            f.seek(start + offset)
+            f.write(values.tobytes())
+        f.truncate(start + encoder.offset)
+
+
+class NecSnapshot(object):
+    """
+    NEC tables loaded from a memory-mapped snapshot file.
+
+    Created by `load_snapshot`. Arrays are read-only views of the mapped
+    file, so processes loading the same snapshot share its memory pages.
+
+    Attributes
+    ----------
+    tables : dict
+        Tables by their name in `nec_tables`.
+    indexes : dict
+        Precomputed osd indexes by function name and arguments.
+    source_hash : str
+        Hash of nec_tables, editions and osd when the snapshot was built.
+
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < _HEADER.size:
+            raise ValueError('{} is not an NEC table snapshot.'.format(path))
+        magic, version, toc_length = _HEADER.unpack_from(self._mmap)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError('{} is not an NEC table snapshot.'.format(path))
+        if version != SNAPSHOT_VERSION:
+            raise ValueError('Unsupported NEC table snapshot version '
+                             '{}.'.format(version))
+        toc = json.loads(bytes(
+            self._mmap[_HEADER.size:_HEADER.size + toc_length]))
+        self._start = _HEADER.size + toc_length
+        self._start += -self._start % _ALIGN
+
+        self.path = path
+        self.source_hash = toc['source_hash']
+        self.source_stats = toc.get('source_stats')
+        self.tables = {name: self._decode(value)
+                       for name, value in toc['tables'].items()}
+        self.indexes = {(name, tuple(args)): self._decode(value)
+                        for name, args, value in toc['indexes']}
+
+    def _array(self, ref):
+        shape = tuple(ref['shape'])
+        dtype = np.dtype(ref['dtype'])
+        count = math.prod(shape)
+        return np.frombuffer(self._mmap, dtype=dtype, count=count,
+                             offset=self._start + ref['offset']
+                             ).reshape(shape)
+
+    def _decode(self, value):
+        if isinstance(value, list):
+            return [self._decode(val) for val in value]
+        if not isinstance(value, dict):
+            return value
+        if '__array__' in value:
+            return self._array(value['__array__'])
+        if '__tuple__' in value:
+            return tuple(self._decode(val) for val in value['__tuple__'])
+        if '__set__' in value:
+            return set(self._decode(val) for val in value['__set__'])
+        if '__dict__' in value:
+            return {self._decode(key): self._decode(val)
+                    for key, val in value['__dict__']}
+        packed = value['__packed__']
+        return PackedTable(self._array(packed['data']),
+                           self._array(packed['present']),
+                           self._decode(packed['labels']),
+                           names=self._decode(packed['names']))
+
+    @property
+    def is_current(self):
+        """
+        True if the table and osd modules are unchanged since the build.
+
+        Files with the size and modification time recorded at build time are
+        taken as unchanged, otherwise their contents are hashed.
+
+        """
+        return (self.source_stats == _source_stats() or
+                self.source_hash == _source_hash())
+
+
+def load_snapshot(path):
+    """
+    Memory-map a snapshot file written by `build_snapshot`.
+
+    Returns
+    -------
+    snapshot : NecSnapshot
+
+    """
+    return NecSnapshot(path)
+
+
+def _snapshot_index(builder, values):
+    """Wrap an osd index builder to return the snapshot indexes first."""
+    @functools.wraps(builder)
+    def wrapper(*args):
+        if args in values:
+            return values[args]
+        return builder(*args)
+    wrapper.builder = builder
+    if hasattr(builder, 'cache_clear'):
+        wrapper.cache_clear = builder.cache_clear
+    return wrapper
+
+
+def install_snapshot(snapshot):
+    """
+    Use the tables and indexes of a snapshot in nec_tables and osd.
+
+    Intended for worker processes, the tables in nec_tables are replaced by
+    the memory-mapped tables and the osd index builders return the stored
+    indexes instead of building them. Loaded editions are discarded so they
+    are rebuilt from the mapped tables.
+
+    When nec_tables has not been imported yet, the snapshot is registered as
+    the nec_tables module and the module itself is never executed. Install
+    the snapshot before importing osd, editions or circuits to skip building
+    the tables at import time.
+
+    Parameters
+    ----------
+    snapshot : NecSnapshot
+        Snapshot from `load_snapshot`.
+
+    """
+    if not snapshot.is_current:
+        raise ValueError('{} was built from a different version of '
+                         'nec_tables, editions or osd.'.format(snapshot.path))
+    nec = sys.modules.get('nec_tables')
+    if nec is None:
+        nec = types.ModuleType('nec_tables', 'NEC tables loaded from '
+                               '{}.'.format(snapshot.path))
+        nec.__file__ = snapshot.path
+        nec.PackedTable = PackedTable
+        sys.modules['nec_tables'] = nec
+    for name, table in snapshot.tables.items():
+        setattr(nec, name, table)
+
+    import editions
+    import osd
+    editions.clear_editions()
+    builders = {}
+    for (name, args), value in snapshot.indexes.items():
+        builders.setdefault(name, {})[args] = value
+    for name, values in builders.items():
+        # Replace the wrapper of a previous install rather than nesting it.
+        builder = getattr(osd, name)
+        builder = getattr(builder, 'builder', builder)
+        setattr(osd, name, _snapshot_index(builder, values))
+    # Cached results built from the replaced tables.
+    for value in list(vars(osd).values()):
+        if hasattr(value, 'cache_clear'):
+            value.cache_clear()
+    osd.clear_lookup_cache()
+
+
+if __name__ == '__main__':
+    build_snapshot(sys.argv[1] if len(sys.argv) > 1 else
+                   os.path.join(os.path.dirname(__file__), 'nec_tables.snap'))
@@ -1,3 +1,45 @@
+from table_store import PackedTable
+
+# Conductor sizes in order of increasing area, AWG then kcmil
+# from NEC 2017 Chapter 9, Table 8 and Table 250.122
+# The position of a size in this list is its size ordinal in packed tables.
+cond_sizes = ['14', '12', '10', '8', '6', '4', '3', '2', '1',
+              '1/0', '2/0', '3/0', '4/0',
+              '250', '300', '350', '400', '500', '600', '700', '750', '800',
+              '900', '1000', '1200', '1250', '1500', '1750', '2000']
+
+# Conductor area in circular mils from NEC 2017 Chapter 9, Table 8
+# cond_size, circular mils
+cond_circular_mils = {'14': 4110,
+                      '12': 6530,
+                      '10': 10380,
+                      '8': 16510,
+                      '6': 26240,
+                      '4': 41740,
+                      '3': 52620,
+                      '2': 66360,
+                      '1': 83690,
+                      '1/0': 105600,
+                      '2/0': 133100,
+                      '3/0': 167800,
+                      '4/0': 211600,
+                      '250': 250000,
+                      '300': 300000,
+                      '350': 350000,
+                      '400': 400000,
+                      '500': 500000,
+                      '600': 600000,
+                      '700': 700000,
+                      '750': 750000,
+                      '800': 800000,
+                      '900': 900000,
+                      '1000': 1000000,
+                      '1200': 1200000,
+                      '1250': 1250000,
+                      '1500': 1500000,
+                      '1750': 1750000,
+                      '2000': 2000000}
+
 # Cable ampacities from NEC Table 310.16
 cable_ampacity_310_16 = {'Cu': {60: {'12': 20,
                                      '10': 30,
@@ -338,11 +380,13 @@ ocpd_sizes = [15, 20, 25, 30, 35,
 
 # Standard adders from NEC 310.15(B)(3)(c) in INCHES and deg C
 # NEC version, distance from roof, adder in deg C
+# Heights are the top of each band, above the last band there is no adder.
+# 2017 and later only add 33 C (60 F) for 7/8 inch or less.
 rooftop_adder = {'2014': {0.5: 33,
                           3.5: 22,
                           12: 17,
                           36: 14},
-                 '2017': {0.875: 60}}
+                 '2017': {0.875: 33}}
 
 # Standard wire insulations from NEC 2017 Table 310.16(B)(3)(c) columns
 cond_insulation = {60: {'TW', 'UF'},
@@ -437,6 +481,73 @@ condiut_xsection = [(1, 0.53),
                     (2, 0.31),
                     (3, 0.40)]
 
+# Approximate conductor area in INCHES^2 from NEC 2017 Chapter 9, Table 5
+# cond_insulation, cond_size, area
+# THHN, THWN and THWN-2 share the THHN areas and XHHW and XHHW-2 share the
+# XHHW areas, see cond_area_insulation.
+cond_area = {'THHN': {'14': 0.0097,
+                      '12': 0.0133,
+                      '10': 0.0211,
+                      '8': 0.0366,
+                      '6': 0.0507,
+                      '4': 0.0824,
+                      '3': 0.0973,
+                      '2': 0.1158,
+                      '1': 0.1562,
+                      '1/0': 0.1855,
+                      '2/0': 0.2223,
+                      '3/0': 0.2679,
+                      '4/0': 0.3237,
+                      '250': 0.3970,
+                      '300': 0.4608,
+                      '350': 0.5242,
+                      '400': 0.5863,
+                      '500': 0.7073,
+                      '600': 0.8676,
+                      '700': 0.9887,
+                      '750': 1.0496,
+                      '800': 1.1085,
+                      '900': 1.2311,
+                      '1000': 1.3478},
+             'XHHW': {'14': 0.0139,
+                      '12': 0.0181,
+                      '10': 0.0243,
+                      '8': 0.0437,
+                      '6': 0.0590,
+                      '4': 0.0814,
+                      '3': 0.0962,
+                      '2': 0.1146,
+                      '1': 0.1534,
+                      '1/0': 0.1825,
+                      '2/0': 0.2190,
+                      '3/0': 0.2642,
+                      '4/0': 0.3197,
+                      '250': 0.3904,
+                      '300': 0.4536,
+                      '350': 0.5166,
+                      '400': 0.5782,
+                      '500': 0.6984,
+                      '600': 0.8709,
+                      '700': 0.9923,
+                      '750': 1.0532,
+                      '800': 1.1122,
+                      '900': 1.2351,
+                      '1000': 1.3519,
+                      '1250': 1.7180,
+                      '1500': 2.0156,
+                      '1750': 2.3127,
+                      '2000': 2.6073}}
+
+cond_area_insulation = {'THHN': 'THHN',
+                        'THWN': 'THHN',
+                        'THWN-2': 'THHN',
+                        'XHHW': 'XHHW',
+                        'XHHW-2': 'XHHW'}
+
+# Conduit trade sizes in INCHES from NEC 2017 Chapter 9, Table 4
+conduit_trade_sizes = [0.50, 0.75, 1.00, 1.25, 1.50, 2.00, 2.50, 3.00, 3.50,
+                       4.00, 5.00, 6.00]
+
 conduit_type = ['EMT',
                 'ENT',
                 'FMC',
@@ -861,3 +972,31 @@ cond_resistance_alum = {'PVC': {'12': 3.200,
                                   '600': 0.038,
                                   '750': 0.031,
                                   '1000': 0.025}}
+
+# Pack the nested conductor and conduit tables into array-backed tables.
+# The packed tables are read-only dictionary views of themselves, so indexing
+# like cable_ampacity_310_16['Cu'][90]['4/0'] is unchanged.
+cable_ampacity_310_16 = PackedTable.from_nested(
+    cable_ampacity_310_16, labels=(None, None, cond_sizes),
+    names=('cond_material', 'insulation_temp', 'cond_size'))
+cable_ampacity_310_17 = PackedTable.from_nested(
+    cable_ampacity_310_17, labels=(None, None, cond_sizes),
+    names=('cond_material', 'insulation_temp', 'cond_size'))
+cond_resistance_dc = PackedTable.from_nested(
+    cond_resistance_dc, labels=(None, cond_sizes),
+    names=('cond_material', 'cond_size'))
+cond_reactance = PackedTable.from_nested(
+    cond_reactance, labels=(None, cond_sizes),
+    names=('conduit_material', 'cond_size'))
+cond_resistance_cu = PackedTable.from_nested(
+    cond_resistance_cu, labels=(None, cond_sizes),
+    names=('conduit_material', 'cond_size'))
+cond_resistance_alum = PackedTable.from_nested(
+    cond_resistance_alum, labels=(None, cond_sizes),
+    names=('conduit_material', 'cond_size'))
+cond_area = PackedTable.from_nested(
+    cond_area, labels=(None, cond_sizes),
+    names=('cond_insulation', 'cond_size'))
+conduit_area = PackedTable.from_nested(
+    conduit_area, labels=(conduit_type, conduit_trade_sizes),
+    names=('conduit_type', 'trade_size'))
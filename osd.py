@@ -1,5 +1,176 @@
+import bisect
+import functools
 import warnings
+from collections import OrderedDict
+from collections.abc import Mapping
+import numpy as np
 import nec_tables as nec
+import conductors
+import diagnostics
+import editions
+
+# Compiled lookup indexes keyed by (id(table), keys), least recently used
+# first, see get_lookup_index.
+_lookup_indexes = OrderedDict()
+LOOKUP_CACHE_SIZE = 256
+
+# Conductor materials and conduit materials along the axes of the voltage
+# drop arrays, see _get_impedance_arrays.
+COND_MATERIALS = ('Cu', 'Al')
+CONDUIT_MATERIALS = ('PVC', 'Alum', 'Steel')
+
+
+class LookupIndex(object):
+    """
+    Search index over a single NEC table in one orientation.
+
+    Built once per table by `get_lookup_index` so repeated lookups do not
+    re-invert or copy the table. Sorted tables are searched with a binary
+    search. Tables that are not sorted in the compared orientation, such as
+    the inverted `ccc_count_derate` table, fall back to a linear scan so the
+    result always matches a first-match scan of the table.
+
+    Parameters
+    ----------
+    table : dictionary or list
+        The NEC table the index is built from.
+    keys : bool, default True
+        If true, the index compares against the `table` keys.
+        If false, the index compares against the `table` values.
+
+    """
+
+    __slots__ = ('table', 'keys', 'size', 'compare', 'results', 'is_sorted')
+
+    def __init__(self, table, keys=True):
+        self.table = table
+        self.keys = keys
+        self.size = len(table)
+        if isinstance(table, Mapping):
+            if not keys:
+                table = {val: key for key, val in table.items()}
+            self.compare = list(table.keys())
+            self.results = list(table.values())
+        else:
+            self.compare = list(table)
+            self.results = self.compare
+        self.is_sorted = all(a <= b for a, b in zip(self.compare,
+                                                    self.compare[1:]))
+
+    def search(self, lookup_value):
+        """
+        Return the table entry for the first compared value >= lookup_value.
+
+        Returns None when no compared value is greater than or equal to
+        `lookup_value`. Unlike `lookup` no warning is raised.
+
+        """
+        compare = self.compare
+        if self.is_sorted:
+            i = bisect.bisect_left(compare, lookup_value)
+            if i < len(compare) and lookup_value <= compare[i]:
+                return self.results[i]
+            return None
+        for i, val in enumerate(compare):
+            if lookup_value <= val:
+                return self.results[i]
+        return None
+
+
+def get_lookup_index(table, keys=True):
+    """
+    Get the cached `LookupIndex` for a table and orientation.
+
+    Indexes for dictionary, packed and list tables are built on first use and
+    cached. The cache keeps the `LOOKUP_CACHE_SIZE` most recently used
+    indexes, so tables built per call, like lists of custom OCPD sizes, are
+    not held for the life of the process. Other iterables, like dictionary
+    key views, are compiled on every call.
+
+    Tables are assumed not to change once they have been looked up. A cached
+    index is rebuilt if the length of its table changes; call
+    `clear_lookup_cache` after modifying a table in any other way.
+
+    Parameters
+    ----------
+    table : dictionary or list
+        The NEC table to index.
+    keys : bool, default True
+        If true, index the `table` keys.
+        If false, index the `table` values.
+
+    Returns
+    -------
+    index : LookupIndex
+
+    """
+    if not isinstance(table, (Mapping, list)):
+        return LookupIndex(table, keys=keys)
+
+    cache_key = (id(table), keys)
+    index = _lookup_indexes.get(cache_key)
+    if (index is None or index.table is not table or
+            index.size != len(table)):
+        index = LookupIndex(table, keys=keys)
+        _lookup_indexes[cache_key] = index
+        if len(_lookup_indexes) > LOOKUP_CACHE_SIZE:
+            _lookup_indexes.popitem(last=False)
+    _lookup_indexes.move_to_end(cache_key)
+    return index
+
+
+def clear_lookup_cache():
+    """Discard all cached lookup indexes."""
+    _lookup_indexes.clear()
+
+
+def _report(rule, message, value, invalid=None):
+    """
+    Warn about invalid inputs, or record them when collecting diagnostics.
+
+    See `diagnostics.collect`. Always returns None.
+
+    """
+    if not diagnostics.record(rule, value, invalid=invalid):
+        warnings.warn(message)
+
+
+def _by_edition(function, edition, arrays, **kwargs):
+    """
+    Call an array function once for the rows of each edition.
+
+    The `arrays` dictionary of arguments is broadcast against the `edition`
+    array and the rows of each edition are passed to `function` with that
+    edition, see `editions.edition_codes`. Arguments that are None and the
+    other keyword arguments are passed unchanged. The outputs of `function`
+    are combined for every row.
+
+    """
+    names = [name for name, value in arrays.items() if value is not None]
+    *values, edition = np.broadcast_arrays(
+        *[np.asarray(arrays[name]) for name in names],
+        np.asarray(edition, dtype=object))
+    kwargs.update((name, value) for name, value in arrays.items()
+                  if value is None)
+    if not edition.size:
+        return function(**dict(zip(names, values)), **kwargs)
+
+    outputs = None
+    for tables, rows in editions.edition_codes(edition):
+        result = function(**{name: value[rows]
+                             for name, value in zip(names, values)},
+                          edition=tables.name, **kwargs)
+        single = not isinstance(result, tuple)
+        if single:
+            result = (result,)
+        if outputs is None:
+            outputs = [np.empty(edition.shape, dtype=np.asarray(out).dtype)
+                       for out in result]
+        for output, out in zip(outputs, result):
+            output[rows] = out
+    if single:
+        return outputs[0][()]
+    return tuple(output[()] for output in outputs)
 
 
 def lookup(lookup_value, table, keys=True):
@@ -21,39 +192,35 @@ def lookup(lookup_value, table, keys=True):
         If true, compares the `lookup_value`against the `table` keys.
         If false, compares the `lookup_value` against the `table` values.
 
+    Notes
+    -----
+    Searches a cached `LookupIndex` for the table, see `get_lookup_index`.
+    Values outside of the table are recorded instead of warned about when
+    collecting diagnostics, see `diagnostics.collect`.
+
     """
-    table_is_dict = isinstance(table, dict)
-    if table_is_dict:
-        if not keys:
-            table = {val: key for key, val in table.items()}
-        vals_to_compare = list(table.keys())
-    else:
-        vals_to_compare = table
+    index = get_lookup_index(table, keys=keys)
 
-    if lookup_value > vals_to_compare[-1]:
-        return warnings.warn('Lookup value is outside of the table.')
+    if lookup_value > index.compare[-1]:
+        return _report('table_range', 'Lookup value is outside of the '
+                       'table.', lookup_value)
 
-    for val in vals_to_compare:
-        # print('i: {}, value: {}'.format(i, val))
-        if lookup_value <= val:
-            # key = val
-            if table_is_dict:
-                return table[val]
-            else:
-                return val
+    return index.search(lookup_value)
 
 
 def get_ambient_temp_derate(ambient_temp, wire_insulation_temp,
-                            table_insulation_temp=30):
+                            table_insulation_temp=30, method='equation',
+                            edition=None):
     """
     Determine the cable derate required for the ambient temperature.
 
     Inputs are ambient temperature and wire temperature rating.
 
     NEC Reference - Equation 310.15(B)(2)
-    Function uses the equation to calculate the ambient temperature derate
-    rather than Table 310.15(B)(2)(a), 30C ambient, or
-    Table 310.15(B)(2)(b), 40C ambient.
+    By default the function uses the equation to calculate the ambient
+    temperature derate rather than Table 310.15(B)(2)(a), 30C ambient, or
+    Table 310.15(B)(2)(b), 40C ambient. Use `method='table'` to take the
+    derate from the 5C bands of Table 310.15(B)(2)(a) instead.
 
     Parameters
     ----------
@@ -66,6 +233,10 @@ def get_ambient_temp_derate(ambient_temp, wire_insulation_temp,
         Base insulation temperature of the the table used to look up conductor
         ampacity. Table 310.15(B)(16) is the most commonly used table to lookup
         conductor ampacities and is based on 30C, thus the 30C default value.
+    method : str, default 'equation'
+        Either 'equation' or 'table'.
+    edition : str, optional
+        NEC edition of the table, see `editions.get_edition`.
 
     Returns
     -------
@@ -73,15 +244,218 @@ def get_ambient_temp_derate(ambient_temp, wire_insulation_temp,
         The derate required for the ambient temperature.
 
     """
+    if method == 'table':
+        derate, invalid = get_ambient_temp_derate_array(
+            ambient_temp, wire_insulation_temp,
+            table_insulation_temp=table_insulation_temp, method=method,
+            edition=edition)
+        if invalid:
+            return _report('ambient_correction', 'Ambient temperature is '
+                           'outside of Table 310.15(B)(2)(a) for the cable '
+                           'rating.', ambient_temp)
+        return float(derate)
+    if method != 'equation':
+        raise ValueError("method must be 'equation' or 'table'.")
+
     if ambient_temp >= wire_insulation_temp:
-        return warnings.warn('Ambient temperature should not equal or '
-                             'exceed cable rating.')
+        return _report('ambient_correction', 'Ambient temperature should '
+                       'not equal or exceed cable rating.', ambient_temp)
 
     return(((wire_insulation_temp - ambient_temp) /
             (wire_insulation_temp - table_insulation_temp)) ** 0.5)
 
 
-def get_ocpd(current, voltage_type, ocpd_derate=0.80):
+@functools.lru_cache(maxsize=None)
+def _get_amb_temp_derate_index(edition):
+    """
+    Compile the ambient temperature derate table into an interval index.
+
+    Table 310.15(B)(2)(a) is stored with the first and last temperature of
+    each band as keys. Consecutive keys with the same derates are merged
+    into one band, leaving the upper edge of each band.
+
+    Returns
+    -------
+    upper_edges : numpy.ndarray
+        Highest ambient temperature of each band, sorted.
+    derates : numpy.ndarray
+        Derates with shape (band + 1, insulation temp). The last row is NaN
+        for ambient temperatures above the table and derates of 0, which the
+        table uses where the insulation is not permitted, are NaN.
+    temps : tuple
+        Insulation temperatures along the second axis of `derates`.
+
+    """
+    table = editions.get_edition(edition).amb_temp_derate
+    temps = tuple(next(iter(table.values())))
+    upper_edges = []
+    derates = []
+    for amb_temp in sorted(table):
+        row = [table[amb_temp][temp] for temp in temps]
+        if derates and row == derates[-1]:
+            upper_edges[-1] = amb_temp
+        else:
+            upper_edges.append(amb_temp)
+            derates.append(row)
+    derates.append([np.nan] * len(temps))
+    upper_edges = np.array(upper_edges, dtype=float)
+    derates = np.array(derates, dtype=float)
+    derates[derates == 0] = np.nan
+    upper_edges.flags.writeable = False
+    derates.flags.writeable = False
+    return upper_edges, derates, temps
+
+
+def get_ambient_temp_derate_array(ambient_temp, wire_insulation_temp,
+                                  table_insulation_temp=30, method='equation',
+                                  edition=None):
+    """
+    Determine ambient temperature derates for arrays of temperatures.
+
+    Batch version of `get_ambient_temp_derate`. Inputs are broadcast against
+    each other, so a single wire insulation rating can be used for an array
+    of hourly ambient temperatures.
+
+    NEC Reference - Equation 310.15(B)(2) or Table 310.15(B)(2)(a)
+
+    The table method finds the band of each temperature with searchsorted
+    over the upper band edges. Temperatures between two bands, e.g. 15.5C,
+    use the warmer band.
+
+    Parameters
+    ----------
+    ambient_temp : array_like
+        The ambient temperatures in degrees Celsius.
+    wire_insulation_temp : array_like
+        Wire insulation temperature ratings in degrees Celsius.
+        Typically 60, 75, or 90.
+    table_insulation_temp : numeric, default 30
+        Base insulation temperature of the the table used to look up conductor
+        ampacity. Must be 30 for the table method.
+    method : str, default 'equation'
+        Either 'equation' or 'table'.
+    edition : str or array_like of str, optional
+        NEC edition of the table, see `editions.get_edition`.
+
+    Returns
+    -------
+    ambient_temp_derate : numpy.ndarray
+        The derates required for the ambient temperatures. Invalid rows are
+        NaN.
+    invalid : numpy.ndarray
+        Boolean mask that is True where the ambient temperature equals or
+        exceeds the wire insulation rating, or for the table method where
+        the table has no derate.
+
+    """
+    if method == 'table':
+        if table_insulation_temp != 30:
+            raise ValueError('Table 310.15(B)(2)(a) is based on 30C, use the '
+                             'equation for other table temperatures.')
+        if np.ndim(edition):
+            return _by_edition(
+                get_ambient_temp_derate_array, edition,
+                {'ambient_temp': ambient_temp,
+                 'wire_insulation_temp': wire_insulation_temp},
+                method=method)
+        upper_edges, derates, temps = _get_amb_temp_derate_index(
+            editions.get_edition(edition).name)
+        ambient_temp, temp = np.broadcast_arrays(
+            np.asarray(ambient_temp, dtype=float),
+            _label_codes(wire_insulation_temp, temps))
+        # NaN temperatures sort after every edge and select the NaN row.
+        band = np.searchsorted(upper_edges, ambient_temp, side='left')
+        ambient_temp_derate = np.where(temp >= 0, derates[band, temp],
+                                       np.nan)
+        return ambient_temp_derate, np.isnan(ambient_temp_derate)
+    if method != 'equation':
+        raise ValueError("method must be 'equation' or 'table'.")
+
+    ambient_temp, wire_insulation_temp = np.broadcast_arrays(
+        np.asarray(ambient_temp, dtype=float),
+        np.asarray(wire_insulation_temp, dtype=float))
+    invalid = ~(ambient_temp < wire_insulation_temp)
+
+    ambient_temp_derate = np.full(ambient_temp.shape, np.nan)
+    np.divide(wire_insulation_temp - ambient_temp,
+              wire_insulation_temp - table_insulation_temp,
+              out=ambient_temp_derate, where=~invalid)
+    np.sqrt(ambient_temp_derate, out=ambient_temp_derate)
+    return ambient_temp_derate, invalid
+
+
+@functools.lru_cache(maxsize=None)
+def _get_rooftop_index(edition):
+    """
+    Build the rooftop adder band edges and adders for an edition.
+
+    Returns
+    -------
+    upper_edges : numpy.ndarray
+        Highest height above the roof of each band in inches, sorted.
+    adders : numpy.ndarray
+        Temperature adder of each band in degrees Celsius, with a trailing
+        zero for heights above the last band.
+
+    """
+    table = editions.get_edition(edition).rooftop_adder
+    upper_edges = np.array(sorted(table), dtype=float)
+    adders = np.array([table[height] for height in sorted(table)] + [0],
+                      dtype=float)
+    upper_edges.flags.writeable = False
+    adders.flags.writeable = False
+    return upper_edges, adders
+
+
+def get_rooftop_temp(ambient_temp, height_above_roof, edition=None):
+    """
+    Add the rooftop temperature adder to ambient temperatures.
+
+    Raceways and cables exposed to sunlight on or above rooftops are sized
+    for the ambient temperature plus an adder based on the distance above
+    the roof. NEC 2014 uses four height bands up to 36 inches. NEC 2017 and
+    later only add 33C for distances of 7/8 inch or less.
+
+    NEC Reference
+    2014 and 2017 - 310.15(B)(3)(c)
+    2020 and 2023 - 310.15(B)(2)
+
+    Parameters
+    ----------
+    ambient_temp : numeric or array_like
+        The ambient temperature in degrees Celsius.
+    height_above_roof : numeric or array_like
+        Distance from the roof to the bottom of the raceway or cable in
+        inches. Use a negative value, e.g. -1, or NaN for circuits that are
+        not on a rooftop.
+    edition : str or array_like of str, optional
+        NEC edition, see `editions.get_edition`.
+
+    Returns
+    -------
+    design_temp : float or numpy.ndarray
+        Ambient temperature including the rooftop adder.
+
+    """
+    if np.ndim(edition):
+        return _by_edition(get_rooftop_temp, edition,
+                           {'ambient_temp': np.asarray(ambient_temp,
+                                                       dtype=float),
+                            'height_above_roof': np.asarray(
+                                height_above_roof, dtype=float)})
+    ambient_temp, height = np.broadcast_arrays(
+        np.asarray(ambient_temp, dtype=float),
+        np.asarray(height_above_roof, dtype=float))
+    upper_edges, adders = _get_rooftop_index(
+        editions.get_edition(edition).name)
+    # NaN heights sort after every edge and select the zero adder.
+    band = np.searchsorted(upper_edges, height, side='left')
+    adder = np.where(height < 0, 0, adders[band])
+    return (ambient_temp + adder)[()]
+
+
+def get_ocpd(current, voltage_type, ocpd_derate=0.80, custom_sizes=None,
+             edition=None):
     """
     Determine overcurrent protection device (OCPD) size.
 
@@ -90,17 +464,44 @@ def get_ocpd(current, voltage_type, ocpd_derate=0.80):
     NEC 240.6 for use of next largest OCPD for currents less than 800A
     240.6(A) for standard OCPD sizes
 
+    Any array argument switches to array mode. Arguments are broadcast
+    against each other and the OCPD sizes are found with a sorted search
+    against `nec_tables.ocpd_sizes`. Rows above the largest standard size are
+    NaN and reported with a single warning giving the count of those rows,
+    or recorded row by row when collecting diagnostics. Passing
+    `custom_sizes` or an array of editions also uses array mode.
+
     Parameters
     ----------
-    current : numeric
+    current : numeric or array_like
         Operating current for the circuit in amps.
-    voltage_type : str
+    voltage_type : str or array_like of str
         Either 'AC' or 'DC' indicating circuit carries alternating or direct
         current.
-    ocpd_derate : numeric, default 0.8
+    ocpd_derate : numeric or array_like, default 0.8
         Rating of the overcurrent protective device. Usually 0.8 or 1.
+    custom_sizes : sequence of numeric, optional
+        Non-standard OCPD ratings available in addition to the standard
+        sizes, see `get_ocpd_sizes`.
+    edition : str or array_like of str, optional
+        NEC edition, see `editions.get_edition`.
+
+    Returns
+    -------
+    ocpd : numeric or numpy.ndarray
+        Standard OCPD size. A float array in array mode.
 
     """
+    if np.ndim(edition):
+        return _by_edition(get_ocpd, edition,
+                           {'current': current, 'voltage_type': voltage_type,
+                            'ocpd_derate': ocpd_derate},
+                           custom_sizes=custom_sizes)
+    if (np.ndim(current) or np.ndim(voltage_type) or np.ndim(ocpd_derate) or
+            custom_sizes is not None):
+        return _get_ocpd_array(current, voltage_type, ocpd_derate,
+                               get_ocpd_sizes(custom_sizes, edition))[()]
+
     if current < 10:
         current = 10
 
@@ -108,189 +509,1115 @@ def get_ocpd(current, voltage_type, ocpd_derate=0.80):
         current = current * 1.25
 
     design_current = current / ocpd_derate
-    return lookup(design_current, nec.ocpd_sizes)
+    return lookup(design_current, editions.get_edition(edition).ocpd_sizes)
+
 
+def _get_ocpd_array(current, voltage_type, ocpd_derate, ocpd_sizes):
+    """Array mode of `get_ocpd`."""
+    current, voltage_type, ocpd_derate = np.broadcast_arrays(
+        np.asarray(current, dtype=float),
+        np.asarray(voltage_type),
+        np.asarray(ocpd_derate, dtype=float))
+
+    current = np.maximum(current, 10)
+    current = np.where(voltage_type == 'DC', current * 1.25, current)
+    design_current = current / ocpd_derate
+
+    i = np.searchsorted(ocpd_sizes, design_current, side='left')
+    in_table = i < ocpd_sizes.size
+    ocpd = np.full(design_current.shape, np.nan)
+    ocpd[in_table] = ocpd_sizes[i[in_table]]
+
+    # Missing currents are left NaN without being reported.
+    out_of_table = ~in_table & ~np.isnan(design_current)
+    count = np.count_nonzero(out_of_table)
+    if count:
+        _report('standard_ocpd', '{} of {} lookup values are outside of the '
+                'table.'.format(count, ocpd.size), design_current,
+                out_of_table)
+    return ocpd
+
+
+@functools.lru_cache(maxsize=None)
+def _get_ocpd_sizes(custom_sizes, edition):
+    """Build the sorted OCPD sizes for a sorted tuple of custom sizes."""
+    # Integer sizes stay integers unless a custom size is fractional.
+    sizes = np.unique(np.array(
+        list(editions.get_edition(edition).ocpd_sizes) + list(custom_sizes)))
+    sizes.flags.writeable = False
+    return sizes
+
+
+def get_ocpd_sizes(custom_sizes=None, edition=None):
+    """
+    Return the sorted OCPD sizes including any custom sizes.
+
+    The standard sizes are from `nec_tables.ocpd_sizes`. Custom sizes are
+    non-standard OCPD ratings, for example an adjustable trip breaker
+    setting, that should be treated as available sizes. The sorted array is
+    built once for each set of custom sizes.
+
+    NEC Reference - 240.6(A)
+
+    Parameters
+    ----------
+    custom_sizes : sequence of numeric, optional
+        Non-standard OCPD ratings to add.
+    edition : str, optional
+        NEC edition of the standard sizes, see `editions.get_edition`.
+
+    Returns
+    -------
+    ocpd_sizes : numpy.ndarray
+        Read-only sorted array of OCPD sizes.
 
-def get_cable_sizing_ocpd(ocpd):
+    """
+    if custom_sizes is None:
+        custom_sizes = ()
+    return _get_ocpd_sizes(tuple(sorted(set(np.ravel(custom_sizes).tolist()))),
+                           editions.get_edition(edition).name)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_ccc_derate_index(edition):
+    """
+    Build a dense derate array indexed by current-carrying conductor count.
+
+    Entry n is the derate for n conductors, taken from the first breakpoint
+    of `ccc_count_derate` at or above n. The last entry is the derate for
+    the last breakpoint and above, 41 or more conductors.
+
+    """
+    table = editions.get_edition(edition).ccc_count_derate
+    counts = np.array(sorted(table))
+    derates = np.array([table[count] for count in counts], dtype=float)
+    dense = derates[np.searchsorted(counts, np.arange(counts[-1] + 1))]
+    dense.flags.writeable = False
+    return dense
+
+
+def get_ccc_derate(ccc_count, edition=None):
+    """
+    Determine the derate for the number of current-carrying conductors.
+
+    The count is used directly as an index into a dense derate array, so
+    arrays of counts are derated without a search. Counts at or above the
+    last row of the table, 41, take its derate.
+
+    NEC Reference - 310.15(B)(3)(a)
+
+    Parameters
+    ----------
+    ccc_count : int or array_like of int
+        Current-carrying conductors in the raceway or cable.
+    edition : str or array_like of str, optional
+        NEC edition, see `editions.get_edition`.
+
+    Returns
+    -------
+    ccc_derate : float or numpy.ndarray
+        Adjustment factor for the conductor count, NaN where invalid.
+    invalid : bool or numpy.ndarray
+        True where the count is negative or not a whole number.
+
+    """
+    if np.ndim(edition):
+        return _by_edition(get_ccc_derate, edition, {'ccc_count': ccc_count})
+    dense = _get_ccc_derate_index(editions.get_edition(edition).name)
+    ccc_count = np.asarray(ccc_count)
+    if ccc_count.dtype.kind in 'iu':
+        invalid = ccc_count < 0
+        index = np.clip(ccc_count, 0, len(dense) - 1)
+    else:
+        ccc_count = ccc_count.astype(float)
+        invalid = ~((ccc_count >= 0) & (ccc_count == np.floor(ccc_count)))
+        index = np.where(invalid, 0, np.minimum(ccc_count, len(dense) - 1))
+        index = index.astype(np.intp)
+    ccc_derate = np.where(invalid, np.nan, dense[index])
+    return ccc_derate[()], invalid[()]
+
+
+class _NotCached(Exception):
+    """Raised by `_get_base_wire_size` so invalid inputs are not cached."""
+
+
+@functools.lru_cache(maxsize=4096)
+def _get_base_wire_size(current, cond_material, wire_insulation_temp,
+                        terminal_temp_rating, ccc_count, ambient_temp,
+                        parallel_sets, ocpd_derate, edition):
+    """Size the conductor, raising `_NotCached` for invalid inputs."""
+    tables = editions.get_edition(edition)
+    ccc_derate, invalid = get_ccc_derate(ccc_count, edition=tables)
+    if invalid:
+        _report('ccc_adjustment', 'Current-carrying conductor count should '
+                'be a whole number of zero or more.', ccc_count)
+        raise _NotCached
+    amb_derate = get_ambient_temp_derate(ambient_temp, wire_insulation_temp,
+                                         edition=tables)
+    if amb_derate is None:
+        raise _NotCached
+    ccc_derate = float(ccc_derate)
+
+    parallel_current = current / parallel_sets
+    terminal_check_current = parallel_current / ocpd_derate
+    cond_use_check_current = parallel_current / (ccc_derate * amb_derate)
+
+    ampacities = tables.cable_ampacity_310_16[cond_material]
+    terminal_min_wire = lookup(terminal_check_current,
+                               ampacities[terminal_temp_rating], keys=False)
+    cond_use_min_wire = lookup(cond_use_check_current,
+                               ampacities[wire_insulation_temp], keys=False)
+    if terminal_min_wire is None or cond_use_min_wire is None:
+        raise _NotCached
+
+    return str(max(conductors.CondSize(terminal_min_wire),
+                   conductors.CondSize(cond_use_min_wire)))
+
+
+def get_base_wire_size(current, cond_material, wire_insulation_temp,
+                       terminal_temp_rating=75, ccc_count=3, ambient_temp=30,
+                       parallel_sets=1, ocpd_derate=0.80, edition=None):
+    """
+    Determine the base conductor size required for ampacity.
+
+    The conductor is sized for the larger of two checks:
+    Terminal check - the current divided by `ocpd_derate` using the ampacity
+    column for the terminal temperature rating.
+    Conditions of use check - the current divided by the product of the
+    ambient temperature and current-carrying conductor count derates using
+    the ampacity column for the conductor insulation rating.
+
+    Results are cached in a bounded LRU cache, so circuits with identical
+    inputs are only sized once. Use `get_base_wire_size.cache_info()` for the
+    cache hit and miss counts and `get_base_wire_size.cache_clear()` to empty
+    it. Inputs outside of the tables are not cached, so they are warned
+    about, or recorded when collecting diagnostics, on every call.
+
+    NEC Reference
+    110.14(C) for terminal temperature ratings
+    310.15(B)(2) for ambient temperature correction
+    310.15(B)(3)(a) for current-carrying conductor count adjustment
+    Table 310.15(B)(16) for conductor ampacities
+
+    Parameters
+    ----------
+    current : numeric
+        Circuit current in amps, including the 1.25 factor for DC circuits.
+    cond_material : str
+        Conductor material, 'Cu' or 'Al'.
+    wire_insulation_temp : numeric
+        Wire insulation temperature rating in degrees Celsius.
+        Typically 60, 75, or 90.
+    terminal_temp_rating : numeric, default 75
+        Temperature rating of the equipment terminals in degrees Celsius.
+    ccc_count : int, default 3
+        Current-carrying conductors in the raceway.
+    ambient_temp : numeric, default 30
+        The ambient temperature in degrees Celsius, including any rooftop
+        adder.
+    parallel_sets : int, default 1
+        Number of parallel sets of conductors.
+    ocpd_derate : numeric, default 0.8
+        Rating of the overcurrent protective device. Usually 0.8 or 1.
+    edition : str, optional
+        NEC edition, see `editions.get_edition`.
+
+    Returns
+    -------
+    cond_size : str
+        Conductor size as used for the keys of the NEC tables. None if the
+        inputs are outside of the tables.
+
+    """
+    try:
+        return _get_base_wire_size(current, cond_material,
+                                   wire_insulation_temp, terminal_temp_rating,
+                                   ccc_count, ambient_temp, parallel_sets,
+                                   ocpd_derate, edition)
+    except _NotCached:
+        return None
+
+
+get_base_wire_size.cache_info = _get_base_wire_size.cache_info
+get_base_wire_size.cache_clear = _get_base_wire_size.cache_clear
+
+
+def get_cable_sizing_ocpd(ocpd, custom_sizes=None, edition=None):
     """
     Get next smallest standard OCPD size if OCPD is less than 800A.
 
+    The conductor protected by an OCPD of 800A or less is sized for an
+    ampacity above the next smaller OCPD size, as the next size up is
+    permitted by 240.4(B). OCPD sizes that are not standard sizes use the
+    nearest smaller standard size. OCPD sizes above 800A, and sizes with no
+    smaller standard size, are returned unchanged.
+
+    Any array argument switches to array mode. The next smaller sizes are
+    found with a sorted search of the OCPD sizes and sizes outside of the
+    standard sizes are reported with a single warning giving their count, or
+    recorded row by row when collecting diagnostics.
+
     NEC Reference - 240.4(B) and (C)
 
     Parameters
     ----------
-    ocpd : numeric
+    ocpd : numeric or array_like
         The ocpd size to be used to protect the circuit.
+    custom_sizes : sequence of numeric, optional
+        Non-standard OCPD ratings available in addition to the standard
+        sizes, see `get_ocpd_sizes`.
+    edition : str or array_like of str, optional
+        NEC edition, see `editions.get_edition`.
 
     Returns
     -------
-    next_smallest_ocpd : numeric
+    next_smallest_ocpd : numeric or numpy.ndarray
         The next smallest standard ocpd size to be used for checking cable
-        ampacity.
+        ampacity. A float array in array mode.
+
+    """
+    if np.ndim(edition):
+        return _by_edition(get_cable_sizing_ocpd, edition,
+                           {'ocpd': np.asarray(ocpd, dtype=float)},
+                           custom_sizes=custom_sizes)
+    ocpd_sizes = get_ocpd_sizes(custom_sizes, edition)
+    if np.ndim(ocpd):
+        ocpd = np.asarray(ocpd, dtype=float)
+        invalid = (ocpd < ocpd_sizes[0]) | (ocpd > ocpd_sizes[-1])
+        out_of_range = np.count_nonzero(invalid)
+        if out_of_range:
+            _report('standard_ocpd', '{} of {} OCPD sizes are above or below '
+                    'the standard OCPD sizes.'.format(out_of_range,
+                                                      ocpd.size),
+                    ocpd, invalid)
+        i = np.searchsorted(ocpd_sizes, ocpd, side='left')
+        next_smallest = ocpd_sizes[np.maximum(i - 1, 0)]
+        return np.where((ocpd <= 800) & (i > 0), next_smallest, ocpd)
+
+    if ocpd < ocpd_sizes[0] or ocpd > ocpd_sizes[-1]:
+        _report('standard_ocpd', 'OCPD size passed is above or below the '
+                'standard OCPD sizes.', ocpd)
+
+    i = np.searchsorted(ocpd_sizes, ocpd, side='left')
+    if ocpd <= 800 and i > 0:
+        return ocpd_sizes[i - 1].item()
+    return ocpd
+
+
+def _label_codes(values, labels):
+    """
+    Convert an array of labels to their positions in `labels`.
+
+    Values that are not in `labels` are -1, which selects the trailing NaN
+    entry of the padded arrays built by `_get_impedance_arrays`.
+
+    """
+    values = np.asarray(values)
+    if values.dtype.kind not in 'biufUS':
+        values = values.astype(object)
+    unique, inverse = np.unique(values, return_inverse=True)
+    positions = {label: i for i, label in enumerate(labels)}
+    lut = np.array([positions.get(val.item() if hasattr(val, 'item') else val,
+                                  -1) for val in unique], dtype=np.intp)
+    return lut[inverse].reshape(values.shape)
+
+
+def _size_codes(cond_size):
+    """Convert conductor sizes or size ordinals to size ordinals."""
+    cond_size = np.asarray(cond_size)
+    if cond_size.dtype.kind in 'iu':
+        return np.where((cond_size >= 0) & (cond_size < len(nec.cond_sizes)),
+                        cond_size, -1)
+    return conductors.to_ordinals(cond_size)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_impedance_arrays(edition):
+    """
+    Build resistance and reactance arrays indexed by size ordinal.
+
+    Each axis has a trailing NaN entry, so a -1 code for an unknown
+    material, conduit or size gives NaN.
+
+    Returns
+    -------
+    r_dc : numpy.ndarray
+        DC resistance with shape (cond material, size).
+    r_ac : numpy.ndarray
+        AC resistance with shape (cond material, conduit material, size).
+    x_l : numpy.ndarray
+        AC reactance with shape (conduit material, size).
+    conduit_codes : dict
+        Conduit material position for each conduit type.
+
+    """
+    tables = editions.get_edition(edition)
+    sizes = len(tables.cond_sizes)
+    r_dc = np.full((len(COND_MATERIALS) + 1, sizes + 1), np.nan)
+    r_ac = np.full((len(COND_MATERIALS) + 1, len(CONDUIT_MATERIALS) + 1,
+                    sizes + 1), np.nan)
+    x_l = np.full((len(CONDUIT_MATERIALS) + 1, sizes + 1), np.nan)
+
+    ac_tables = {'Cu': tables.cond_resistance_cu,
+                 'Al': tables.cond_resistance_alum}
+    dc_labels = {'Cu': 'Cu', 'Al': 'Alum'}
+    for i, material in enumerate(COND_MATERIALS):
+        r_dc[i, :-1] = _row_array(
+            tables.cond_resistance_dc[dc_labels[material]])
+        for j, conduit_material in enumerate(CONDUIT_MATERIALS):
+            r_ac[i, j, :-1] = _row_array(
+                ac_tables[material][conduit_material])
+    for j, conduit_material in enumerate(CONDUIT_MATERIALS):
+        x_l[j, :-1] = _row_array(tables.cond_reactance[conduit_material])
+
+    conduit_codes = {conduit: CONDUIT_MATERIALS.index(material)
+                     for conduit, material in tables.conduit_material.items()}
+    for array in (r_dc, r_ac, x_l):
+        array.flags.writeable = False
+    return r_dc, r_ac, x_l, conduit_codes
+
+
+def _row_array(view):
+    """Return the values of a packed table view with NaN for gaps."""
+    values, present = view.values_array()
+    return np.where(present, values, np.nan)
+
+
+def get_voltage_drop(current, length, cond_size, voltage, voltage_type='AC',
+                     cond_material='Cu', conduit_type='EMT', parallel_sets=1,
+                     power_factor=0.9, phase_count=3, edition=None):
+    """
+    Calculate voltage drop for circuits in volts and percent.
+
+    All arguments may be arrays and are broadcast against each other, so a
+    whole circuit schedule is calculated in one pass. Rows with a conductor
+    size, material or conduit type that is not in the tables are NaN.
+
+    DC voltage drop uses the two-way length and the DC resistance. AC
+    voltage drop uses the effective impedance for the power factor,
+    Z = R * PF + X * sin(arccos(PF)), and a factor of the square root of 3
+    for three phase circuits or 2 for single phase circuits.
+
+    NEC Reference - Chapter 9, Table 8 and Table 9
+    Informational notes to 210.19(A)(1) and 215.2(A)(1) recommend a
+    maximum voltage drop of 3 percent for branch circuits and feeders.
+
+    Parameters
+    ----------
+    current : numeric or array_like
+        Circuit current in amps.
+    length : numeric or array_like
+        One-way length of the circuit in feet.
+    cond_size : str, int or array_like
+        Conductor sizes as NEC table keys, e.g. '1/0', or size ordinals.
+    voltage : numeric or array_like
+        Circuit voltage, line to line for three phase circuits.
+    voltage_type : str or array_like of str, default 'AC'
+        Either 'AC' or 'DC'.
+    cond_material : str or array_like of str, default 'Cu'
+        Conductor material, 'Cu' or 'Al'.
+    conduit_type : str or array_like of str, default 'EMT'
+        Conduit type from `nec_tables.conduit_type`, which sets the conduit
+        material for the AC resistance and reactance.
+    parallel_sets : int or array_like, default 1
+        Number of parallel sets of conductors.
+    power_factor : numeric or array_like, default 0.9
+        Power factor for AC circuits.
+    phase_count : int or array_like, default 3
+        Number of phases for AC circuits, 1 or 3.
+    edition : str or array_like of str, optional
+        NEC edition, see `editions.get_edition`.
+
+    Returns
+    -------
+    v_drop_volts : numpy.ndarray
+        Voltage drop in volts.
+    v_drop_percent : numpy.ndarray
+        Voltage drop as a percent of `voltage`.
+
+    """
+    if np.ndim(edition):
+        return _by_edition(
+            get_voltage_drop, edition,
+            {'current': current, 'length': length, 'cond_size': cond_size,
+             'voltage': voltage, 'voltage_type': voltage_type,
+             'cond_material': cond_material, 'conduit_type': conduit_type,
+             'parallel_sets': parallel_sets, 'power_factor': power_factor,
+             'phase_count': phase_count})
+    r_dc, r_ac, x_l, conduit_codes = _get_impedance_arrays(
+        editions.get_edition(edition).name)
+
+    size = _size_codes(cond_size)
+    material = _label_codes(cond_material, COND_MATERIALS)
+    conduit = _conduit_codes(conduit_type, conduit_codes)
+    is_dc = np.asarray(voltage_type) == 'DC'
+
+    ohms_per_kft = _ohms_per_kft(r_dc, r_ac, x_l, size, material, conduit,
+                                 is_dc, power_factor)
+    v_drop_volts = (_drop_factor(is_dc, phase_count) *
+                    np.asarray(current, dtype=float) *
+                    ohms_per_kft * np.asarray(length, dtype=float) / 1000 /
+                    np.asarray(parallel_sets, dtype=float))
+    v_drop_percent = 100 * v_drop_volts / np.asarray(voltage, dtype=float)
+    return v_drop_volts, v_drop_percent
+
+
+def _conduit_codes(conduit_type, conduit_codes):
+    """Convert conduit types to conduit material positions."""
+    conduit = _label_codes(conduit_type, list(conduit_codes))
+    return np.append(list(conduit_codes.values()), -1)[conduit]
+
+
+def _ohms_per_kft(r_dc, r_ac, x_l, size, material, conduit, is_dc,
+                  power_factor):
+    """DC resistance or AC effective impedance per 1000 feet."""
+    power_factor = np.asarray(power_factor, dtype=float)
+    z_eff = (r_ac[material, conduit, size] * power_factor +
+             x_l[conduit, size] * np.sin(np.arccos(power_factor)))
+    return np.where(is_dc, r_dc[material, size], z_eff)
+
+
+def _drop_factor(is_dc, phase_count):
+    """Length factor of 2 for DC and single phase, root 3 for 3 phase."""
+    ac_factor = np.where(np.asarray(phase_count) == 3, np.sqrt(3), 2.0)
+    return np.where(is_dc, 2.0, ac_factor)
+
+
+def _backfill_sizes(array):
+    """
+    Fill gaps along the size axis with the next larger size that has data.
+
+    Returns the filled array and the ordinal of the size each entry was
+    filled from, -1 where there is no larger size with data.
+
+    """
+    sizes = array.shape[-1]
+    ordinals = np.where(np.isnan(array), sizes, np.arange(sizes))
+    ordinals = np.minimum.accumulate(ordinals[..., ::-1], axis=-1)[..., ::-1]
+    filled = np.take_along_axis(np.append(array, np.full(
+        array.shape[:-1] + (1,), np.nan), axis=-1), ordinals, axis=-1)
+    return filled, np.where(ordinals == sizes, -1, ordinals)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_upsizing_arrays(edition):
+    """
+    Build impedance arrays with gaps filled for the voltage drop search.
+
+    Sizes without Chapter 9 Table 9 data take the values of the next larger
+    size with data, so the impedance never increases with the size ordinal
+    up to the largest size with data. The search result is then mapped to a
+    size with data using the returned ordinal maps.
+
+    """
+    r_dc, r_ac, x_l, conduit_codes = _get_impedance_arrays(edition)
+    r_dc, next_dc = _backfill_sizes(r_dc)
+    r_ac, next_ac = _backfill_sizes(r_ac)
+    x_l, _ = _backfill_sizes(x_l)
+    last_dc = next_dc.max(axis=-1)
+    last_ac = next_ac.max(axis=-1)
+    return (r_dc, r_ac, x_l, conduit_codes, next_dc, next_ac, last_dc,
+            last_ac)
+
+
+def get_voltage_drop_size(current, length, voltage, max_v_drop_percent=2.0,
+                          base_size=0, voltage_type='AC', cond_material='Cu',
+                          conduit_type='EMT', parallel_sets=1,
+                          max_parallel_sets=None, power_factor=0.9,
+                          phase_count=3, edition=None):
+    """
+    Find the smallest conductors that meet a voltage drop limit.
+
+    For each number of parallel sets from `parallel_sets` to
+    `max_parallel_sets` the smallest size, not smaller than `base_size`,
+    that meets the voltage drop limit is found with a binary search over the
+    ordered conductor sizes. The combination with the least total conductor
+    area, parallel sets times circular mils, is returned. Ties go to fewer
+    parallel sets. All arguments may be arrays and every circuit is searched
+    at the same time.
+
+    Only sizes with Chapter 9 Table 9 data are returned. Sizes 1/0 and
+    larger are required when sets are added, per 310.10(H)(1).
+
+    Parameters
+    ----------
+    current : numeric or array_like
+        Circuit current in amps.
+    length : numeric or array_like
+        One-way length of the circuit in feet.
+    voltage : numeric or array_like
+        Circuit voltage, line to line for three phase circuits.
+    max_v_drop_percent : numeric or array_like, default 2.0
+        Voltage drop limit as a percent of `voltage`.
+    base_size : str, int or array_like, default 0
+        Smallest size allowed, usually the size required for ampacity from
+        `get_base_wire_size`. Size strings or ordinals.
+    voltage_type, cond_material, conduit_type, power_factor, phase_count
+        See `get_voltage_drop`.
+    parallel_sets : int or array_like, default 1
+        Number of parallel sets the `base_size` was selected for.
+    max_parallel_sets : int, optional
+        Largest number of parallel sets to consider. Defaults to
+        `parallel_sets`, so only the size is increased.
+    edition : str or array_like of str, optional
+        NEC edition, see `editions.get_edition`.
+
+    Returns
+    -------
+    cond_size : numpy.ndarray
+        Size ordinals, -1 where no combination meets the limit. Use
+        `conductors.to_sizes` to convert to size strings.
+    parallel_sets : numpy.ndarray
+        Number of parallel sets, 0 where no combination meets the limit.
+    v_drop_percent : numpy.ndarray
+        Voltage drop of the selected conductors, NaN where no combination
+        meets the limit.
+
+    """
+    if np.ndim(edition):
+        return _by_edition(
+            get_voltage_drop_size, edition,
+            {'current': current, 'length': length, 'voltage': voltage,
+             'max_v_drop_percent': max_v_drop_percent,
+             'base_size': _size_codes(base_size),
+             'voltage_type': voltage_type, 'cond_material': cond_material,
+             'conduit_type': conduit_type, 'parallel_sets': parallel_sets,
+             'power_factor': power_factor, 'phase_count': phase_count},
+            max_parallel_sets=(int(np.max(parallel_sets, initial=1))
+                               if max_parallel_sets is None
+                               else max_parallel_sets))
+    edition = editions.get_edition(edition).name
+    (r_dc, r_ac, x_l, conduit_codes, next_dc, next_ac, last_dc,
+     last_ac) = _get_upsizing_arrays(edition)
+
+    base_size = _size_codes(base_size)
+    material = _label_codes(cond_material, COND_MATERIALS)
+    conduit = _conduit_codes(conduit_type, conduit_codes)
+    is_dc = np.asarray(voltage_type) == 'DC'
+    current, length, voltage, max_v_drop_percent, base_size, material, \
+        conduit, is_dc, power_factor, phase_count, min_sets = \
+        np.broadcast_arrays(
+            np.asarray(current, dtype=float), np.asarray(length, dtype=float),
+            np.asarray(voltage, dtype=float),
+            np.asarray(max_v_drop_percent, dtype=float), base_size,
+            material, conduit, is_dc, np.asarray(power_factor, dtype=float),
+            np.asarray(phase_count), np.asarray(parallel_sets))
+    if max_parallel_sets is None:
+        max_parallel_sets = int(min_sets.max(initial=1))
+
+    # Largest impedance per 1000 feet of one set that meets the limit, any
+    # impedance meets it for zero current or length.
+    with np.errstate(divide='ignore', invalid='ignore'):
+        max_ohms = (max_v_drop_percent * voltage * 1000 /
+                    (100 * _drop_factor(is_dc, phase_count) * current *
+                     length))
+    last = np.where(is_dc, last_dc[material], last_ac[material, conduit])
+    unknown = (material < 0) | (conduit < 0) | (base_size < 0)
+
+    best_size = np.full(current.shape, -1, dtype=np.intp)
+    best_sets = np.zeros(current.shape, dtype=np.intp)
+    best_area = np.full(current.shape, np.inf)
+    parallel_min = conductors.CondSize('1/0')
+    for sets in range(int(min_sets.min(initial=1)), max_parallel_sets + 1):
+        lo = base_size
+        if sets > 1:
+            lo = np.where(sets > min_sets, np.maximum(lo, parallel_min), lo)
+        hi = last
+        active = ~unknown & (sets >= min_sets) & (lo <= hi)
+        lo = np.minimum(lo, hi)
+        passes = _ohms_per_kft(r_dc, r_ac, x_l, hi, material, conduit, is_dc,
+                               power_factor) <= max_ohms * sets
+        active &= passes
+        while True:
+            searching = active & (lo < hi)
+            if not searching.any():
+                break
+            mid = (lo + hi) // 2
+            passes = _ohms_per_kft(r_dc, r_ac, x_l, mid, material, conduit,
+                                   is_dc, power_factor) <= max_ohms * sets
+            hi = np.where(searching & passes, mid, hi)
+            lo = np.where(searching & ~passes, mid + 1, lo)
+
+        size = np.where(is_dc, next_dc[material, lo],
+                        next_ac[material, conduit, lo])
+        area = sets * conductors.CIRCULAR_MILS[size]
+        better = active & (area < best_area)
+        best_size = np.where(better, size, best_size)
+        best_sets = np.where(better, sets, best_sets)
+        best_area = np.where(better, area, best_area)
+
+    _, v_drop_percent = get_voltage_drop(
+        current, length, best_size, voltage, voltage_type=np.where(
+            is_dc, 'DC', 'AC'), cond_material=cond_material,
+        conduit_type=conduit_type, parallel_sets=np.maximum(best_sets, 1),
+        power_factor=power_factor, phase_count=phase_count, edition=edition)
+    v_drop_percent = np.where(best_size < 0, np.nan, v_drop_percent)
+    return best_size, best_sets, v_drop_percent
+
+
+@functools.lru_cache(maxsize=None)
+def _get_conduit_fill_index(edition):
+    """
+    Build the allowable fill areas for each conduit type and fill class.
+
+    Fill classes are one conductor, two conductors and over two conductors
+    from Chapter 9, Table 1. The allowable areas for each conduit type and
+    fill class are sorted by trade size, so the smallest conduit for a
+    required area is a binary search.
+
+    Returns
+    -------
+    fill_index : dict
+        Maps conduit type position * 3 + fill class to a tuple of the
+        allowable fill areas and the matching trade sizes.
+
+    """
+    tables = editions.get_edition(edition)
+    fill_index = {}
+    for i, conduit_type in enumerate(tables.conduit_type):
+        trade_sizes = np.array(list(tables.conduit_area[conduit_type]))
+        areas = np.array(list(tables.conduit_area[conduit_type].values()))
+        for fill_class, (_, fill) in enumerate(tables.condiut_xsection):
+            allowable = areas * fill
+            if np.any(np.diff(allowable) <= 0):
+                raise ValueError('Conduit areas for {} are not sorted by '
+                                 'trade size.'.format(conduit_type))
+            key = i * len(tables.condiut_xsection) + fill_class
+            fill_index[key] = (allowable, trade_sizes)
+    return fill_index
+
 
+def get_conduit_size(cond_count, cond_size, egc_size=None, neutral=0,
+                     conduit_type='EMT', conduit_size_SF=1.3,
+                     cond_insulation='THHN', edition=None):
     """
-    if ocpd < nec.ocpd_sizes[0] or ocpd > nec.ocpd_sizes[-1]:
-        warnings.warn('OCPD size passed is above or below the standard '
-                      'OCPD sizes.')
+    Determine the smallest conduit trade size for the conductors.
+
+    The conductor area, multiplied by `conduit_size_SF`, is compared to the
+    allowable fill of each trade size. All arguments except
+    `cond_insulation` may be arrays and are broadcast against each other.
+
+    NEC Reference
+    Chapter 9, Table 1 for the percent of cross section allowed
+    Chapter 9, Table 4 for conduit areas
+    Chapter 9, Table 5 for conductor areas
+
+    Parameters
+    ----------
+    cond_count : int or array_like
+        Number of current-carrying conductors.
+    cond_size : str, int or array_like
+        Size of the current-carrying conductors, size strings or ordinals.
+    egc_size : str, int or array_like, optional
+        Size of the equipment grounding conductor. No EGC is included in the
+        conduit when None.
+    neutral : int or array_like, default 0
+        Number of additional conductors the same size as the
+        current-carrying conductors, usually 1 to include a neutral.
+    conduit_type : str or array_like of str, default 'EMT'
+        Conduit type from `nec_tables.conduit_type`.
+    conduit_size_SF : numeric or array_like, default 1.3
+        Safety factor applied to the conductor area.
+    cond_insulation : str, default 'THHN'
+        Conductor insulation type from `nec_tables.cond_area_insulation`.
+        Other insulation types have no conductor areas and give NaN.
+    edition : str or array_like of str, optional
+        NEC edition, see `editions.get_edition`.
+
+    Returns
+    -------
+    conduit_size : numpy.ndarray
+        Conduit trade size in inches, NaN where no trade size is large
+        enough or an input is not in the tables.
 
-    if ocpd <= 800:
-        for i, standard_ocpd in enumerate(nec.ocpd_sizes):
-            if standard_ocpd == ocpd:
-                return nec.ocpd_sizes[i - 1]
+    """
+    if np.ndim(edition):
+        return _by_edition(
+            get_conduit_size, edition,
+            {'cond_count': cond_count, 'cond_size': _size_codes(cond_size),
+             'egc_size': (None if egc_size is None
+                          else _size_codes(egc_size)),
+             'neutral': neutral, 'conduit_type': conduit_type,
+             'conduit_size_SF': conduit_size_SF},
+            cond_insulation=cond_insulation)
+    tables = editions.get_edition(edition)
+    fill_index = _get_conduit_fill_index(tables.name)
+    area_insulation = tables.cond_area_insulation.get(cond_insulation)
+    if area_insulation is None:
+        areas = np.full(len(tables.cond_sizes) + 1, np.nan)
     else:
-        return ocpd
-
-# class Circuit(object):
-#     """docstring for circuits.
-#     parent class for dc and ac circuits
-#     Attributes
-#     ----------
-#     name: string
-#     start: string
-#         originating equipment of the circuit
-#     end: string
-#         terminating equipment of the circuit
-#     voltage: int
-#         design voltage for circuit- 480, 277, 120, 12470
-#     current: float
-#     length: float
-#         length of circuit in feet
-#     parallel_sets: int
-#         number of paralle sets of conductors
-#     ccc_count: int
-#         Current carrying conductors per conduit. Does not include neutral.
-#         For the conditions of use derate calculations
-#     height_above_roof: float
-#         height above roof in inches
-#     temp_high_amb: float
-#         Degrees Fahrenheit
-#         Recommended ASHRAE design 2 percent high
-#         Passed by parent class in future?
-#     cond_material: string
-#         Conductor metal as "Cu" or "Al"
-#     cond_insulation: string
-#         Conductor insulation type
-#     cond_size_base: string
-#     egc_material: string
-#         Equipment ground condcutor metal as "Cu" or "Al"
-#     egc_size_base: string
-#         Equipment ground condcutor size
-#     neutral: int
-#         Use 1 to include neutral in conduit size calculation.
-#         Integer > 1 to add condcutors the same size as the currenty carrying
-#     conduit_size_SF: float
-#         Safety factor for conduit size calculation.
-#         Default is 1.3
-#     conduit_type: string
-#
-#     Internal Attributes
-#     ___________________
-#     ocpd
-#     rooftop_adder
-#     cond_size_base
-#     egc_size_base
-#     v_drop_volts
-#     v_drop_percent
-#     v_drop_in_range
-#     conduit_size
-#
-#     """
-#     def __init__(self, name=None, start=None, end=None,
-#                  voltage=None, current=None, length=None, parallel_sets=1,
-#                  ccc_count=3, height_above_roof=3.5, temp_high_amb=None,
-#                  cond_metal=None, cond_insulation=None, cond_size=None,
-#                  egc_metal='Cu', egc_size_base=None, neutral=1,
-#                  conduit_size_SF=1.3,
-#                  conduit_type='EMT'):
-#         super(Circuit, self).__init__()
-#         self.name = name
-#         self.start = start
-#         self.end = end
-#         self.voltage = voltage
-#         self.current = current
-#         self.length = length
-#         self.parallel_sets = parallel_sets
-#         self.ccc_count = ccc_count
-#         self.height_above_roof = height_above_roof
-#         self.temp_high_amb = temp_high_amb
-#         self.cond_metal = cond_metal
-#         self.cond_insulation = cond_insulation
-#         self.cond_size = cond_size
-#         self.egc_metal = egc_metal
-#         self.egc_size_base = egc_size_base
-#         self.neutral = neutral
-#         self.conduit_size_SF = conduit_size_SF
-#         self.conduit_type = conduit_type
-#
-#         self.ocpd = lookup(self.current * 1.25, nec_tables.ocpd_sizes)
-#
-#     def _update_attribute(self, arg):
-#         """
-#         Set attribute and recalulate dependent values.
-#         """
-#         pass
-#
-#     def _get_amb_temp_plus_rooftop_adder(self):
-#         """[Needs to be updated]
-#         Table removed in NEC 2017 (now only a single value), valid for 2008,
-#         2011, 2014
-#         Temperatures in Fahrenheit
-#         """
-#         if self.height_above_roof == -1:
-#             return self.temp_high_amb
-#         elif self.height_above_roof <= 0.5:
-#             return self.temp_high_amb + 60
-#         elif self.height_above_roof <= 3.5:
-#             return self.temp_high_amb + 40
-#         elif self.height_above_roof <= 12:
-#             return self.temp_high_amb + 30
-#         elif self.height_above_roof <= 36:
-#             return self.temp_high_amb + 25
-#         elif self.height_above_roof > 36:
-#             return self.temp_high_amb + 0
-#
-#     def get_amb_temp_derate(self):
-#         """Write method to use the top level function."""
-#         pass
-#
-#     def _cond_per_raceway_derate(self):
-#         """[Needs to be updated]
-#         NEC 310.15(B)(3)(a) Adjustment factors for more than three
-#         current-carrying conductors in a raceway or cable
-#         """
-#         if self.ccc_count < 4:
-#             return(1.0)
-#         elif self.ccc_count <= 6:
-#             return(0.8)
-#         elif self.ccc_count <= 9:
-#             return(0.7)
-#         elif self.ccc_count <= 20:
-#             return(0.5)
-#         elif self.ccc_count <= 30:
-#             return(0.45)
-#         elif self.ccc_count <= 40:
-#             return(0.4)
-#         elif self.ccc_count >= 41:
-#             return(0.35)
-#
-#
-# class DcCircuit(Circuit):
-#     """docstring for DcCircuit.
-#     Class for AC circuits.
-#
-#     """
-#     def __init__(self, name=None, ccc_count=2):
-#         super(DcCircuit, self).__init__()
-#         self.name = name
-#         self.ccc_count = ccc_count
-#
-# class AcCircuit(Circuit):
-#     """docstring for AcCircuit.
-#     Class for AC circuits.
-#     """
-#     def __init__(self, arg):
-#         super(AcCircuit, self).__init__()
-#         self.arg = arg
-#
-# if __name__ == '__main__':
-#     main()
+        areas, present = tables.cond_area[area_insulation].values_array()
+        areas = np.append(np.where(present, areas, np.nan), np.nan)
+
+    cond_count = np.asarray(cond_count)
+    neutral = np.asarray(neutral)
+    wire_count = cond_count + neutral
+    cond_area = wire_count * areas[_size_codes(cond_size)]
+    if egc_size is None:
+        total_count = wire_count
+    else:
+        total_count = wire_count + 1
+        cond_area = cond_area + areas[_size_codes(egc_size)]
+
+    required_area = cond_area * np.asarray(conduit_size_SF, dtype=float)
+    conduit = _label_codes(conduit_type, tables.conduit_type)
+    fill_class = np.clip(total_count, 1, len(tables.condiut_xsection)) - 1
+    required_area, conduit, fill_class = np.broadcast_arrays(
+        required_area, conduit, fill_class)
+
+    conduit_size = np.full(required_area.shape, np.nan)
+    valid = (conduit >= 0) & ~np.isnan(required_area)
+    keys = conduit * len(tables.condiut_xsection) + fill_class
+    for key in np.unique(keys[valid]):
+        rows = valid & (keys == key)
+        allowable, trade_sizes = fill_index[key]
+        i = np.searchsorted(allowable, required_area[rows], side='left')
+        fits = i < allowable.size
+        sizes = np.full(i.shape, np.nan)
+        sizes[fits] = trade_sizes[i[fits]]
+        conduit_size[rows] = sizes
+    if area_insulation is None:
+        _report('conductor_area', 'Conductor insulation {} has no Chapter 9 '
+                'Table 5 areas.'.format(cond_insulation),
+                np.full(conduit_size.shape, cond_insulation, dtype=object)[()])
+    return conduit_size[()]
+
+
+@functools.lru_cache(maxsize=None)
+def _get_egc_index(edition):
+    """
+    Build the sorted OCPD breakpoints and EGC size ordinals of Table 250.122.
+
+    Returns
+    -------
+    breakpoints : numpy.ndarray
+        OCPD ratings from `nec_tables.egc_sizes`, sorted.
+    egc_ordinals : numpy.ndarray
+        EGC size ordinals with shape (cond material, breakpoint). A trailing
+        row and column of -1 is selected by unknown materials and OCPDs above
+        the table.
+
+    """
+    egc_sizes = editions.get_edition(edition).egc_sizes
+    breakpoints = np.array(sorted(egc_sizes), dtype=float)
+    egc_ordinals = np.full((len(COND_MATERIALS) + 1, breakpoints.size + 1),
+                           -1, dtype=np.intp)
+    for i, material in enumerate(COND_MATERIALS):
+        egc_ordinals[i, :-1] = conductors.to_ordinals(
+            [egc_sizes[ocpd][material] for ocpd in sorted(egc_sizes)])
+    breakpoints.flags.writeable = False
+    egc_ordinals.flags.writeable = False
+    return breakpoints, egc_ordinals
+
+
+def get_egc_size(ocpd, cond_material='Cu', cond_size=None,
+                 base_cond_size=None, edition=None):
+    """
+    Determine the equipment grounding conductor (EGC) size.
+
+    All arguments may be arrays and are broadcast against each other.
+
+    NEC Reference
+    Table 250.122 for the minimum EGC size for the OCPD rating
+    250.122(A) the EGC is not required to be larger than the circuit
+    conductors
+    250.122(B) the EGC is increased in proportion to the circular mil area
+    when the circuit conductors are increased in size, e.g. for voltage drop
+
+    Parameters
+    ----------
+    ocpd : numeric or array_like
+        Rating of the OCPD protecting the circuit in amps.
+    cond_material : str or array_like of str, default 'Cu'
+        EGC material, 'Cu' or 'Al'.
+    cond_size : str, int or array_like, optional
+        Size of the circuit conductors, size strings or ordinals. The EGC is
+        limited to this size.
+    base_cond_size : str, int or array_like, optional
+        Size of the circuit conductors required for ampacity. When smaller
+        than `cond_size` the EGC is increased in proportion to the ratio of
+        the circular mil areas of `cond_size` and `base_cond_size`.
+    edition : str or array_like of str, optional
+        NEC edition, see `editions.get_edition`.
+
+    Returns
+    -------
+    egc_size : numpy.ndarray
+        EGC size ordinals, -1 where the OCPD is above Table 250.122 or an
+        input is not in the tables. Use `conductors.to_sizes` to convert to
+        size strings.
+
+    """
+    if np.ndim(edition):
+        return _by_edition(
+            get_egc_size, edition,
+            {'ocpd': np.asarray(ocpd, dtype=float),
+             'cond_material': cond_material,
+             'cond_size': (None if cond_size is None
+                           else _size_codes(cond_size)),
+             'base_cond_size': (None if base_cond_size is None
+                                else _size_codes(base_cond_size))})
+    breakpoints, egc_ordinals = _get_egc_index(
+        editions.get_edition(edition).name)
+    i = np.searchsorted(breakpoints, np.asarray(ocpd, dtype=float),
+                        side='left')
+    material = _label_codes(cond_material, COND_MATERIALS)
+    egc_size = egc_ordinals[material, i]
+
+    if cond_size is not None:
+        cond_size = _size_codes(cond_size)
+        if base_cond_size is not None:
+            base_cond_size = _size_codes(base_cond_size)
+            ratio = (conductors.CIRCULAR_MILS[cond_size] /
+                     conductors.CIRCULAR_MILS[base_cond_size])
+            upsized = (cond_size > base_cond_size) & (base_cond_size >= 0)
+            required_cmil = conductors.CIRCULAR_MILS[egc_size] * ratio
+            # Smallest size with at least the required area. Tolerance keeps
+            # rounding from pushing an exact match to the next size.
+            proportional = np.searchsorted(conductors.CIRCULAR_MILS,
+                                           required_cmil * (1 - 1e-9),
+                                           side='left')
+            egc_size = np.where(upsized & (egc_size >= 0),
+                                proportional, egc_size)
+        egc_size = np.where((egc_size >= 0) & (cond_size >= 0),
+                            np.minimum(egc_size, cond_size), -1)
+    return egc_size[()]
+
+
+@functools.lru_cache(maxsize=None)
+def _get_ampacity_index(table_name, edition):
+    """
+    Build ampacity arrays by size ordinal for one NEC ampacity table.
+
+    Sizes missing from the table take the ampacity of the next larger size,
+    so each (material, insulation temperature) row is sorted and can be
+    searched with searchsorted. Search results are mapped back to sizes in
+    the table with the returned ordinal map.
+
+    Returns
+    -------
+    ampacity : numpy.ndarray
+        Filled ampacities with shape (cond material, insulation temp, size).
+    next_size : numpy.ndarray
+        Size ordinal each entry of `ampacity` was taken from.
+    temps : tuple
+        Insulation temperatures along the second axis.
+
+    """
+    table = editions.get_edition(edition).tables[table_name]
+    temps = table.labels[1]
+    ampacity = np.full((len(COND_MATERIALS), len(temps), len(nec.cond_sizes)),
+                       np.nan)
+    for i, material in enumerate(COND_MATERIALS):
+        for j, temp in enumerate(temps):
+            values, present = table[material][temp].values_array()
+            ampacity[i, j] = np.where(present, values, np.nan)
+    ampacity, next_size = _backfill_sizes(ampacity)
+    ampacity.flags.writeable = False
+    next_size.flags.writeable = False
+    return ampacity, next_size, temps
+
+
+def get_ampacity_size(ampacity, cond_material, wire_insulation_temp,
+                      table='cable_ampacity_310_16', edition=None):
+    """
+    Find the smallest conductor with at least the required ampacity.
+
+    Array version of looking up a conductor size from the values of an
+    ampacity table, e.g.
+    ``lookup(ampacity, cable_ampacity_310_16['Cu'][90], keys=False)``.
+    Arguments are broadcast against each other and each combination of
+    material and temperature rating is searched with searchsorted.
+
+    Parameters
+    ----------
+    ampacity : numeric or array_like
+        Required conductor ampacity in amps.
+    cond_material : str or array_like of str
+        Conductor material, 'Cu' or 'Al'.
+    wire_insulation_temp : numeric or array_like
+        Temperature column of the ampacity table, 60, 75, or 90.
+    table : str, default 'cable_ampacity_310_16'
+        Name of the ampacity table in `nec_tables`.
+    edition : str or array_like of str, optional
+        NEC edition, see `editions.get_edition`. Only the editions used are
+        loaded.
+
+    Returns
+    -------
+    cond_size : numpy.ndarray
+        Size ordinals, -1 where the ampacity is above the table or an input
+        is not in the table.
+
+    """
+    if np.ndim(edition):
+        return _by_edition(get_ampacity_size, edition,
+                           {'ampacity': np.asarray(ampacity, dtype=float),
+                            'cond_material': cond_material,
+                            'wire_insulation_temp': wire_insulation_temp},
+                           table=table)
+    amp_table, next_size, temps = _get_ampacity_index(
+        table, editions.get_edition(edition).name)
+    ampacity, material, temp = np.broadcast_arrays(
+        np.asarray(ampacity, dtype=float),
+        _label_codes(cond_material, COND_MATERIALS),
+        _label_codes(wire_insulation_temp, temps))
+    return _search_ampacity(amp_table, next_size, ampacity, material,
+                            temp)[()]
+
+
+def _search_ampacity(amp_table, next_size, ampacity, material, temp):
+    """
+    Search the ampacity index for arrays of material and temperature codes.
+
+    Rows are grouped by (material, temperature) so each group is one
+    searchsorted call. Returns size ordinals, -1 where nothing fits.
+
+    """
+    cond_size = np.full(ampacity.shape, -1, dtype=np.intp)
+    valid = (material >= 0) & (temp >= 0) & ~np.isnan(ampacity)
+    n_temps = amp_table.shape[1]
+    keys = material * n_temps + temp
+    for key in np.unique(keys[valid]):
+        rows = valid & (keys == key)
+        i, j = divmod(int(key), n_temps)
+        pos = np.searchsorted(amp_table[i, j], ampacity[rows], side='left')
+        in_table = pos < len(nec.cond_sizes)
+        sizes = np.full(pos.shape, -1, dtype=np.intp)
+        sizes[in_table] = next_size[i, j, pos[in_table]]
+        cond_size[rows] = sizes
+    return cond_size
+
+
+# Checks that can govern the size from `size_conductors`, indexed by the
+# returned governing check code.
+SIZING_CHECKS = ('terminal', 'conditions_of_use')
+
+
+def size_conductors(current, cond_material, wire_insulation_temp,
+                    terminal_temp_rating=75, ccc_count=3, ambient_temp=30,
+                    parallel_sets=1, ocpd_derate=0.80, derate_digits=None,
+                    ambient_method='equation', table='cable_ampacity_310_16',
+                    edition=None):
+    """
+    Derate and size conductors for ampacity in one pass over arrays.
+
+    Fused array version of `get_base_wire_size`. The ambient temperature
+    and conductor count derates, the continuous duty terminal check and
+    the conditions of use check are calculated for every circuit with
+    array operations, and both checks search the packed ampacity index
+    directly, without building dictionaries or inverting tables.
+
+    Terminal check - the current per parallel set divided by `ocpd_derate`
+    using the ampacity column for the terminal temperature rating.
+    Conditions of use check - the current per parallel set divided by the
+    product of the ambient temperature and conductor count derates using
+    the ampacity column for the conductor insulation rating.
+
+    NEC Reference
+    110.14(C) for terminal temperature ratings
+    310.15(B)(2) for ambient temperature correction
+    310.15(B)(3)(a) for current-carrying conductor count adjustment
+    Table 310.15(B)(16) for conductor ampacities
+
+    Parameters
+    ----------
+    current : numeric or array_like
+        Circuit current in amps, including the 1.25 factor for DC circuits.
+    cond_material : str or array_like of str
+        Conductor material, 'Cu' or 'Al'.
+    wire_insulation_temp : numeric or array_like
+        Wire insulation temperature rating in degrees Celsius.
+    terminal_temp_rating : numeric or array_like, default 75
+        Temperature rating of the equipment terminals in degrees Celsius.
+    ccc_count : int or array_like, default 3
+        Current-carrying conductors in the raceway.
+    ambient_temp : numeric or array_like, default 30
+        The ambient temperature in degrees Celsius, including any rooftop
+        adder.
+    parallel_sets : int or array_like, default 1
+        Number of parallel sets of conductors.
+    ocpd_derate : numeric or array_like, default 0.8
+        Rating of the overcurrent protective device. Usually 0.8 or 1.
+    derate_digits : int, optional
+        Truncate the combined conditions of use derate to this many decimal
+        places, as done in calc_flow_v000.ipynb with 4 digits. By default
+        the derate is not truncated and the sizes match
+        `get_base_wire_size`.
+    ambient_method : str, default 'equation'
+        Ambient derate method, see `get_ambient_temp_derate_array`.
+    table : str, default 'cable_ampacity_310_16'
+        Name of the ampacity table.
+    edition : str or array_like of str, optional
+        NEC edition, see `editions.get_edition`.
+
+    Returns
+    -------
+    cond_size : numpy.ndarray
+        Size ordinals, -1 where the inputs are outside of the tables.
+    ampacity : numpy.ndarray
+        Delivered ampacity of the circuit in amps, the lesser of the
+        terminal column ampacity and the derated insulation column ampacity
+        of the selected size, times the parallel sets. NaN where there is no
+        size.
+    governing_check : numpy.ndarray
+        Index into `SIZING_CHECKS` of the check that set the size, -1 where
+        there is no size.
+
+    """
+    if np.ndim(edition):
+        return _by_edition(
+            size_conductors, edition,
+            {'current': current, 'cond_material': cond_material,
+             'wire_insulation_temp': wire_insulation_temp,
+             'terminal_temp_rating': terminal_temp_rating,
+             'ccc_count': ccc_count, 'ambient_temp': ambient_temp,
+             'parallel_sets': parallel_sets, 'ocpd_derate': ocpd_derate},
+            derate_digits=derate_digits, ambient_method=ambient_method,
+            table=table)
+    tables = editions.get_edition(edition)
+    amp_table, next_size, temps = _get_ampacity_index(table, tables.name)
+    (current, material, insulation, terminal, ccc_count, ambient_temp,
+     parallel_sets, ocpd_derate) = np.broadcast_arrays(
+        np.asarray(current, dtype=float),
+        _label_codes(cond_material, COND_MATERIALS),
+        _label_codes(wire_insulation_temp, temps),
+        _label_codes(terminal_temp_rating, temps),
+        np.asarray(ccc_count), np.asarray(ambient_temp, dtype=float),
+        np.asarray(parallel_sets, dtype=float),
+        np.asarray(ocpd_derate, dtype=float))
+
+    amb_derate, _ = get_ambient_temp_derate_array(
+        ambient_temp, np.asarray(wire_insulation_temp, dtype=float),
+        method=ambient_method, edition=tables)
+    ccc_derate, _ = get_ccc_derate(ccc_count, edition=tables)
+    cond_use_derate = amb_derate * ccc_derate
+    if derate_digits is not None:
+        stepper = 10.0 ** derate_digits
+        cond_use_derate = np.trunc(cond_use_derate * stepper) / stepper
+
+    parallel_current = current / parallel_sets
+    terminal_min_wire = _search_ampacity(
+        amp_table, next_size, parallel_current / ocpd_derate, material,
+        terminal)
+    cond_use_min_wire = _search_ampacity(
+        amp_table, next_size, parallel_current / cond_use_derate, material,
+        insulation)
+
+    no_size = (terminal_min_wire < 0) | (cond_use_min_wire < 0)
+    cond_size = np.where(no_size, -1,
+                         np.maximum(terminal_min_wire, cond_use_min_wire))
+    governing_check = np.where(no_size, -1,
+                               (cond_use_min_wire > terminal_min_wire) * 1)
+
+    # Entries of the filled index at a size in the table are its ampacity.
+    rows = np.flatnonzero(~no_size.ravel())
+    ampacity = np.full(cond_size.size, np.nan)
+    size = cond_size.ravel()[rows]
+    mat = material.ravel()[rows]
+    ampacity[rows] = parallel_sets.ravel()[rows] * np.minimum(
+        amp_table[mat, terminal.ravel()[rows], size],
+        amp_table[mat, insulation.ravel()[rows], size] *
+        cond_use_derate.ravel()[rows])
+    ampacity = ampacity.reshape(cond_size.shape)
+    return cond_size[()], ampacity[()], governing_check[()]
@@ -0,0 +1,133 @@
+import multiprocessing
+import os
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from circuits import CircuitSet, FIELDS, RESULTS
+
+# Shared arrays attached in each worker process by `_attach`.
+_worker = {}
+
+
+def _shared_array(shape, dtype, blocks):
+    """Create an array in a new shared memory block and track the block."""
+    dtype = np.dtype(dtype)
+    size = max(int(np.prod(shape)) * dtype.itemsize, 1)
+    block = shared_memory.SharedMemory(create=True, size=size)
+    blocks.append(block)
+    return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def _attach(n, inputs, outputs):
+    """Pool initializer, attach the shared input and output arrays."""
+    _worker['blocks'] = []
+    _worker['inputs'] = {}
+    _worker['outputs'] = {}
+    for name, (block_name, dtype, labels) in inputs.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        _worker['blocks'].append(block)
+        _worker['inputs'][name] = (
+            np.ndarray(n, dtype=dtype, buffer=block.buf), labels)
+    for name, (block_name, dtype) in outputs.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        _worker['blocks'].append(block)
+        _worker['outputs'][name] = np.ndarray(n, dtype=dtype,
+                                              buffer=block.buf)
+
+
+def _size_chunk(rows):
+    """Size one chunk of circuits and write the results to shared memory."""
+    start_time = time.perf_counter()
+    start, stop = rows
+    columns = {}
+    for name, (values, labels) in _worker['inputs'].items():
+        values = values[start:stop]
+        columns[name] = values if labels is None else labels[values]
+    results = CircuitSet(n=stop - start, **columns).size()
+    for name, output in _worker['outputs'].items():
+        output[start:stop] = results[name]
+    return os.getpid(), stop - start, time.perf_counter() - start_time
+
+
+def size_circuits(circuits, workers=None, chunk_size=10000):
+    """
+    Size a circuit schedule in parallel across a process pool.
+
+    The input columns are copied once into shared memory, with text columns
+    stored as integer codes, and each worker sizes chunks of rows with
+    `CircuitSet.size`, writing the results straight into shared result
+    arrays. No per-circuit objects are pickled. Circuits are sized
+    independently, so the results are identical to
+    ``circuits.size()`` regardless of the chunk size or worker count.
+
+    Parameters
+    ----------
+    circuits : CircuitSet
+        Circuits to size. The circuit set itself is not modified.
+    workers : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+    chunk_size : int, default 10000
+        Number of circuits sized per task.
+
+    Returns
+    -------
+    results : dict
+        Result column arrays, the same as `CircuitSet.results`.
+    throughput : dict
+        Worker process id to a dictionary of the circuits sized, seconds
+        spent sizing and circuits per second.
+
+    """
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be at least 1.')
+    n = len(circuits)
+    chunks = [(start, min(start + chunk_size, n))
+              for start in range(0, n, chunk_size)]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(chunks)))
+
+    blocks = []
+    views = {}
+    try:
+        inputs = {}
+        for name in FIELDS:
+            column = circuits.columns[name]
+            labels = None
+            if column.dtype == object:
+                codes = {}
+                column = np.fromiter(
+                    (codes.setdefault(value, len(codes)) for value in column),
+                    dtype=np.intp, count=n)
+                labels = np.empty(len(codes), dtype=object)
+                labels[:] = list(codes)
+            block, views[name] = _shared_array(n, column.dtype, blocks)
+            views[name][:] = column
+            inputs[name] = (block.name, column.dtype.str, labels)
+
+        outputs = {}
+        for name, dtype in RESULTS.items():
+            block, views[name] = _shared_array(n, dtype, blocks)
+            outputs[name] = (block.name, views[name].dtype.str)
+
+        throughput = {}
+        with multiprocessing.Pool(workers, initializer=_attach,
+                                  initargs=(n, inputs, outputs)) as pool:
+            for pid, count, seconds in pool.imap_unordered(_size_chunk,
+                                                           chunks):
+                stats = throughput.setdefault(
+                    pid, {'circuits': 0, 'seconds': 0.0})
+                stats['circuits'] += count
+                stats['seconds'] += seconds
+        for stats in throughput.values():
+            stats['circuits_per_s'] = (stats['circuits'] / stats['seconds']
+                                       if stats['seconds'] else np.inf)
+
+        results = {name: views[name].copy() for name in RESULTS}
+    finally:
+        # Views of the shared memory must be released before closing it.
+        views.clear()
+        for block in blocks:
+            block.close()
+            block.unlink()
+    return results, throughput
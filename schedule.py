@@ -0,0 +1,340 @@
+import csv
+import itertools
+import json
+import os
+import numpy as np
+from circuits import CircuitSet, FIELDS, RESULTS
+from conductors import to_sizes
+
+# Result columns holding conductor size ordinals, written to CSV as sizes.
+SIZE_COLUMNS = ('cond_size_base', 'cond_size', 'egc_size_base')
+
+# Version 2 added string columns, version 1 files are still read.
+COLUMNAR_VERSION = 2
+
+
+def read_schedule(path, chunk_size=10000):
+    """
+    Read a circuit schedule CSV file in chunks.
+
+    The header row names the circuit inputs, see `circuits.FIELDS`. Columns
+    that are not circuit inputs are ignored and empty cells take the input
+    default. Only one chunk of rows is held in memory at a time.
+
+    Parameters
+    ----------
+    path : str
+        Path to the CSV file.
+    chunk_size : int, default 10000
+        Number of circuits per chunk.
+
+    Yields
+    ------
+    circuits : CircuitSet
+        The circuits of the next chunk of rows.
+
+    """
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be at least 1.')
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        fields = [(i, name.strip()) for i, name in enumerate(header)
+                  if name.strip() in FIELDS]
+        while True:
+            rows = list(itertools.islice(reader, chunk_size))
+            if not rows:
+                return
+            columns = {}
+            for i, name in fields:
+                dtype, default = FIELDS[name]
+                values = np.array([row[i].strip() if i < len(row) else ''
+                                   for row in rows], dtype=object)
+                values[values == ''] = default
+                if dtype is not object:
+                    values = values.astype(float).astype(dtype)
+                columns[name] = values
+            yield CircuitSet(n=len(rows), **columns)
+
+
+def _output_columns(circuits, columns):
+    """Input and result columns of a sized chunk to write out."""
+    results = circuits.size()
+    return {name: circuits.columns[name] if name in FIELDS else results[name]
+            for name in columns}
+
+
+class CsvWriter(object):
+    """
+    Write chunks of columns to a CSV file as they arrive.
+
+    Conductor size columns are written as size strings, and missing values,
+    NaN and sizes of -1, are written as empty cells.
+
+    Parameters
+    ----------
+    path : str
+        Path to the CSV file, overwritten if it exists.
+    columns : sequence of str
+        Column names, in order.
+
+    """
+
+    def __init__(self, path, columns):
+        self.columns = tuple(columns)
+        self.rows = 0
+        self._file = open(path, 'w', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.columns)
+
+    def write(self, chunk):
+        """Write a dictionary of equal length column arrays."""
+        cells = []
+        for name in self.columns:
+            values = np.asarray(chunk[name])
+            if name in SIZE_COLUMNS:
+                values = to_sizes(values)
+            if values.dtype.kind == 'f':
+                text = values.astype(str)
+                text[np.isnan(values)] = ''
+                values = text
+            cells.append(['' if value is None else value
+                          for value in values.tolist()])
+        self._writer.writerows(zip(*cells))
+        self.rows += len(cells[0]) if cells else 0
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ColumnarWriter(object):
+    """
+    Write chunks of columns to a directory with binary files per column.
+
+    Numeric columns are appended to raw binary files in native byte order.
+    Text columns are stored as integer codes with the labels in the header
+    while they have at most `max_labels` distinct values. Columns with more,
+    like circuit names, are stored as UTF-8 string data with an offsets file
+    and a null mask, so the writer holds no per-row strings. The header,
+    ``schedule.json``, is written when the writer is closed and records the
+    version, row count and the dtype, files and labels of each column. Use
+    `read_columnar` to load the directory.
+
+    Parameters
+    ----------
+    directory : str
+        Output directory, created if needed.
+    columns : sequence of str
+        Column names, in order.
+    max_labels : int, default 1024
+        Most distinct values of a text column stored as label codes.
+
+    """
+
+    def __init__(self, directory, columns, max_labels=1024):
+        self.directory = directory
+        self.columns = tuple(columns)
+        self.max_labels = max_labels
+        self.rows = 0
+        os.makedirs(directory, exist_ok=True)
+        self._files = {}
+        self._dtypes = {}
+        self._labels = {}
+        self._strings = {}
+
+    def _path(self, name, suffix='.bin'):
+        return os.path.join(self.directory, name + suffix)
+
+    def _open_strings(self, name):
+        """Start string storage for a text column."""
+        files = {suffix: open(self._path(name, suffix), 'wb')
+                 for suffix in ('.offsets.bin', '.data.bin', '.null.bin')}
+        files['.offsets.bin'].write(np.zeros(1, dtype=np.int64).tobytes())
+        self._strings[name] = [files, 0]
+
+    def _write_strings(self, name, values):
+        files, end = self._strings[name]
+        nulls = np.array([value is None for value in values], dtype=np.uint8)
+        data = [b'' if value is None else str(value).encode('utf-8')
+                for value in values]
+        offsets = end + np.cumsum([len(value) for value in data],
+                                  dtype=np.int64)
+        files['.offsets.bin'].write(offsets.tobytes())
+        files['.data.bin'].write(b''.join(data))
+        files['.null.bin'].write(nulls.tobytes())
+        self._strings[name][1] = int(offsets[-1]) if len(offsets) else end
+
+    def _labels_to_strings(self, name):
+        """Rewrite a label coded column as strings, chunk by chunk."""
+        self._files.pop(name).close()
+        labels = np.empty(len(self._labels[name]), dtype=object)
+        labels[:] = list(self._labels.pop(name))
+        self._open_strings(name)
+        path = self._path(name)
+        chunk = 65536
+        with open(path, 'rb') as f:
+            while True:
+                codes = np.fromfile(f, dtype=self._dtypes[name], count=chunk)
+                if not codes.size:
+                    break
+                self._write_strings(name, labels[codes])
+        os.remove(path)
+        del self._dtypes[name]
+
+    def write(self, chunk):
+        """Write a dictionary of equal length column arrays."""
+        for name in self.columns:
+            values = np.asarray(chunk[name])
+            if name in self._strings:
+                self._write_strings(name, values)
+                continue
+            if values.dtype == object:
+                codes = self._labels.setdefault(name, {})
+                values = np.fromiter(
+                    (codes.setdefault(value, len(codes)) for value in values),
+                    dtype=np.int32, count=len(values))
+            if name not in self._files:
+                self._dtypes[name] = values.dtype
+                self._files[name] = open(self._path(name), 'wb')
+            self._files[name].write(np.ascontiguousarray(
+                values, dtype=self._dtypes[name]).tobytes())
+            if len(self._labels.get(name, ())) > self.max_labels:
+                self._labels_to_strings(name)
+        self.rows += len(values) if self.columns else 0
+
+    def close(self):
+        header = {'version': COLUMNAR_VERSION, 'rows': self.rows,
+                  'columns': {}}
+        for name in self.columns:
+            if name in self._strings:
+                files, _ = self._strings[name]
+                for f in files.values():
+                    f.close()
+                header['columns'][name] = {
+                    'dtype': 'O', 'offsets': name + '.offsets.bin',
+                    'data': name + '.data.bin', 'nulls': name + '.null.bin'}
+                continue
+            f = self._files.get(name)
+            if f is None:
+                continue
+            f.close()
+            column = {'dtype': self._dtypes[name].str, 'file': name + '.bin'}
+            if name in self._labels:
+                column['labels'] = list(self._labels[name])
+            header['columns'][name] = column
+        with open(os.path.join(self.directory, 'schedule.json'), 'w') as f:
+            json.dump(header, f, indent=1)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _read_strings(directory, column, rows):
+    """Decode a string column written by `ColumnarWriter`."""
+    offsets = np.fromfile(os.path.join(directory, column['offsets']),
+                          dtype=np.int64)
+    nulls = np.fromfile(os.path.join(directory, column['nulls']),
+                        dtype=np.uint8).astype(bool)
+    with open(os.path.join(directory, column['data']), 'rb') as f:
+        data = f.read()
+    values = np.empty(rows, dtype=object)
+    values[:] = [data[start:end].decode('utf-8')
+                 for start, end in zip(offsets[:-1].tolist(),
+                                       offsets[1:].tolist())]
+    values[nulls] = None
+    return values
+
+
+def read_columnar(directory):
+    """
+    Load columns written by `ColumnarWriter`.
+
+    Numeric columns are read-only memory maps of the column files, so
+    loading does not read the data into memory. Text columns are decoded to
+    object arrays.
+
+    Returns
+    -------
+    columns : dict
+        Column arrays by name.
+
+    """
+    with open(os.path.join(directory, 'schedule.json')) as f:
+        header = json.load(f)
+    if header.get('version') not in (1, COLUMNAR_VERSION):
+        raise ValueError('Unsupported columnar schedule version '
+                         '{}.'.format(header.get('version')))
+    columns = {}
+    for name, column in header['columns'].items():
+        if 'offsets' in column:
+            columns[name] = _read_strings(directory, column, header['rows'])
+            continue
+        path = os.path.join(directory, column['file'])
+        if header['rows']:
+            values = np.memmap(path, dtype=column['dtype'], mode='r',
+                               shape=(header['rows'],))
+        else:
+            values = np.empty(0, dtype=column['dtype'])
+        if 'labels' in column:
+            labels = np.empty(len(column['labels']), dtype=object)
+            labels[:] = column['labels']
+            values = labels[values]
+        columns[name] = values
+    return columns
+
+
+def run_schedule(source, destination, output='csv', columns=None,
+                 chunk_size=10000):
+    """
+    Size every circuit of a schedule CSV file, streaming the results.
+
+    Chunks of rows are read, sized with `CircuitSet.size` (OCPD, derates,
+    base and voltage drop conductor sizes, EGC and conduit) and written out
+    before the next chunk is read, so memory use is bounded by the chunk
+    size rather than the length of the schedule.
+
+    Parameters
+    ----------
+    source : str
+        Path to the schedule CSV file, see `read_schedule`.
+    destination : str
+        Path of the output CSV file or columnar directory.
+    output : str, default 'csv'
+        Either 'csv' or 'columnar', see `CsvWriter` and `ColumnarWriter`.
+    columns : sequence of str, optional
+        Input and result columns to write. Defaults to the circuit name and
+        every result column.
+    chunk_size : int, default 10000
+        Number of circuits per chunk.
+
+    Returns
+    -------
+    rows : int
+        Number of circuits sized.
+
+    """
+    if columns is None:
+        columns = ('name',) + tuple(RESULTS)
+    unknown = set(columns) - set(FIELDS) - set(RESULTS)
+    if unknown:
+        raise KeyError('Unknown columns: '
+                       '{}'.format(', '.join(sorted(unknown))))
+    writers = {'csv': CsvWriter, 'columnar': ColumnarWriter}
+    if output not in writers:
+        raise ValueError("output must be 'csv' or 'columnar'.")
+
+    with writers[output](destination, columns) as writer:
+        for circuits in read_schedule(source, chunk_size=chunk_size):
+            writer.write(_output_columns(circuits, columns))
+    return writer.rows
@@ -0,0 +1,241 @@
+from collections.abc import Mapping
+import numpy as np
+
+
+class TableView(Mapping):
+    """
+    Read-only dictionary view of one level of a `PackedTable`.
+
+    Indexing a view with a label returns the view of the next level down, or
+    the table value at the last level. Labels with no values in the packed
+    table raise a KeyError, the same as the nested dictionary the table was
+    packed from. Child views are created once and reused, so repeated
+    indexing returns the same object.
+
+    Parameters
+    ----------
+    table : PackedTable
+        The table the view belongs to.
+    prefix : tuple of int
+        Positions along the outer axes that select this level of the table.
+
+    """
+
+    __slots__ = ('table', 'prefix', '_children')
+
+    def __init__(self, table, prefix):
+        self.table = table
+        self.prefix = prefix
+        self._children = {}
+
+    def __getitem__(self, label):
+        table = self.table
+        axis = len(self.prefix)
+        pos = table.positions[axis].get(label)
+        if pos is None:
+            raise KeyError(label)
+        index = self.prefix + (pos,)
+
+        if axis == table.ndim - 1:
+            if not table.present[index]:
+                raise KeyError(label)
+            return table.data[index].item()
+
+        child = self._children.get(pos)
+        if child is None:
+            if not table.present[index].any():
+                raise KeyError(label)
+            child = TableView(table, index)
+            self._children[pos] = child
+        return child
+
+    def _present_labels(self):
+        table = self.table
+        present = table.present[self.prefix]
+        if present.ndim > 1:
+            present = present.reshape(present.shape[0], -1).any(axis=1)
+        labels = table.labels[len(self.prefix)]
+        return [label for label, is_present in zip(labels, present)
+                if is_present]
+
+    def __iter__(self):
+        return iter(self._present_labels())
+
+    def __len__(self):
+        present = self.table.present[self.prefix]
+        if present.ndim > 1:
+            present = present.reshape(present.shape[0], -1).any(axis=1)
+        return int(np.count_nonzero(present))
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+    def values_array(self):
+        """
+        Return the values and present mask of this level as arrays.
+
+        Returns
+        -------
+        values : numpy.ndarray
+            Read-only array of the table values below this level, ordered by
+            the labels of the remaining axes.
+        present : numpy.ndarray
+            Boolean mask that is True where the table has a value.
+
+        """
+        return self.table.data[self.prefix], self.table.present[self.prefix]
+
+
+class PackedTable(TableView):
+    """
+    NEC table packed into one contiguous NumPy array.
+
+    Each level of the original nested dictionary becomes an axis of `data`.
+    The labels along each axis are fixed, so the position of a label, for
+    example the conductor size ordinal, is the same for every row of the
+    table. Entries missing from the original table are False in `present`.
+
+    The table is also a read-only dictionary view of itself, so existing code
+    indexing into the nested dictionary works unchanged.
+
+    Parameters
+    ----------
+    data : numpy.ndarray
+        Table values with one axis per level of the nested table.
+    present : numpy.ndarray
+        Boolean mask with the same shape as `data`.
+    labels : sequence of sequences
+        Labels along each axis of `data`.
+    names : sequence of str, optional
+        Names of the axes, for use with `indices`.
+
+    """
+
+    __slots__ = ('data', 'present', 'labels', 'positions', 'names')
+
+    def __init__(self, data, present, labels, names=None):
+        if data.shape != present.shape:
+            raise ValueError('data and present must have the same shape.')
+        if tuple(len(axis_labels) for axis_labels in labels) != data.shape:
+            raise ValueError('labels do not match the shape of data.')
+
+        self.data = data
+        self.present = present
+        self.data.flags.writeable = False
+        self.present.flags.writeable = False
+        self.labels = tuple(tuple(axis_labels) for axis_labels in labels)
+        self.positions = tuple({label: i for i, label in enumerate(axis)}
+                               for axis in self.labels)
+        if names is None:
+            names = tuple(range(data.ndim))
+        self.names = tuple(names)
+        super(PackedTable, self).__init__(self, ())
+
+    @property
+    def ndim(self):
+        return self.data.ndim
+
+    @classmethod
+    def from_nested(cls, table, labels=None, names=None, dtype=None):
+        """
+        Pack a nested dictionary table.
+
+        Parameters
+        ----------
+        table : dictionary
+            Nested dictionary with the same depth for every entry.
+        labels : sequence, optional
+            Labels for each level of the table. Use None for a level to take
+            its labels from the table, in the order they first appear.
+        names : sequence of str, optional
+            Names of the axes.
+        dtype : numpy dtype, optional
+            Data type of the packed values. Inferred from the values by
+            default.
+
+        Returns
+        -------
+        packed_table : PackedTable
+
+        """
+        depth = 0
+        level = table
+        while isinstance(level, Mapping):
+            depth += 1
+            level = next(iter(level.values()))
+
+        if labels is None:
+            labels = [None] * depth
+        labels = list(labels)
+
+        levels = [[table]]
+        for axis in range(depth):
+            if labels[axis] is None:
+                found = {}
+                for node in levels[axis]:
+                    for label in node:
+                        found.setdefault(label, None)
+                labels[axis] = list(found)
+            if axis < depth - 1:
+                levels.append([child for node in levels[axis]
+                               for child in node.values()])
+
+        label_positions = [{label: i for i, label in enumerate(axis)}
+                           for axis in labels]
+        leaves = []
+        index = []
+
+        def walk(node, prefix):
+            axis = len(prefix)
+            positions = label_positions[axis]
+            for label, val in node.items():
+                if label not in positions:
+                    raise KeyError('{} is not in the labels for axis '
+                                   '{}.'.format(label, axis))
+                if axis == depth - 1:
+                    index.append(prefix + (positions[label],))
+                    leaves.append(val)
+                else:
+                    walk(val, prefix + (positions[label],))
+
+        walk(table, ())
+
+        shape = tuple(len(axis_labels) for axis_labels in labels)
+        values = np.asarray(leaves, dtype=dtype)
+        data = np.zeros(shape, dtype=values.dtype)
+        present = np.zeros(shape, dtype=bool)
+        index = tuple(np.array(index).T)
+        data[index] = values
+        present[index] = True
+        return cls(data, present, labels, names=names)
+
+    def axis_number(self, axis):
+        """Return the axis number for an axis name or number."""
+        if axis in self.names:
+            return self.names.index(axis)
+        return axis
+
+    def indices(self, axis, labels):
+        """
+        Convert labels along one axis to integer positions.
+
+        Parameters
+        ----------
+        axis : int or str
+            Axis number or name.
+        labels : array_like
+            Labels to convert.
+
+        Returns
+        -------
+        positions : numpy.ndarray
+            Integer positions of the labels along the axis, -1 where a label
+            is not on the axis.
+
+        """
+        positions = self.positions[self.axis_number(axis)]
+        labels = np.asarray(labels, dtype=object)
+        unique, inverse = np.unique(labels, return_inverse=True)
+        lut = np.array([positions.get(label, -1) for label in unique],
+                       dtype=np.intp)
+        return lut[inverse].reshape(labels.shape)
@@ -0,0 +1,53 @@
+import json
+import pytest
+import bench_osd
+
+
+class TestRunBenchmarks:
+    def test_every_benchmark_runs(self):
+        """Every benchmark runs at small scales and is JSON serializable."""
+        results = bench_osd.run_benchmarks(scales=[1, 10], repeat=1)
+        assert set(results['benchmarks']) == set(bench_osd.BENCHMARKS)
+        for scales in results['benchmarks'].values():
+            assert set(scales) == {'1', '10'}
+            assert all(timing['seconds'] >= 0 for timing in scales.values())
+        assert results['environment']['numpy']
+        json.dumps(results)
+
+    def test_unknown_name(self):
+        """Unknown benchmark names raise a KeyError."""
+        with pytest.raises(KeyError):
+            bench_osd.run_benchmarks(scales=[1], names=['nope'], repeat=1)
+
+
+class TestCompare:
+    def _results(self, seconds):
+        return {'benchmarks': {'ocpd_array': {'1000': {'seconds': seconds}}}}
+
+    def test_regression(self):
+        """Slowdowns beyond the threshold are flagged."""
+        rows = bench_osd.compare(self._results(2.0), self._results(1.0),
+                                 threshold=1.5)
+        assert rows[0]['ratio'] == pytest.approx(2.0)
+        assert rows[0]['regressed']
+
+    def test_within_threshold(self):
+        """Small slowdowns and benchmarks missing in the baseline pass."""
+        results = self._results(1.1)
+        results['benchmarks']['new'] = {'1': {'seconds': 1.0}}
+        rows = bench_osd.compare(results, self._results(1.0), threshold=1.5)
+        assert len(rows) == 1
+        assert not rows[0]['regressed']
+
+    def test_main_compare(self, tmp_path):
+        """The command line writes JSON and exits 1 on regressions."""
+        path = str(tmp_path / 'bench.json')
+        assert bench_osd.main(['--scales', '1', '--names', 'ocpd_array',
+                               '--repeat', '1', '--output', path]) == 0
+        with open(path) as f:
+            baseline = json.load(f)
+        baseline['benchmarks']['ocpd_array']['1']['seconds'] = 1e-12
+        with open(path, 'w') as f:
+            json.dump(baseline, f)
+        assert bench_osd.main(['--scales', '1', '--names', 'ocpd_array',
+                               '--repeat', '1', '--compare', path]) == 1
@@ -0,0 +1,94 @@
+import operator
+import warnings
+import numpy as np
+import pytest
+import osd
+from conductors import to_sizes
+from calc_flow import CalcGraph, operation, base_wire_size
+
+
+def make_graph():
+    return CalcGraph(
+        'test',
+        operation(name='add', needs=['a', 'b'], provides=['ab'])(operator.add),
+        operation(name='double', needs=['ab'],
+                  provides=['ab2'])(lambda x: 2 * x),
+        operation(name='split', needs=['ab2'],
+                  provides=['half', 'neg'])(lambda x: (x / 2, -x)))
+
+
+class TestCalcGraph:
+    """Tests of compiling and running calculation graphs."""
+
+    def test_plan_order(self):
+        """Operations run after the operations they need."""
+        plan = make_graph().compile(['a', 'b'])
+        assert [step.name for step in plan.steps] == ['add', 'double',
+                                                      'split']
+        assert make_graph()(a=1, b=2) == {'ab': 3, 'ab2': 6, 'half': 3.0,
+                                          'neg': -6}
+
+    def test_prune(self):
+        """Only the operations needed for the outputs are compiled."""
+        graph = make_graph()
+        plan = graph.compile(['ab'], outputs=['ab2'])
+        assert [step.name for step in plan.steps] == ['double']
+        assert plan.run({'ab': 4}) == {'ab2': 8}
+        assert graph.compile(['ab'], outputs=['ab2']) is plan
+
+    def test_errors(self):
+        """Missing inputs, duplicate providers and cycles raise errors."""
+        graph = make_graph()
+        with pytest.raises(KeyError):
+            graph.compile(['a'], outputs=['ab'])
+        with pytest.raises(KeyError):
+            graph.compile(['a', 'b']).run({'a': 1})
+        with pytest.raises(ValueError):
+            CalcGraph('dup',
+                      operation('x', ['a'], ['c'])(abs),
+                      operation('y', ['b'], ['c'])(abs))
+        cycle = CalcGraph('cycle',
+                          operation('x', ['c'], ['d'])(abs),
+                          operation('y', ['d'], ['c'])(abs))
+        with pytest.raises(ValueError):
+            cycle.compile([], outputs=['d'])
+
+    def test_timings(self):
+        """Timed runs record call counts and durations per operation."""
+        plan = make_graph().compile(['a', 'b'])
+        plan.run({'a': 1, 'b': 2}, timed=True)
+        plan.run({'a': 1, 'b': 2}, timed=True)
+        assert set(plan.timings) == {'add', 'double', 'split'}
+        assert plan.timings['add'][0] == 2
+        assert plan.timings['add'][1] >= 0
+        plan.reset_timings()
+        assert plan.timings == {}
+
+
+class TestBaseWireSize:
+    """Tests of the built-in base wire size graph."""
+
+    def test_matches_get_base_wire_size(self):
+        """Batched results match sizing each circuit individually."""
+        rng = np.random.default_rng(0)
+        n = 200
+        inputs = {'current': rng.uniform(5, 400, n).round(1),
+                  'wire_material': rng.choice(['Cu', 'Al'], n),
+                  'wire_insulation_temp': rng.choice([75, 90], n),
+                  'terminal_temp_rating': np.full(n, 75),
+                  'ccc_count': rng.integers(1, 45, n),
+                  'amb_temp': rng.integers(20, 60, n),
+                  'parallel_conductors': rng.integers(1, 3, n),
+                  'ocpd_derate': np.full(n, 0.8)}
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            sizes = base_wire_size(**inputs)['min_wire_size']
+            expected = [osd.get_base_wire_size(
+                inputs['current'][i], str(inputs['wire_material'][i]),
+                int(inputs['wire_insulation_temp'][i]),
+                ccc_count=int(inputs['ccc_count'][i]),
+                ambient_temp=int(inputs['amb_temp'][i]),
+                parallel_sets=int(inputs['parallel_conductors'][i]))
+                for i in range(n)]
+        assert list(to_sizes(sizes)) == expected
+        assert (sizes >= 0).any() and (sizes < 0).any()
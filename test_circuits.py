@@ -0,0 +1,197 @@
+import copy
+import pickle
+import numpy as np
+import pytest
+import osd
+from conductors import CondSize
+from circuits import CircuitSet
+
+
+def make_circuits():
+    return CircuitSet(name=['inv01', 'str01', 'fdr01', 'cmb01'],
+                      voltage=[480, 1000, 480, 1000],
+                      current=[28.9, 12, 600, 150],
+                      length=[165, 300, 400, 900],
+                      temp_high_amb=[36, 40, 36, 43],
+                      voltage_type=['AC', 'DC', 'AC', 'DC'],
+                      cond_material=['Al', 'Cu', 'Al', 'Al'],
+                      ccc_count=[3, 2, 3, 4],
+                      parallel_sets=[1, 1, 2, 1],
+                      conduit_type=['EMT', 'PVC40', 'PVC40', 'RMC'])
+
+
+class TestCircuitSet:
+    """Tests of building and indexing a CircuitSet."""
+
+    def test_defaults(self):
+        """Scalars and defaults fill every row."""
+        circuits = CircuitSet(current=[10, 20, 30], voltage=480)
+        assert len(circuits) == 3
+        np.testing.assert_array_equal(circuits['voltage'], [480] * 3)
+        np.testing.assert_array_equal(circuits['ccc_count'], [3] * 3)
+        assert list(circuits['conduit_type']) == ['EMT'] * 3
+
+    def test_unknown_input(self):
+        """Unknown inputs raise a KeyError."""
+        with pytest.raises(KeyError):
+            CircuitSet(current=[10], amps=[10])
+
+    def test_from_records(self):
+        """Circuits can be built from one dictionary per circuit."""
+        circuits = CircuitSet.from_records([{'name': 'a', 'current': 10},
+                                            {'name': 'b', 'length': 100}])
+        assert list(circuits['name']) == ['a', 'b']
+        assert circuits['current'][0] == 10
+        assert np.isnan(circuits['current'][1])
+
+    def test_row_views(self):
+        """Row views read and write the columns."""
+        circuits = make_circuits()
+        view = circuits[1]
+        assert view.name == 'str01'
+        assert circuits[-1].name == 'cmb01'
+        view.length = 50
+        assert circuits['length'][1] == 50
+        with pytest.raises(AttributeError):
+            view.amps = 10
+        with pytest.raises(AttributeError):
+            view.__dict__
+        assert [circuit.name for circuit in circuits] == list(
+            circuits['name'])
+
+    def test_copy_and_pickle_views(self):
+        """Row views can be copied and pickled."""
+        view = make_circuits()[1]
+        for other in (copy.copy(view), copy.deepcopy(view),
+                      pickle.loads(pickle.dumps(view))):
+            assert other.name == 'str01'
+            assert other.current == 12
+
+
+class TestCircuitSetSizing:
+    """Tests of the CircuitSet sizing steps."""
+
+    def test_ocpd(self):
+        """OCPD matches get_ocpd for each circuit."""
+        circuits = make_circuits()
+        circuits.calc_ocpd()
+        for circuit in circuits:
+            assert circuit.ocpd == osd.get_ocpd(circuit.current,
+                                                circuit.voltage_type)
+
+    def test_base_size(self):
+        """Base size matches get_base_wire_size for each circuit."""
+        circuits = make_circuits()
+        results = circuits.size()
+        for i, circuit in enumerate(circuits):
+            current = circuit.current
+            if circuit.voltage_type == 'DC':
+                current *= 1.25
+            expctd = osd.get_base_wire_size(
+                current, circuit.cond_material, circuit.insulation_temp,
+                circuit.terminal_temp_rating, circuit.ccc_count,
+                circuit.temp_high_amb, circuit.parallel_sets)
+            assert results['cond_size_base'][i] == CondSize(expctd)
+            assert results['base_ampacity'][i] >= current
+
+    def test_rooftop_temp(self):
+        """Derates use the ambient temperature plus the rooftop adder."""
+        circuits = make_circuits()
+        circuits.set('height_above_roof', [0.5, 0.5, 3.5, -1])
+        circuits.set('edition', ['2017', '2014', '2014', '2014'])
+        results = circuits.size()
+        np.testing.assert_array_equal(results['design_temp'],
+                                      [36 + 33, 40 + 33, 36 + 22, 43])
+        derates, _ = osd.get_ambient_temp_derate_array(
+            results['design_temp'], 90)
+        np.testing.assert_array_equal(results['amb_temp_derate'], derates)
+
+    def test_v_drop(self):
+        """Conductors are upsized to meet the drop limit."""
+        circuits = make_circuits()
+        results = circuits.size()
+        assert (results['cond_size'] >= results['cond_size_base']).all()
+        in_range = results['v_drop_percent'] <= 2.0
+        np.testing.assert_array_equal(results['v_drop_in_range'], in_range)
+        assert results['v_drop_in_range'][[0, 1, 3]].all()
+
+    def test_egc_and_conduit(self):
+        """EGC and conduit are sized from the upsized conductors."""
+        circuits = make_circuits()
+        results = circuits.size()
+        for i, circuit in enumerate(circuits):
+            assert results['egc_size_base'][i] == osd.get_egc_size(
+                results['ocpd'][i], 'Cu', cond_size=results['cond_size'][i],
+                base_cond_size=results['cond_size_base'][i])
+            assert results['conduit_size'][i] == osd.get_conduit_size(
+                circuit.ccc_count, results['cond_size'][i],
+                egc_size=results['egc_size_base'][i], neutral=1,
+                conduit_type=circuit.conduit_type)
+
+
+class TestCircuitSetUpdate:
+    """Tests of incremental recalculation after changing inputs."""
+
+    def test_clean_after_size(self):
+        """No steps are dirty after sizing."""
+        circuits = make_circuits()
+        circuits.size()
+        assert circuits.dirty == []
+        assert circuits.update() == []
+
+    def test_length_change(self):
+        """Changing length recalculates voltage drop and what follows."""
+        circuits = make_circuits()
+        circuits.size()
+        circuits[0].length = 1000
+        assert circuits.dirty == ['calc_v_drop', 'calc_egc', 'calc_conduit']
+        assert circuits.update() == [('calc_v_drop', 1), ('calc_egc', 1),
+                                     ('calc_conduit', 1)]
+
+    def test_ambient_change(self):
+        """Changing ambient temperature recalculates derates and sizes."""
+        circuits = make_circuits()
+        circuits.size()
+        circuits.set('temp_high_amb', 50)
+        assert circuits.dirty == ['calc_derates', 'calc_base_size',
+                                  'calc_v_drop', 'calc_egc', 'calc_conduit']
+        assert 'calc_ocpd' not in [step for step, _ in circuits.update()]
+
+    def test_height_change(self):
+        """Changing the height above the roof recalculates the derates."""
+        circuits = make_circuits()
+        circuits.size()
+        circuits[2].height_above_roof = 0.5
+        assert circuits.dirty[0] == 'calc_derates'
+        assert circuits['design_temp'][2] == 36 + 33
+
+    def test_dirty_rows_accumulate(self):
+        """Rows changed by several edits are recalculated together."""
+        circuits = make_circuits()
+        circuits.size()
+        circuits[0].length = 500
+        circuits[2].current = 500
+        steps = dict(circuits.update())
+        assert steps['calc_ocpd'] == 1
+        assert steps['calc_v_drop'] == 2
+
+    def test_matches_full_rebuild(self):
+        """Incremental results match sizing a new set from scratch."""
+        circuits = make_circuits()
+        circuits.size()
+        circuits[0].length = 1000
+        circuits[1].temp_high_amb = 55
+        circuits.set('conduit_type', 'PVC80', rows=[2, 3])
+        rebuilt = CircuitSet(**circuits.columns)
+        expctd = rebuilt.size()
+        for name, column in expctd.items():
+            np.testing.assert_array_equal(circuits[name], column)
+
+    def test_results_read_updates(self):
+        """Reading a result column recalculates dirty steps first."""
+        circuits = make_circuits()
+        circuits.size()
+        before = circuits['v_drop_percent'][0]
+        circuits[0].length = circuits[0].length * 2
+        assert circuits['v_drop_percent'][0] != before
+        assert circuits.dirty == []
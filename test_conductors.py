@@ -0,0 +1,78 @@
+import pickle
+import numpy as np
+import pytest
+import nec_tables as nec
+from conductors import CondSize, to_ordinals, to_sizes
+
+
+class TestCondSize:
+    """Tests of the CondSize conductor size type."""
+
+    def test_round_trip(self):
+        """Sizes round trip to the NEC table keys."""
+        for size in nec.cond_sizes:
+            assert str(CondSize(size)) == size
+
+    def test_interned(self):
+        """There is one instance per size."""
+        assert CondSize('1/0') is CondSize('1/0')
+        assert CondSize('1/0') is CondSize(9)
+        assert pickle.loads(pickle.dumps(CondSize('250'))) is CondSize('250')
+
+    def test_order(self):
+        """Sizes are ordered by area."""
+        assert CondSize('12') < CondSize('10') < CondSize('1/0')
+        assert CondSize('4/0') < CondSize('250')
+        assert max(CondSize('2'), CondSize('3/0'), CondSize('4')) is \
+            CondSize('3/0')
+
+    def test_step(self):
+        """Adding and subtracting integers steps through the sizes."""
+        assert CondSize('4/0') + 1 is CondSize('250')
+        assert 2 + CondSize('1') is CondSize('2/0')
+        assert CondSize('250') - 1 is CondSize('4/0')
+        assert CondSize('250') - CondSize('4/0') == 1
+        with pytest.raises(ValueError):
+            CondSize('2000') + 1
+
+    def test_next_up_down(self):
+        """Next size up and down, None past the ends."""
+        assert CondSize('1').next_up() is CondSize('1/0')
+        assert CondSize('1/0').next_down() is CondSize('1')
+        assert CondSize('2000').next_up() is None
+        assert CondSize('14').next_down() is None
+
+    def test_classification(self):
+        """AWG sizes are 4/0 and smaller, kcmil sizes are 250 and larger."""
+        assert CondSize('4/0').is_awg
+        assert not CondSize('4/0').is_kcmil
+        assert CondSize('250').is_kcmil
+        assert CondSize('250').unit == 'kcmil'
+        assert CondSize('12').unit == 'AWG'
+
+    def test_circular_mils(self):
+        """Circular mil area from Chapter 9 Table 8."""
+        assert CondSize('1/0').circular_mils == 105600
+        assert CondSize('500').circular_mils == 500000
+
+    def test_invalid(self):
+        """Non standard sizes raise ValueError."""
+        with pytest.raises(ValueError):
+            CondSize('5/0')
+        with pytest.raises(ValueError):
+            CondSize(len(nec.cond_sizes))
+        with pytest.raises(ValueError):
+            CondSize(1.5)
+
+
+class TestOrdinalArrays:
+    """Tests of the array conversions between sizes and ordinals."""
+
+    def test_to_ordinals(self):
+        """Size strings convert to ordinals, -1 for unknown sizes."""
+        np.testing.assert_array_equal(to_ordinals(['12', '4/0', '5/0']),
+                                      [1, 12, -1])
+
+    def test_to_sizes(self):
+        """Ordinals convert back to size strings."""
+        assert list(to_sizes([1, 12, -1])) == ['12', '4/0', None]
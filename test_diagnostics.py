@@ -0,0 +1,133 @@
+import warnings
+import numpy as np
+import pytest
+import diagnostics
+from circuits import CircuitSet
+import nec_tables as nec
+import osd
+from test_circuits import make_circuits
+
+
+class TestCollect:
+    """Tests of collecting osd diagnostics instead of warnings."""
+
+    def test_scalar_records(self):
+        """Scalar calls record the circuit id and return None."""
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            with diagnostics.collect() as collector:
+                with diagnostics.circuits('inv01'):
+                    assert osd.get_ambient_temp_derate(95, 90) is None
+                assert osd.lookup(7000, nec.ocpd_sizes) is None
+        assert collector.records() == [
+            diagnostics.Diagnostic('inv01', 'ambient_correction', 95,
+                                   '310.15(B)(2)(a)'),
+            diagnostics.Diagnostic(None, 'table_range', 7000, None)]
+
+    def test_array_rows(self):
+        """Array calls record the invalid rows by circuit id."""
+        with diagnostics.collect(edition='2020') as collector:
+            with diagnostics.circuits(['a', 'b', 'c']):
+                ocpd = osd.get_cable_sizing_ocpd([5, 100, 7000])
+        np.testing.assert_array_equal(ocpd, [5, 90, 7000])
+        records = collector.records()
+        assert [(r.circuit, r.value) for r in records] == [('a', 5),
+                                                           ('c', 7000)]
+        assert records[0].reference == '240.6(A)'
+        assert len(collector) == 2
+
+    def test_row_positions(self):
+        """Rows are numbered when no circuit ids match the arrays."""
+        with diagnostics.collect() as collector:
+            osd.get_ocpd(np.array([10, 5000]), 'AC')
+        assert collector.records()[0].circuit == 1
+
+    def test_warns_outside(self):
+        """Warnings are raised again after the with block."""
+        with diagnostics.collect():
+            pass
+        with pytest.warns(UserWarning):
+            osd.get_cable_sizing_ocpd(7000)
+
+    def test_cached_invalid(self):
+        """Invalid base wire sizes are recorded on every call."""
+        osd.get_base_wire_size.cache_clear()
+        with pytest.warns(UserWarning):
+            osd.get_base_wire_size(5000, 'Cu', 90)
+        with diagnostics.collect() as collector:
+            for name in ('c0', 'c1', 'c2'):
+                with diagnostics.circuits(name):
+                    assert osd.get_base_wire_size(5000, 'Cu', 90) is None
+        # Both the terminal and conditions of use checks are out of range.
+        assert [r.circuit for r in collector.records()] == [
+            'c0', 'c0', 'c1', 'c1', 'c2', 'c2']
+
+    def test_invalid_ccc_count(self):
+        """Invalid conductor counts are reported by get_base_wire_size."""
+        osd.get_base_wire_size.cache_clear()
+        with pytest.warns(UserWarning):
+            assert osd.get_base_wire_size(50, 'Cu', 90, ccc_count=-1) is None
+        with diagnostics.collect() as collector:
+            with diagnostics.circuits('c0'):
+                assert osd.get_base_wire_size(50, 'Cu', 90,
+                                              ccc_count=2.5) is None
+        assert collector.records() == [
+            diagnostics.Diagnostic('c0', 'ccc_adjustment', 2.5,
+                                   '310.15(B)(3)(a)')]
+
+    def test_unknown_rule(self):
+        """Unknown rules raise a KeyError."""
+        with diagnostics.collect() as collector:
+            with pytest.raises(KeyError):
+                collector.record('nope', 1)
+        assert not diagnostics.record('table_range', 1)
+
+
+class TestCircuitSetDiagnostics:
+    """Tests of diagnostics from sizing a CircuitSet."""
+
+    def test_summary(self):
+        """Invalid rows are recorded by circuit name and edition."""
+        columns = make_circuits().columns
+        columns.update(temp_high_amb=[36, 95, 36, 43],
+                       ccc_count=[3, 2, 3, -1],
+                       edition=['2017', '2017', '2017', '2020'])
+        circuits = CircuitSet(**columns)
+        with diagnostics.collect() as collector:
+            circuits.size()
+        summary = collector.summary()
+        assert summary['ambient_correction']['circuits'] == ['str01']
+        assert summary['ambient_correction']['references'] == [
+            '310.15(B)(2)(a)']
+        assert summary['ccc_adjustment']['count'] == 1
+        assert summary['ccc_adjustment']['circuits'] == ['cmb01']
+        assert summary['ccc_adjustment']['references'] == ['310.15(C)(1)']
+
+    def test_no_size(self):
+        """Rows with no conductor size for the current are recorded."""
+        columns = make_circuits().columns
+        columns.update(current=[28.9, 12, 5000, 150],
+                       temp_high_amb=[36, 95, 36, 43])
+        circuits = CircuitSet(**columns)
+        with diagnostics.collect() as collector:
+            results = circuits.size()
+        assert results['cond_size_base'][1] == results['cond_size_base'][2]
+        summary = collector.summary()
+        assert summary['ambient_correction']['circuits'] == ['str01']
+        assert [r.value for r in collector.records()
+                if r.rule == 'table_range' and r.circuit == 'fdr01'] == [5000]
+
+    def test_no_conductor_area(self):
+        """Rows with no conduit fill areas are recorded and left NaN."""
+        columns = make_circuits().columns
+        columns.update(cond_insulation=['THHN', 'PV', 'THHN', 'USE-2'])
+        circuits = CircuitSet(**columns)
+        with diagnostics.collect() as collector:
+            results = circuits.size()
+        assert np.isnan(results['conduit_size'][[1, 3]]).all()
+        assert not np.isnan(results['conduit_size'][[0, 2]]).any()
+        summary = collector.summary()
+        assert sorted(summary['conductor_area']['circuits']) == [
+            'cmb01', 'str01']
+        assert summary['conductor_area']['references'] == [
+            'Chapter 9 Table 5']
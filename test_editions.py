@@ -0,0 +1,164 @@
+import copy
+import pickle
+import numpy as np
+import pytest
+import editions
+import nec_tables as nec
+import osd
+from circuits import CircuitSet
+from editions import get_edition, loaded_editions, clear_editions
+
+
+@pytest.fixture
+def unloaded():
+    clear_editions()
+    yield
+    clear_editions()
+
+
+@pytest.fixture
+def test_edition():
+    def load():
+        tables, references = editions._load_2017()
+        tables['ocpd_sizes'] = [40, 200]
+        tables['ccc_count_derate'] = {3: 1.00, 4: 0.50}
+        return tables, references
+    editions.register_edition('test', load)
+    yield
+    editions._loaders.pop('test')
+    clear_editions()
+    for value in vars(osd).values():
+        if hasattr(value, 'cache_clear'):
+            value.cache_clear()
+
+
+class TestEditions:
+    """Tests of the NEC edition registry."""
+
+    def test_lazy_loading(self, unloaded):
+        """Editions load on first use and are cached."""
+        assert loaded_editions() == []
+        edition = get_edition('2014')
+        assert loaded_editions() == ['2014']
+        assert get_edition('2014') is edition
+        assert get_edition(2014) is edition
+        assert get_edition(edition) is edition
+        assert get_edition().name == editions.DEFAULT_EDITION
+
+    def test_unsupported(self):
+        """Unknown editions raise ValueError."""
+        with pytest.raises(ValueError):
+            get_edition('2011')
+
+    def test_tables(self):
+        """Edition tables differ only where the code changed."""
+        assert get_edition('2014').rooftop_adder == \
+            nec.rooftop_adder['2014']
+        assert get_edition('2023').rooftop_adder == \
+            nec.rooftop_adder['2017']
+        assert get_edition('2020').cable_ampacity_310_16 is \
+            nec.cable_ampacity_310_16
+        with pytest.raises(AttributeError):
+            get_edition('2017').not_a_table
+
+    def test_references(self):
+        """Section references follow the 2020 renumbering of 310.15."""
+        assert get_edition('2017').references['ampacity_table'] == \
+            'Table 310.15(B)(16)'
+        assert get_edition('2020').references['ampacity_table'] == \
+            'Table 310.16'
+        assert get_edition('2023').references['ccc_adjustment'] == \
+            '310.15(C)(1)'
+
+    def test_copy_and_pickle(self):
+        """Editions can be copied and pickled."""
+        edition = get_edition('2014')
+        for other in (copy.copy(edition), copy.deepcopy(edition),
+                      pickle.loads(pickle.dumps(edition))):
+            assert other.name == '2014'
+            assert other.rooftop_adder == edition.rooftop_adder
+            assert other.references == edition.references
+
+    def test_register(self, unloaded):
+        """Registered loaders replace an edition's tables."""
+        def load():
+            tables, references = editions._load_2017()
+            tables['ocpd_sizes'] = [15, 20]
+            return tables, references
+        try:
+            editions.register_edition('2017-test', load)
+            assert get_edition('2017-test').ocpd_sizes == [15, 20]
+        finally:
+            editions._loaders.pop('2017-test')
+
+
+class TestEditionParameter:
+    """Tests of the edition parameter of osd functions."""
+
+    def test_mixed_editions(self, unloaded):
+        """Mixed edition batches load only the editions used."""
+        ampacity = np.array([30, 200, 400, 30])
+        edition = ['2020', '2014', '2020', '2014']
+        sizes = osd.get_ampacity_size(ampacity, 'Cu', 90, edition=edition)
+        assert sorted(loaded_editions()) == ['2014', '2020']
+        np.testing.assert_array_equal(
+            sizes, osd.get_ampacity_size(ampacity, 'Cu', 90))
+
+    def test_ambient_temp_derate(self):
+        """The scalar table derate reads the tables of the edition."""
+        def load():
+            tables, references = editions._load_2017()
+            tables['amb_temp_derate'] = {
+                band: {**derates, 90: 0.5}
+                for band, derates in nec.amb_temp_derate.items()}
+            return tables, references
+        editions.register_edition('test', load)
+        try:
+            assert osd.get_ambient_temp_derate(
+                40, 90, method='table', edition='test') == 0.5
+            assert osd.get_ambient_temp_derate(
+                40, 90, method='table') != 0.5
+        finally:
+            editions._loaders.pop('test')
+            clear_editions()
+            osd._get_amb_temp_derate_index.cache_clear()
+
+    def test_base_wire_size(self):
+        """Base wire size accepts an edition."""
+        osd.get_base_wire_size.cache_clear()
+        assert osd.get_base_wire_size(100, 'Cu', 90, edition='2023') == \
+            osd.get_base_wire_size(100, 'Cu', 90)
+
+    def test_functions_use_row_edition(self, test_edition):
+        """Array edition arguments use the tables of each row's edition."""
+        edition = ['2017', 'test', '2017', 'test']
+        np.testing.assert_array_equal(
+            osd.get_ocpd([28, 28, 80, 80], 'AC', 1, edition=edition),
+            [30, 40, 80, 200])
+        np.testing.assert_array_equal(
+            osd.get_cable_sizing_ocpd([80, 80, 75, 75], edition=edition),
+            [70, 40, 70, 40])
+        derates, invalid = osd.get_ccc_derate([4, 4, 7, 7], edition=edition)
+        np.testing.assert_array_equal(derates, [0.8, 0.5, 0.7, 0.5])
+        assert not invalid.any()
+        sizes, _, _ = osd.size_conductors([60] * 4, 'Cu', 90, ccc_count=4,
+                                          edition=edition)
+        for size, name in zip(sizes, edition):
+            assert size == osd.size_conductors(60, 'Cu', 90, ccc_count=4,
+                                               edition=name)[0]
+        assert sizes[0] != sizes[1]
+
+    def test_circuit_set(self, test_edition):
+        """CircuitSet sizes each row with the tables of its edition."""
+        circuits = CircuitSet(current=[60, 60], voltage=480, length=100,
+                              temp_high_amb=36, ccc_count=4,
+                              edition=['2017', 'test'])
+        results = circuits.size()
+        np.testing.assert_array_equal(results['ccc_derate'], [0.8, 0.5])
+        np.testing.assert_array_equal(results['ocpd'], [80, 200])
+        for i, name in enumerate(['2017', 'test']):
+            single = CircuitSet(current=[60], voltage=480, length=100,
+                                temp_high_amb=36, ccc_count=4,
+                                edition=name).size()
+            for key in ('cond_size', 'egc_size_base', 'conduit_size'):
+                assert results[key][i] == single[key][0]
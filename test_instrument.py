@@ -0,0 +1,119 @@
+import pytest
+import nec_tables as nec
+import osd
+import instrument
+
+
+@pytest.fixture(autouse=True)
+def restore():
+    yield
+    instrument.disable()
+    instrument.reset()
+
+
+class TestEnable:
+    def test_disable_restores(self):
+        """Disabling puts the original osd functions back."""
+        lookup = osd.lookup
+        instrument.enable()
+        assert osd.lookup is not lookup
+        assert instrument.is_enabled()
+        instrument.disable()
+        assert osd.lookup is lookup
+        assert not instrument.is_enabled()
+
+    def test_disabled_records_nothing(self):
+        """Calls are not recorded while disabled."""
+        osd.get_ocpd(10, 'DC')
+        assert instrument.snapshot() == {'functions': {}, 'tables': {}}
+
+    def test_cache_methods(self):
+        """Wrapped cached functions keep cache_clear and cache_info."""
+        instrument.enable(['get_base_wire_size'])
+        osd.get_base_wire_size.cache_clear()
+        assert osd.get_base_wire_size.cache_info().currsize == 0
+
+
+class TestSnapshot:
+    def test_function_calls(self):
+        """Call counts and latencies are recorded per function."""
+        instrument.enable(['get_ocpd', 'get_cable_sizing_ocpd'])
+        for _ in range(3):
+            osd.get_ocpd(10, 'DC')
+        osd.get_cable_sizing_ocpd(20)
+        stats = instrument.snapshot()['functions']
+        assert stats['get_ocpd']['calls'] == 3
+        assert stats['get_cable_sizing_ocpd']['calls'] == 1
+        assert stats['get_ocpd']['hit_rate'] is None
+        summary = stats['get_ocpd']
+        assert 0 <= summary['p50'] <= summary['p99'] <= summary['seconds']
+
+    def test_lookup_tables(self):
+        """Lookups are recorded by NEC table with index cache hits."""
+        osd.clear_lookup_cache()
+        instrument.enable(['lookup'])
+        osd.lookup(10, nec.ocpd_sizes)
+        osd.lookup(12, nec.ocpd_sizes)
+        osd.lookup(20, nec.cable_ampacity_310_16['Cu'][90], keys=False)
+        tables = instrument.snapshot()['tables']
+        assert tables['ocpd_sizes']['calls'] == 2
+        assert tables['ocpd_sizes']['hit_rate'] == 0.5
+        assert tables['cable_ampacity_310_16']['calls'] == 1
+        assert instrument.snapshot()['functions']['lookup']['calls'] == 3
+
+    def test_other_tables(self, monkeypatch):
+        """Tables that are not NEC tables are indexed once per replacement."""
+        calls = []
+        index_tables = instrument._index_tables
+        monkeypatch.setattr(instrument, '_index_tables',
+                            lambda tables: calls.append(1) or
+                            index_tables(tables))
+        instrument.enable(['lookup'])
+        table = [10, 20, 30]
+        for _ in range(3):
+            osd.lookup(15, table)
+        assert len(calls) <= 1
+        calls.clear()
+        ocpd_sizes = list(nec.ocpd_sizes)
+        monkeypatch.setattr(nec, 'ocpd_sizes', ocpd_sizes)
+        osd.lookup(15, ocpd_sizes)
+        osd.lookup(15, table)
+        assert len(calls) == 1
+        tables = instrument.snapshot()['tables']
+        assert tables['other']['calls'] == 4
+        assert tables['ocpd_sizes']['calls'] == 1
+
+    def test_cache_hits(self):
+        """Cached functions record hits and misses."""
+        osd.get_base_wire_size.cache_clear()
+        instrument.enable(['get_base_wire_size'])
+        osd.get_base_wire_size(10, 'Cu', 90)
+        osd.get_base_wire_size(10, 'Cu', 90)
+        stats = instrument.snapshot()['functions']['get_base_wire_size']
+        assert (stats['hits'], stats['misses']) == (1, 1)
+
+    def test_reset(self):
+        """Reset discards the statistics."""
+        instrument.enable(['get_ocpd'])
+        osd.get_ocpd(10, 'DC')
+        instrument.reset()
+        assert instrument.snapshot()['functions'] == {}
+
+
+class TestInstrumented:
+    def test_scoped(self):
+        """The context manager records one run and then disables."""
+        lookup = osd.lookup
+        with instrument.instrumented() as stats:
+            osd.get_ocpd(10, 'DC')
+            assert stats == {}
+        assert osd.lookup is lookup
+        assert stats['functions']['get_ocpd']['calls'] == 1
+        assert stats['tables']['ocpd_sizes']['calls'] == 1
+
+    def test_stays_enabled(self):
+        """Recording already enabled is left enabled."""
+        instrument.enable()
+        with instrument.instrumented():
+            pass
+        assert instrument.is_enabled()
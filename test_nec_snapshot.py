@@ -0,0 +1,117 @@
+import subprocess
+import sys
+import numpy as np
+import pytest
+import nec_tables as nec
+import editions
+import osd
+from nec_snapshot import (build_snapshot, load_snapshot, install_snapshot,
+                          snapshot_indexes)
+from table_store import PackedTable
+
+
+def clear_caches():
+    editions.clear_editions()
+    for value in list(vars(osd).values()):
+        if hasattr(value, 'cache_clear'):
+            value.cache_clear()
+    osd.clear_lookup_cache()
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    path = str(tmp_path / 'nec_tables.snap')
+    build_snapshot(path)
+    return path
+
+
+def assert_same(a, b):
+    if isinstance(a, np.ndarray):
+        np.testing.assert_array_equal(a, b)
+        assert a.dtype == b.dtype
+    elif isinstance(a, (tuple, list)):
+        assert type(a) is type(b) and len(a) == len(b)
+        for val_a, val_b in zip(a, b):
+            assert_same(val_a, val_b)
+    elif isinstance(a, dict):
+        assert list(a) == list(b)
+        for key in a:
+            assert_same(a[key], b[key])
+    else:
+        assert a == b and type(a) is type(b)
+
+
+class TestNecSnapshot:
+    """Tests of building and loading NEC table snapshots."""
+
+    def test_tables(self, snapshot_path):
+        """Loaded tables equal the nec_tables tables, key types included."""
+        snapshot = load_snapshot(snapshot_path)
+        assert snapshot.is_current
+        assert snapshot.tables['cable_ampacity_310_16'] == \
+            nec.cable_ampacity_310_16
+        assert isinstance(snapshot.tables['conduit_area'], PackedTable)
+        assert snapshot.tables['rooftop_adder'] == nec.rooftop_adder
+        assert list(snapshot.tables['amb_temp_derate']) == \
+            list(nec.amb_temp_derate)
+        assert snapshot.tables['cond_sizes'] == nec.cond_sizes
+        assert_same(snapshot.tables['rooftop_adder'], nec.rooftop_adder)
+        assert snapshot.tables['cond_insulation'] == nec.cond_insulation
+
+    def test_read_only(self, snapshot_path):
+        """Arrays are read-only views of the mapped file."""
+        table = load_snapshot(snapshot_path).tables['cond_reactance']
+        assert not table.data.flags.writeable
+        assert not table.data.flags.owndata
+        with pytest.raises(ValueError):
+            table.data[0, 0] = 1
+        assert table.data.ctypes.data % 64 == 0
+
+    def test_indexes(self, snapshot_path):
+        """Stored indexes equal the indexes built by osd."""
+        snapshot = load_snapshot(snapshot_path)
+        for name, args in snapshot_indexes():
+            assert_same(snapshot.indexes[(name, args)],
+                        getattr(osd, name)(*args))
+
+    def test_bad_file(self, tmp_path):
+        """Files that are not snapshots raise ValueError."""
+        path = tmp_path / 'bad.snap'
+        path.write_bytes(b'not a snapshot file')
+        with pytest.raises(ValueError):
+            load_snapshot(str(path))
+
+    def test_install(self, snapshot_path, monkeypatch):
+        """Installed snapshots give the same sizing results."""
+        snapshot = load_snapshot(snapshot_path)
+        for name in snapshot.tables:
+            monkeypatch.setattr(nec, name, getattr(nec, name))
+        for name, _ in snapshot_indexes():
+            monkeypatch.setattr(osd, name, getattr(osd, name))
+        # Drop editions and caches built from the mapped tables afterwards.
+        monkeypatch.setattr(editions, '_editions', {})
+        expected = osd.get_ampacity_size([30, 200, 400], 'Cu', 90)
+        editions.get_edition('2014')
+        install_snapshot(snapshot)
+        assert nec.cond_reactance is snapshot.tables['cond_reactance']
+        assert editions.get_edition('2014').cable_ampacity_310_16 is \
+            nec.cable_ampacity_310_16
+        np.testing.assert_array_equal(
+            osd.get_ampacity_size([30, 200, 400], 'Cu', 90), expected)
+        assert osd.lookup(200, nec.cable_ampacity_310_16['Cu'][90],
+                          keys=False) == '3/0'
+        clear_caches()
+
+    def test_install_before_import(self, snapshot_path):
+        """Installing first never executes the nec_tables module."""
+        code = '\n'.join([
+            'import sys',
+            'from nec_snapshot import install_snapshot, load_snapshot',
+            'install_snapshot(load_snapshot(sys.argv[1]))',
+            'import nec_tables, osd',
+            'assert nec_tables.__file__ == sys.argv[1]',
+            'print(osd.get_ampacity_size(200, "Cu", 90))'])
+        output = subprocess.run([sys.executable, '-c', code, snapshot_path],
+                                capture_output=True, text=True, check=True)
+        assert output.stdout.strip() == str(
+            osd.get_ampacity_size(200, 'Cu', 90))
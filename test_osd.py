@@ -1,6 +1,11 @@
+import warnings
+from collections.abc import Mapping
+import numpy as np
 import pytest
 import osd
 import nec_tables as nec
+import conductors
+from conductors import CondSize
 
 
 class TestLookup:
@@ -31,6 +36,97 @@ class TestLookup:
                           keys=False) == '12'
 
 
+def linear_lookup(lookup_value, table, keys=True):
+    """Reference first-match scan matching the original lookup."""
+    if isinstance(table, Mapping):
+        if not keys:
+            table = {val: key for key, val in table.items()}
+        if lookup_value > list(table)[-1]:
+            return None
+        for key, val in table.items():
+            if lookup_value <= key:
+                return val
+    else:
+        if lookup_value > table[-1]:
+            return None
+        for val in table:
+            if lookup_value <= val:
+                return val
+
+
+class TestGetLookupIndex:
+    """Tests of the compiled lookup index and its cache."""
+
+    def test_index_is_cached(self):
+        """Index is built once per table and orientation."""
+        table = nec.cable_ampacity_310_16['Al'][75]
+        index = osd.get_lookup_index(table)
+        assert osd.get_lookup_index(table) is index
+        assert osd.get_lookup_index(table, keys=False) is not index
+
+    def test_rebuilt_on_length_change(self):
+        """Index is rebuilt when the table length changes."""
+        table = [15, 20, 30]
+        assert osd.lookup(25, table) == 30
+        table.insert(2, 25)
+        assert osd.lookup(25, table) == 25
+
+    def test_clear_lookup_cache(self):
+        """Clearing the cache forces a new index."""
+        index = osd.get_lookup_index(nec.ocpd_sizes)
+        osd.clear_lookup_cache()
+        assert osd.get_lookup_index(nec.ocpd_sizes) is not index
+
+    def test_cache_is_bounded(self):
+        """Tables built per call do not grow the cache without bound."""
+        for i in range(osd.LOOKUP_CACHE_SIZE + 100):
+            assert osd.lookup(i + 21, [15, 20, i + 30]) == i + 30
+        assert len(osd._lookup_indexes) == osd.LOOKUP_CACHE_SIZE
+
+    def test_recently_used_kept(self):
+        """Tables in use stay cached while new tables are added."""
+        index = osd.get_lookup_index(nec.ocpd_sizes)
+        for i in range(osd.LOOKUP_CACHE_SIZE):
+            osd.lookup(10, [15, 20, 30])
+            assert osd.get_lookup_index(nec.ocpd_sizes) is index
+
+    def test_key_view(self):
+        """Dictionary key views are looked up without caching."""
+        assert osd.lookup(33, nec.amb_temp_derate.keys()) == 35
+
+    def test_unsorted_values(self):
+        """Unsorted orientations fall back to a first-match scan."""
+        index = osd.get_lookup_index(nec.ccc_count_derate, keys=False)
+        assert not index.is_sorted
+        assert osd.lookup(0.3, nec.ccc_count_derate, keys=False) == 3
+
+    @pytest.mark.parametrize("table,keys", [
+        (nec.ocpd_sizes, True),
+        (nec.ccc_count_derate, True),
+        (nec.ccc_count_derate, False),
+        (nec.egc_sizes, True),
+        (nec.amb_temp_derate, True),
+        (nec.conduit_area['EMT'], True),
+        (nec.conduit_area['EMT'], False),
+        (nec.cable_ampacity_310_16['Cu'][90], False),
+        (nec.cable_ampacity_310_17['Al'][60], False),
+        (nec.cond_resistance_dc['Cu'], False)])
+    def test_matches_linear_scan(self, table, keys):
+        """Index returns the same value as a linear scan of the table."""
+        if keys or isinstance(table, list):
+            compare = list(table)
+        else:
+            compare = list(table.values())
+        low, high = min(compare), max(compare)
+        step = (high - low) / 500
+        values = [low - 1] + [low + i * step for i in range(501)] + compare
+        for value in values:
+            if value > compare[-1]:
+                continue
+            assert (osd.lookup(value, table, keys=keys) ==
+                    linear_lookup(value, table, keys=keys))
+
+
 class TestGetAmbientTempDerate:
     """Tests of the get_ambient_temp_derate function."""
 
@@ -52,6 +148,150 @@ class TestGetAmbientTempDerate:
         with pytest.warns(UserWarning):
             osd.get_ambient_temp_derate(90, 90)
 
+    @pytest.mark.parametrize("amb_temp,wire_temp,expctd",
+                             [(33, 90, 0.96),
+                              (43.5, 75, 0.82),
+                              (10, 60, 1.29),
+                              (-5, 60, 1.29),
+                              (85, 90, 0.29)])
+    def test_table_method(self, amb_temp, wire_temp, expctd):
+        """Test derates from Table 310.15(B)(2)(a)."""
+        assert osd.get_ambient_temp_derate(amb_temp, wire_temp,
+                                           method='table') == expctd
+
+    def test_table_method_warns(self):
+        """Warn where the table has no derate for the cable rating."""
+        with pytest.warns(UserWarning):
+            assert osd.get_ambient_temp_derate(56, 60, method='table') is None
+        with pytest.warns(UserWarning):
+            assert osd.get_ambient_temp_derate(86, 90, method='table') is None
+        with pytest.raises(ValueError):
+            osd.get_ambient_temp_derate(30, 90, method='curve')
+
+
+class TestGetAmbientTempDerateArray:
+    """Tests of the get_ambient_temp_derate_array function."""
+
+    def test_matches_scalar(self):
+        """Test batch derates match the scalar function."""
+        amb_temps = np.linspace(-20, 89.5, 8760)
+        for wire_temp in (60, 75, 90):
+            derates, invalid = osd.get_ambient_temp_derate_array(amb_temps,
+                                                                 wire_temp)
+            for amb_temp, derate, bad in zip(amb_temps, derates, invalid):
+                if amb_temp >= wire_temp:
+                    assert bad
+                    assert np.isnan(derate)
+                else:
+                    assert not bad
+                    assert derate == pytest.approx(
+                        osd.get_ambient_temp_derate(amb_temp, wire_temp))
+
+    def test_per_row_ratings(self):
+        """Test arrays of insulation ratings are paired with temperatures."""
+        derates, invalid = osd.get_ambient_temp_derate_array(
+            [43.5, 43.5, 43.5, 90], [90, 75, 60, 90])
+        np.testing.assert_allclose(derates[:3], [0.88034, 0.83666, 0.74162],
+                                   rtol=1e-5)
+        np.testing.assert_array_equal(invalid, [False, False, False, True])
+
+    def test_no_warnings(self):
+        """Test invalid rows are masked without raising warnings."""
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            osd.get_ambient_temp_derate_array([95, 100], 90)
+
+    def test_table_matches_scan(self):
+        """Test table derates match a scan of the table keys."""
+        amb_temps = np.linspace(-10, 90, 1001)
+        for wire_temp in (60, 75, 90):
+            derates, invalid = osd.get_ambient_temp_derate_array(
+                amb_temps, wire_temp, method='table')
+            for amb_temp, derate, bad in zip(amb_temps, derates, invalid):
+                keys = [key for key in nec.amb_temp_derate if key >= amb_temp]
+                expected = (nec.amb_temp_derate[keys[0]][wire_temp]
+                            if keys else 0)
+                if expected == 0:
+                    assert bad and np.isnan(derate)
+                else:
+                    assert not bad and derate == expected
+
+    def test_table_unknown_rating(self):
+        """Test ratings that are not table columns are invalid."""
+        derates, invalid = osd.get_ambient_temp_derate_array(
+            [30, 30, np.nan], [90, 105, 90], method='table')
+        np.testing.assert_array_equal(derates[:1], [1.0])
+        np.testing.assert_array_equal(invalid, [False, True, True])
+        with pytest.raises(ValueError):
+            osd.get_ambient_temp_derate_array(30, 90, table_insulation_temp=40,
+                                              method='table')
+
+
+class TestGetRooftopTemp:
+    """Tests of the get_rooftop_temp function."""
+
+    @pytest.mark.parametrize("height,adder",
+                             [(-1, 0), (0, 33), (0.5, 33), (0.501, 22),
+                              (3.5, 22), (3.501, 17), (12, 17), (12.01, 14),
+                              (36, 14), (36.01, 0)])
+    def test_2014_bands(self, height, adder):
+        """Test the 2014 adders at the edges of each height band."""
+        assert osd.get_rooftop_temp(36, height, edition='2014') == 36 + adder
+
+    def test_2017_and_later(self):
+        """Test the single 7/8 inch adder of 2017 and later editions."""
+        for edition in ('2017', '2020', '2023'):
+            np.testing.assert_array_equal(
+                osd.get_rooftop_temp(36, [-1, 0.875, 0.876, np.nan],
+                                     edition=edition),
+                [36, 69, 36, 36])
+
+    def test_arrays(self):
+        """Test heights, temperatures and editions broadcast together."""
+        heights = np.linspace(-1, 40, 4101)
+        design_temps = osd.get_rooftop_temp(30, heights, edition='2014')
+        for height, design_temp in zip(heights, design_temps):
+            expected = 30
+            if height >= 0:
+                for edge, adder in sorted(nec.rooftop_adder['2014'].items()):
+                    if height <= edge:
+                        expected += adder
+                        break
+            assert design_temp == expected
+        np.testing.assert_array_equal(
+            osd.get_rooftop_temp([30, 40], 3, edition=['2014', '2017']),
+            [52, 40])
+
+
+class TestGetCccDerate:
+    """Tests of the get_ccc_derate function."""
+
+    @pytest.mark.parametrize("ccc_count,expctd",
+                             [(3, 1), (4, 0.8), (6, 0.8), (7, 0.7), (9, 0.7),
+                              (10, 0.5), (20, 0.5), (21, 0.45), (30, 0.45),
+                              (31, 0.4), (40, 0.4), (41, 0.35), (100, 0.35)])
+    def test_typical_inputs(self, ccc_count, expctd):
+        """Test the derate of each row of the table and above it."""
+        ccc_derate, invalid = osd.get_ccc_derate(ccc_count)
+        assert ccc_derate == expctd
+        assert not invalid
+
+    def test_matches_lookup(self):
+        """Test array derates match a lookup of each count."""
+        counts = np.arange(42)
+        ccc_derates, invalid = osd.get_ccc_derate(counts)
+        assert not invalid.any()
+        for count, ccc_derate in zip(counts, ccc_derates):
+            assert ccc_derate == osd.lookup(count, nec.ccc_count_derate)
+
+    def test_invalid_counts(self):
+        """Test negative and fractional counts are flagged."""
+        ccc_derates, invalid = osd.get_ccc_derate([-1, 2.5, np.nan, 4.0, 50])
+        np.testing.assert_array_equal(invalid,
+                                      [True, True, True, False, False])
+        np.testing.assert_array_equal(ccc_derates[3:], [0.8, 0.35])
+        assert np.isnan(ccc_derates[:3]).all()
+
 
 class TestGetOcpd:
     """Tests of the get_ocpd function."""
@@ -74,6 +314,40 @@ class TestGetOcpd:
         """Test that currents less than 10 are set to 10A."""
         assert osd.get_ocpd(9.999, 'DC', ocpd_derate=0.8) == 20
 
+    def test_array(self):
+        """Test array mode matches the scalar function row by row."""
+        currents = np.linspace(0, 3800, 4000)
+        for voltage_type in ('AC', 'DC'):
+            for ocpd_derate in (0.8, 1.0):
+                ocpds = osd.get_ocpd(currents, voltage_type, ocpd_derate)
+                for current, ocpd in zip(currents, ocpds):
+                    assert ocpd == osd.get_ocpd(current, voltage_type,
+                                                ocpd_derate)
+
+    def test_array_per_row_inputs(self):
+        """Test per row voltage types and derates."""
+        ocpds = osd.get_ocpd([60, 60, 60, 280, 9.999],
+                             ['DC', 'DC', 'AC', 'DC', 'DC'],
+                             [0.8, 1.0, 0.8, 0.8, 0.8])
+        np.testing.assert_array_equal(ocpds, [100, 80, 80, 450, 20])
+
+    def test_array_out_of_table(self):
+        """Test rows above the table are NaN with one summary warning."""
+        with pytest.warns(UserWarning, match='2 of 3') as record:
+            ocpds = osd.get_ocpd([6000, 60, 7000], 'AC')
+        assert len(record) == 1
+        assert np.isnan(ocpds[0])
+        assert ocpds[1] == 80
+        assert np.isnan(ocpds[2])
+
+    def test_array_missing_current(self):
+        """Test NaN currents give NaN without a warning."""
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            ocpds = osd.get_ocpd([np.nan, 60], 'AC')
+        assert np.isnan(ocpds[0])
+        assert ocpds[1] == 80
+
 
 class TestGetCableSizingOcpd:
     """Tests of the get_cable_sizing_ocpd function."""
@@ -96,61 +370,422 @@ class TestGetCableSizingOcpd:
         with pytest.warns(UserWarning):
             osd.get_cable_sizing_ocpd(6000.1)
 
-# ac_circ = osd.Circuit(name='inv01', start='INV.01', end='PV.PNLBD.01',
-#                       voltage=480, current=28.9, length=165, parallel_sets=1,
-#                       ccc_count=3, height_above_roof=3.5,
-#                       temp_high_amb=97, cond_metal='Al',
-#                       cond_insulation='THWN-2',
-#                       cond_size=None, egc_metal='Cu', egc_size_base=None,
-#                       neutral=1,
-#                       conduit_size_SF=1.3, conduit_type='EMT')
-#
-# class OsdTests(unittest.TestCase):
-#     """Tests for osd.py."""
-#     def test_rooftop_adder(self):
-#         roof_adders = [(0.5, 60), (0.501, 40), (3.5, 40), (3.501, 30),
-#                        (12, 30),
-#                        (12.01, 25), (36, 25), (36.01, 0)]
-#         for height_temp_adder_pair in roof_adders:
-#             print('########################')
-#             print(height_temp_adder_pair)
-#             ac_circ.height_above_roof = height_temp_adder_pair[0]
-#             print('height above roof: {}'.format(ac_circ.height_above_roof))
-#             temp = height_temp_adder_pair[1] + ac_circ.temp_high_amb
-#             print('check temp: {}'.format(temp))
-#             self.assertEqual(temp,
-#                              ac_circ._get_amb_temp_plus_rooftop_adder(),
-#                              'amb_temp: {}, height above roof: {},\
-#                               amb + rooftop adder: {}'.format(
-#                               ac_circ.temp_high_amb,
-#                               ac_circ.height_above_roof,
-#                               ac_circ._get_amb_temp_plus_rooftop_adder()))
-#
-#     def test_amb_temp_corr(self):
-#         ac_circ.height_above_roof = 3
-#         ac_circ.temp_high_amb = 97
-#         self.assertEqual(round(ac_circ._amb_temp_correction(),5), 0.72648)
-#
-#         ac_circ.height_above_roof = 3
-#         ac_circ.temp_high_amb = 95
-#         self.assertEqual(round(ac_circ._amb_temp_correction(),5), 0.73912)
-#
-#         ac_circ.height_above_roof = 3
-#         ac_circ.temp_high_amb = 88
-#         self.assertEqual(round(ac_circ._amb_temp_correction(),5), 0.78174)
-#
-#         ac_circ.height_above_roof = 3
-#         ac_circ.temp_high_amb = 101
-#         self.assertEqual(round(ac_circ._amb_temp_correction(),5), 0.70053)
-#
-#     def test_cond_per_raceway_derate(self):
-#         cond_derates = [(3,1),(4,0.8),(6,0.8),(7,0.7),(9,0.7),(10,0.5),
-#                         (20,0.5),(21,0.45),(30,0.45),(31,0.4),(40,0.4),
-#                         (41,0.35)]
-#         for pair in cond_derates:
-#             ac_circ.ccc_count = pair[0]
-#             self.assertEqual(pair[1], ac_circ._cond_per_raceway_derate(),
-#                              'Conductors per conduit derate test')
-#
-# if __name__ == '__main__':
-#     unittest.main()
+    def test_non_standard(self):
+        """Test non-standard sizes use the nearest smaller standard size."""
+        assert osd.get_cable_sizing_ocpd(85) == 80
+        assert osd.get_cable_sizing_ocpd(799) == 700
+        assert osd.get_cable_sizing_ocpd(950) == 950
+
+    def test_no_smaller_size(self):
+        """Test the smallest size is returned unchanged."""
+        assert osd.get_cable_sizing_ocpd(15) == 15
+        with pytest.warns(UserWarning):
+            assert osd.get_cable_sizing_ocpd(10) == 10
+
+    def test_array(self):
+        """Test array mode matches the scalar function."""
+        ocpds = np.concatenate([nec.ocpd_sizes, np.arange(15, 1200, 2.5)])
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            cable_ocpds = osd.get_cable_sizing_ocpd(ocpds)
+        for ocpd, cable_ocpd in zip(ocpds, cable_ocpds):
+            assert cable_ocpd == osd.get_cable_sizing_ocpd(ocpd)
+
+    def test_array_warning(self):
+        """Test one warning counts the sizes outside the standard sizes."""
+        with pytest.warns(UserWarning, match='2 of 3'):
+            osd.get_cable_sizing_ocpd([10, 100, 7000])
+
+    def test_custom_sizes(self):
+        """Test custom OCPD sizes are treated as available sizes."""
+        assert osd.get_cable_sizing_ocpd(90, custom_sizes=[85]) == 85
+        np.testing.assert_array_equal(
+            osd.get_cable_sizing_ocpd([85, 90, 100], custom_sizes=[85]),
+            [80, 85, 90])
+        assert osd.get_ocpd(68, 'AC', custom_sizes=[85]) == 85
+        assert osd.get_ocpd(68, 'AC') == 90
+        assert list(osd.get_ocpd_sizes([85, 85, 20])[:3]) == [15, 20, 25]
+        assert osd.get_ocpd_sizes((85,)) is osd.get_ocpd_sizes([85])
+
+    def test_integer_sizes(self):
+        """Test integer sizes are returned as ints, fractional as floats."""
+        assert type(osd.get_cable_sizing_ocpd(80)) is int
+        assert osd.get_ocpd_sizes().dtype.kind == 'i'
+        assert osd.get_ocpd_sizes([85]).dtype.kind == 'i'
+        assert osd.get_ocpd_sizes([82.5]).dtype.kind == 'f'
+        assert osd.get_cable_sizing_ocpd(85, custom_sizes=[82.5]) == 82.5
+
+
+class TestGetBaseWireSize:
+    """Tests of the get_base_wire_size function."""
+
+    def setup_method(self):
+        osd.get_base_wire_size.cache_clear()
+
+    def test_graphtik_example(self):
+        """Test the inputs from the graphtik calc flow notebook."""
+        assert osd.get_base_wire_size(60, 'Cu', 90, terminal_temp_rating=75,
+                                      ccc_count=4, ambient_temp=32) == '4'
+
+    def test_terminal_governs(self):
+        """Test the terminal check governs with no conditions of use."""
+        # 200 / 0.8 = 250A at 75C needs 250 kcmil, 200A at 90C needs 3/0
+        assert osd.get_base_wire_size(200, 'Cu', 90) == '250'
+
+    def test_cond_of_use_governs(self):
+        """Test the conditions of use check governs when heavily derated."""
+        # 100 / (0.5 * 0.91) = 219.8A at 90C needs 3/0
+        # 100 / 0.8 = 125A at 75C needs 1
+        assert osd.get_base_wire_size(100, 'Cu', 90, ccc_count=10,
+                                      ambient_temp=40) == '3/0'
+
+    def test_parallel_sets(self):
+        """Test the current is split across parallel sets."""
+        assert (osd.get_base_wire_size(400, 'Al', 90, parallel_sets=2) ==
+                osd.get_base_wire_size(200, 'Al', 90))
+
+    def test_out_of_table(self):
+        """Test None is returned for currents outside of the table."""
+        with pytest.warns(UserWarning):
+            assert osd.get_base_wire_size(2000, 'Cu', 90) is None
+
+    def test_cache_hits(self):
+        """Test repeated circuits are returned from the cache."""
+        for _ in range(10):
+            osd.get_base_wire_size(60, 'Cu', 90, 75, 4, 32)
+        cache_info = osd.get_base_wire_size.cache_info()
+        assert cache_info.misses == 1
+        assert cache_info.hits == 9
+
+
+class TestGetVoltageDrop:
+    """Tests of the get_voltage_drop function."""
+
+    def test_dc(self):
+        """Test DC drop uses the two-way length and DC resistance."""
+        # 2 * 10A * 1.24 ohm/kft * 300ft / 1000 = 7.44V
+        volts, percent = osd.get_voltage_drop(10, 300, '10', 1000,
+                                              voltage_type='DC')
+        assert volts == pytest.approx(7.44)
+        assert percent == pytest.approx(0.744)
+
+    def test_dc_aluminum(self):
+        """Test 'Al' selects the aluminum DC resistance."""
+        volts, _ = osd.get_voltage_drop(100, 500, '4/0', 1000,
+                                        voltage_type='DC', cond_material='Al')
+        assert volts == pytest.approx(2 * 100 * 0.1 * 0.5)
+
+    def test_ac_three_phase(self):
+        """Test AC drop uses the effective impedance."""
+        # Cu 1/0 in PVC: R = 0.12, X = 0.044
+        z_eff = 0.12 * 0.85 + 0.044 * np.sin(np.arccos(0.85))
+        volts, percent = osd.get_voltage_drop(150, 200, '1/0', 480,
+                                              conduit_type='PVC40',
+                                              power_factor=0.85)
+        assert volts == pytest.approx(np.sqrt(3) * 150 * z_eff * 0.2)
+        assert percent == pytest.approx(100 * volts / 480)
+
+    def test_ac_single_phase(self):
+        """Test single phase AC drop uses a factor of 2."""
+        three, _ = osd.get_voltage_drop(20, 100, '12', 240, phase_count=3)
+        single, _ = osd.get_voltage_drop(20, 100, '12', 240, phase_count=1)
+        assert single == pytest.approx(three * 2 / np.sqrt(3))
+
+    def test_parallel_sets(self):
+        """Test parallel sets divide the drop."""
+        one, _ = osd.get_voltage_drop(400, 300, '500', 480)
+        two, _ = osd.get_voltage_drop(400, 300, '500', 480, parallel_sets=2)
+        assert two == pytest.approx(one / 2)
+
+    def test_array(self):
+        """Test array inputs match the drop of each row."""
+        circuits = {'current': [10, 50, 120, 200, 400],
+                    'length': [250, 100, 400, 800, 150],
+                    'cond_size': ['10', '4', '1/0', '250', '750'],
+                    'voltage': [600, 480, 480, 1000, 480],
+                    'voltage_type': ['DC', 'AC', 'AC', 'DC', 'AC'],
+                    'cond_material': ['Cu', 'Al', 'Cu', 'Al', 'Al'],
+                    'conduit_type': ['PVC40', 'EMT', 'RMC', 'HDPE', 'IMC']}
+        volts, percent = osd.get_voltage_drop(**circuits)
+        for i in range(5):
+            row = {key: val[i] for key, val in circuits.items()}
+            row_volts, row_percent = osd.get_voltage_drop(**row)
+            assert volts[i] == pytest.approx(row_volts)
+            assert percent[i] == pytest.approx(row_percent)
+
+    def test_size_ordinals(self):
+        """Test size ordinals give the same drop as size strings."""
+        sizes = ['12', '6', '3/0', '500']
+        by_size, _ = osd.get_voltage_drop(50, 100, sizes, 480)
+        by_ordinal, _ = osd.get_voltage_drop(
+            50, 100, [CondSize(size) for size in sizes], 480)
+        np.testing.assert_array_equal(by_size, by_ordinal)
+
+    def test_not_in_table(self):
+        """Test sizes and conduit types missing from the tables are NaN."""
+        volts, _ = osd.get_voltage_drop(100, 100, ['700', '1/0', '1/0'], 480,
+                                        conduit_type=['EMT', 'EMT', 'XYZ'])
+        assert np.isnan(volts[0])
+        assert not np.isnan(volts[1])
+        assert np.isnan(volts[2])
+
+
+def brute_force_v_drop_size(current, length, voltage, limit, base_size,
+                            voltage_type, cond_material, conduit_type,
+                            parallel_sets, max_parallel_sets):
+    """Check every size and set count in turn."""
+    best = (-1, 0, np.inf)
+    for sets in range(parallel_sets, max_parallel_sets + 1):
+        for size in range(base_size, len(nec.cond_sizes)):
+            if sets > parallel_sets and size < CondSize('1/0'):
+                continue
+            _, percent = osd.get_voltage_drop(
+                current, length, size, voltage, voltage_type=voltage_type,
+                cond_material=cond_material, conduit_type=conduit_type,
+                parallel_sets=sets)
+            if percent <= limit:
+                area = sets * CondSize(size).circular_mils
+                if area < best[2]:
+                    best = (size, sets, area)
+                break
+    return best[:2]
+
+
+class TestGetVoltageDropSize:
+    """Tests of the get_voltage_drop_size function."""
+
+    def test_single_circuit(self):
+        """Test the size is increased until the drop is under the limit."""
+        size, sets, percent = osd.get_voltage_drop_size(
+            28.9, 165, 480, max_v_drop_percent=1, cond_material='Al')
+        assert str(CondSize(int(size))) == '4'
+        assert sets == 1
+        assert percent <= 1
+        _, next_down = osd.get_voltage_drop(28.9, 165, '6', 480,
+                                            cond_material='Al')
+        assert next_down > 1
+
+    def test_base_size(self):
+        """Test the ampacity size is kept when it meets the limit."""
+        size, sets, _ = osd.get_voltage_drop_size(28.9, 10, 480,
+                                                  base_size='2/0')
+        assert size == CondSize('2/0')
+
+    def test_zero_length_or_current(self):
+        """Test zero length or current keeps the base size silently."""
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            size, sets, percent = osd.get_voltage_drop_size(
+                [10, 0], [0, 100], 480, base_size='6')
+        np.testing.assert_array_equal(size, [CondSize('6')] * 2)
+        np.testing.assert_array_equal(percent, [0, 0])
+
+    def test_matches_brute_force(self):
+        """Test the binary search matches checking every size."""
+        rng = np.random.default_rng(0)
+        rows = 200
+        circuits = {'current': rng.uniform(5, 600, rows),
+                    'length': rng.uniform(20, 1500, rows),
+                    'voltage': rng.choice([480, 600, 1000, 1500], rows),
+                    'max_v_drop_percent': rng.choice([1, 2, 3], rows),
+                    'base_size': rng.integers(0, 20, rows),
+                    'voltage_type': rng.choice(['AC', 'DC'], rows),
+                    'cond_material': rng.choice(['Cu', 'Al'], rows),
+                    'conduit_type': rng.choice(['EMT', 'PVC40', 'RMC'], rows),
+                    'parallel_sets': rng.integers(1, 3, rows)}
+        sizes, sets, percent = osd.get_voltage_drop_size(
+            max_parallel_sets=4, **circuits)
+        for i in range(rows):
+            row = [val[i] for val in circuits.values()]
+            assert (sizes[i], sets[i]) == brute_force_v_drop_size(*row, 4)
+            if sizes[i] >= 0:
+                assert percent[i] <= circuits['max_v_drop_percent'][i]
+
+    def test_no_solution(self):
+        """Test circuits that cannot meet the limit are flagged."""
+        size, sets, percent = osd.get_voltage_drop_size(
+            [3000, 10], [5000, 100], 480, max_v_drop_percent=1)
+        assert size[0] == -1
+        assert sets[0] == 0
+        assert np.isnan(percent[0])
+        assert size[1] >= 0
+
+
+class TestGetConduitSize:
+    """Tests of the get_conduit_size function."""
+
+    def test_feeder(self):
+        """Test four 4/0 THHN and a #4 EGC in EMT."""
+        # (4 * 0.3237 + 0.0824) * 1.3 = 1.790 in^2 at 40% fill
+        # 2 in EMT allows 1.342 in^2, 2-1/2 in EMT allows 2.343 in^2
+        assert osd.get_conduit_size(3, '4/0', egc_size='4', neutral=1) == 2.5
+
+    def test_fill_classes(self):
+        """Test one and two conductor fill percentages."""
+        # one 500 XHHW, 0.6984 * 1.3 = 0.908 in^2 at 53% fill
+        assert osd.get_conduit_size(1, '500', conduit_type='PVC40',
+                                    cond_insulation='XHHW') == 1.5
+        # two 10 THHN, 0.0422 * 1.3 = 0.0549 in^2 at 31% fill
+        assert osd.get_conduit_size(2, '10') == 0.5
+
+    def test_safety_factor(self):
+        """Test the safety factor increases the required area."""
+        assert osd.get_conduit_size(3, '4/0', conduit_size_SF=1.0) == 2.0
+        assert osd.get_conduit_size(3, '4/0', conduit_size_SF=1.3) == 2.0
+        assert osd.get_conduit_size(3, '4/0', conduit_size_SF=1.4) == 2.5
+
+    def test_no_conductor_area(self):
+        """Test insulations with no Table 5 areas give NaN and warn."""
+        with pytest.warns(UserWarning, match='USE-2'):
+            assert np.isnan(osd.get_conduit_size(2, '10',
+                                                 cond_insulation='USE-2'))
+        with pytest.warns(UserWarning, match='PV'):
+            assert np.isnan(osd.get_conduit_size(
+                [2, 3], '10', cond_insulation='PV')).all()
+
+    def test_array(self):
+        """Test array inputs match each row."""
+        counts = [3, 2, 1, 6, 3]
+        sizes = ['4/0', '10', '500', '1', '750']
+        conduits = ['PVC40', 'EMT', 'RMC', 'PVC80', 'PVC-EB']
+        conduit_sizes = osd.get_conduit_size(counts, sizes, egc_size='6',
+                                             conduit_type=conduits)
+        for i in range(5):
+            assert conduit_sizes[i] == osd.get_conduit_size(
+                counts[i], sizes[i], egc_size='6', conduit_type=conduits[i])
+
+    def test_too_large(self):
+        """Test NaN when no trade size is large enough."""
+        assert np.isnan(osd.get_conduit_size(12, '1000', conduit_type='ENT'))
+        assert np.isnan(osd.get_conduit_size(3, '1/0', conduit_type='ABC'))
+
+
+class TestGetAmpacitySize:
+    """Tests of the get_ampacity_size function."""
+
+    def test_matches_lookup(self):
+        """Test sizes match a lookup against the ampacity values."""
+        ampacities = np.arange(0, 760, 0.5)
+        for material in ('Cu', 'Al'):
+            for temp in (60, 75, 90):
+                column = nec.cable_ampacity_310_16[material][temp]
+                sizes = osd.get_ampacity_size(ampacities, material, temp)
+                for ampacity, size in zip(ampacities, sizes):
+                    if ampacity > column['2000']:
+                        assert size == -1
+                    else:
+                        expctd = osd.lookup(ampacity, column, keys=False)
+                        assert size == CondSize(expctd)
+
+    def test_per_row_columns(self):
+        """Test per row materials and temperature columns."""
+        sizes = osd.get_ampacity_size([25, 135, 100], ['Al', 'Cu', 'Cu'],
+                                      [75, 60, 45])
+        assert list(conductors.to_sizes(sizes)) == ['10', '2/0', None]
+
+    def test_table_310_17(self):
+        """Test the free air ampacity table can be used."""
+        assert osd.get_ampacity_size(
+            300, 'Cu', 90, table='cable_ampacity_310_17') == CondSize('2/0')
+
+
+def linear_egc_size(ocpd, material):
+    """Linear scan of the EGC table as in calc_flow_v000.ipynb."""
+    for egc_size_key in nec.egc_sizes:
+        if egc_size_key >= ocpd:
+            return CondSize(nec.egc_sizes[egc_size_key][material])
+    return -1
+
+
+class TestGetEgcSize:
+    """Tests of the get_egc_size function."""
+
+    @pytest.mark.parametrize("ocpd,material,expctd",
+                             [(15, 'Cu', '14'),
+                              (20, 'Al', '10'),
+                              (50, 'Cu', '10'),
+                              (200, 'Cu', '6'),
+                              (225, 'Al', '2'),
+                              (6000, 'Al', '1200')])
+    def test_table(self, ocpd, material, expctd):
+        """Test lookups against Table 250.122."""
+        assert osd.get_egc_size(ocpd, material) == CondSize(expctd)
+
+    def test_array_matches_scan(self):
+        """Test array inputs match a linear scan of the table."""
+        ocpds = np.array(nec.ocpd_sizes + [7000])
+        for material in ('Cu', 'Al'):
+            egc_sizes = osd.get_egc_size(ocpds, material)
+            for ocpd, egc_size in zip(ocpds, egc_sizes):
+                assert egc_size == linear_egc_size(ocpd, material)
+
+    def test_limited_to_cond_size(self):
+        """Test the EGC is not larger than the circuit conductors."""
+        assert osd.get_egc_size(20, 'Cu', cond_size='14') == CondSize('14')
+        assert osd.get_egc_size(60, 'Cu', cond_size='12') == CondSize('12')
+
+    def test_proportional_upsizing(self):
+        """Test the EGC is increased with the circuit conductors."""
+        # 200A OCPD, #6 Cu EGC, 3/0 upsized to 500 kcmil
+        # 26240 * 500000 / 167800 = 78188 cmil -> #1
+        assert osd.get_egc_size(200, 'Cu', cond_size='500',
+                                base_cond_size='3/0') == CondSize('1')
+        assert osd.get_egc_size(200, 'Cu', cond_size='3/0',
+                                base_cond_size='3/0') == CondSize('6')
+
+    def test_mixed_rows(self):
+        """Test per row materials and upsizing."""
+        egc_sizes = osd.get_egc_size([200, 200, 100, 7000],
+                                     ['Cu', 'Al', 'Cu', 'Cu'],
+                                     cond_size=['500', '4/0', '2', '500'],
+                                     base_cond_size=['3/0', '4/0', '3', '500'])
+        assert list(conductors.to_sizes(egc_sizes)) == ['1', '4', '6', None]
+
+
+class TestSizeConductors:
+    """Tests of the size_conductors function."""
+
+    def test_matches_get_base_wire_size(self):
+        """Test sizes match get_base_wire_size without truncation."""
+        rng = np.random.default_rng(2)
+        n = 300
+        currents = rng.uniform(5, 500, n).round(1)
+        materials = rng.choice(['Cu', 'Al'], n)
+        insulation = rng.choice([60, 75, 90], n)
+        ccc_counts = rng.integers(1, 45, n)
+        ambient = rng.integers(10, 70, n)
+        sets = rng.integers(1, 4, n)
+        sizes, ampacity, check = osd.size_conductors(
+            currents, materials, insulation, ccc_count=ccc_counts,
+            ambient_temp=ambient, parallel_sets=sets)
+        osd.get_base_wire_size.cache_clear()
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            expected = [osd.get_base_wire_size(
+                currents[i], str(materials[i]), int(insulation[i]),
+                ccc_count=int(ccc_counts[i]), ambient_temp=int(ambient[i]),
+                parallel_sets=int(sets[i])) for i in range(n)]
+        assert list(conductors.to_sizes(sizes)) == expected
+        found = sizes >= 0
+        assert found.any() and not found.all()
+        assert (ampacity[found] >= currents[found]).all()
+        assert np.isnan(ampacity[~found]).all()
+        np.testing.assert_array_equal(check[~found], -1)
+
+    def test_governing_check(self):
+        """Test the check that sets the size is reported."""
+        sizes, ampacity, check = osd.size_conductors(
+            [60, 200], 'Cu', 90, ccc_count=[3, 9], ambient_temp=[30, 45])
+        assert list(conductors.to_sizes(sizes)) == ['4', '350']
+        assert [osd.SIZING_CHECKS[i] for i in check] == [
+            'terminal', 'conditions_of_use']
+        # 4 AWG is 85A in the 75C terminal column.
+        assert ampacity[0] == 85
+
+    def test_truncated_derate(self):
+        """Test the derate can be truncated as in calc_flow_v000."""
+        # 0.8 * 0.957427 = 0.765942 truncates to 0.7659
+        _, ampacity, _ = osd.size_conductors(100, 'Cu', 90, ccc_count=4,
+                                             ambient_temp=35,
+                                             derate_digits=4)
+        assert ampacity == pytest.approx(145 * 0.7659, abs=1e-9)
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+from circuits import RESULTS
+from runner import size_circuits
+from test_circuits import make_circuits
+
+
+class TestSizeCircuits:
+    """Tests of sizing circuits across a process pool."""
+
+    def test_matches_serial(self):
+        """Results are identical to sizing the circuit set in process."""
+        circuits = make_circuits()
+        results, throughput = size_circuits(circuits, workers=2,
+                                            chunk_size=1)
+        expected = circuits.size()
+        assert set(results) == set(RESULTS)
+        for name in RESULTS:
+            np.testing.assert_array_equal(results[name], expected[name])
+            assert results[name].dtype == expected[name].dtype
+
+    def test_throughput(self):
+        """Every circuit is counted once in the worker throughput."""
+        _, throughput = size_circuits(make_circuits(), workers=2,
+                                      chunk_size=3)
+        assert 1 <= len(throughput) <= 2
+        assert sum(stats['circuits'] for stats in throughput.values()) == 4
+        for stats in throughput.values():
+            assert stats['circuits_per_s'] > 0
+
+    def test_chunk_size(self):
+        """Chunk size must be positive."""
+        with pytest.raises(ValueError):
+            size_circuits(make_circuits(), chunk_size=0)
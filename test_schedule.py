@@ -0,0 +1,105 @@
+import csv
+import json
+import numpy as np
+import pytest
+from circuits import RESULTS
+from conductors import to_sizes
+from schedule import (ColumnarWriter, read_schedule, read_columnar,
+                      run_schedule)
+from test_circuits import make_circuits
+
+header = ['name', 'voltage', 'current', 'length', 'temp_high_amb',
+          'voltage_type', 'cond_material', 'ccc_count', 'parallel_sets',
+          'conduit_type', 'notes']
+
+
+@pytest.fixture
+def schedule_csv(tmp_path):
+    circuits = make_circuits()
+    path = str(tmp_path / 'schedule.csv')
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for i in range(len(circuits)):
+            writer.writerow([circuits[name][i] for name in header[:-1]] +
+                            ['ignored'])
+    return path
+
+
+class TestReadSchedule:
+    """Tests of reading schedule CSV files in chunks."""
+
+    def test_chunks(self, schedule_csv):
+        """Rows are read in chunks of at most chunk_size circuits."""
+        chunks = list(read_schedule(schedule_csv, chunk_size=3))
+        assert [len(chunk) for chunk in chunks] == [3, 1]
+        assert list(chunks[0]['name']) == ['inv01', 'str01', 'fdr01']
+        np.testing.assert_array_equal(chunks[0]['ccc_count'], [3, 2, 3])
+        assert chunks[1]['conduit_type'][0] == 'RMC'
+
+    def test_defaults(self, tmp_path):
+        """Empty cells take the input default."""
+        path = str(tmp_path / 'schedule.csv')
+        with open(path, 'w') as f:
+            f.write('name,current,ccc_count,cond_material\n'
+                    'a,10,,\n'
+                    'b,,6,Al\n')
+        circuits = next(read_schedule(path))
+        np.testing.assert_array_equal(circuits['ccc_count'], [3, 6])
+        assert list(circuits['cond_material']) == ['Cu', 'Al']
+        assert np.isnan(circuits['current'][1])
+
+
+class TestRunSchedule:
+    """Tests of streaming schedules through the sizing steps."""
+
+    def test_csv(self, schedule_csv, tmp_path):
+        """CSV output matches sizing the whole schedule at once."""
+        out = str(tmp_path / 'results.csv')
+        assert run_schedule(schedule_csv, out, chunk_size=3) == 4
+        expected = make_circuits().size()
+        with open(out, newline='') as f:
+            rows = list(csv.DictReader(f))
+        assert list(rows[0]) == ['name'] + list(RESULTS)
+        assert [row['name'] for row in rows] == ['inv01', 'str01', 'fdr01',
+                                                 'cmb01']
+        assert [row['cond_size'] for row in rows] == list(
+            to_sizes(expected['cond_size']))
+        np.testing.assert_allclose([float(row['ocpd']) for row in rows],
+                                   expected['ocpd'])
+
+    def test_columnar(self, schedule_csv, tmp_path):
+        """Columnar output loads back to the same results."""
+        out = str(tmp_path / 'results')
+        run_schedule(schedule_csv, out, output='columnar', chunk_size=1)
+        expected = make_circuits().size()
+        columns = read_columnar(out)
+        assert list(columns['name']) == ['inv01', 'str01', 'fdr01', 'cmb01']
+        for name in RESULTS:
+            np.testing.assert_array_equal(columns[name], expected[name])
+        assert not columns['ocpd'].flags.writeable
+
+    def test_high_cardinality_text(self, tmp_path):
+        """Text columns with many values are stored as strings."""
+        out = str(tmp_path / 'results')
+        names = np.array(['a', None, 'ccc', 'dé', 'e', ''], dtype=object)
+        kinds = np.array(['AC', 'DC'] * 3, dtype=object)
+        with ColumnarWriter(out, ['name', 'kind'], max_labels=2) as writer:
+            for rows in (slice(0, 2), slice(2, 6)):
+                writer.write({'name': names[rows], 'kind': kinds[rows]})
+        with open(str(tmp_path / 'results' / 'schedule.json')) as f:
+            header = json.load(f)
+        assert 'offsets' in header['columns']['name']
+        assert 'labels' not in header['columns']['name']
+        assert header['columns']['kind']['labels'] == ['AC', 'DC']
+        columns = read_columnar(out)
+        assert list(columns['name']) == list(names)
+        assert list(columns['kind']) == list(kinds)
+
+    def test_errors(self, schedule_csv, tmp_path):
+        """Unknown columns and outputs raise errors."""
+        out = str(tmp_path / 'results.csv')
+        with pytest.raises(KeyError):
+            run_schedule(schedule_csv, out, columns=['name', 'notes'])
+        with pytest.raises(ValueError):
+            run_schedule(schedule_csv, out, output='parquet')
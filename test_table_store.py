@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+import nec_tables as nec
+from table_store import PackedTable
+
+
+nested = {'Cu': {60: {'12': 20, '10': 30, '8': 40},
+                 90: {'12': 30, '10': 40}},
+          'Al': {60: {'10': 25, '8': 35}}}
+
+
+class TestPackedTable:
+    """Tests of packing nested tables and the dictionary views."""
+
+    def test_round_trip(self):
+        """Views compare equal to the nested dictionary."""
+        table = PackedTable.from_nested(nested)
+        assert table == nested
+        assert table['Cu'] == nested['Cu']
+        assert list(table['Cu'][90].items()) == [('12', 30), ('10', 40)]
+        assert list(table['Al'][60]) == ['10', '8']
+
+    def test_missing_keys(self):
+        """Labels without values raise KeyError."""
+        table = PackedTable.from_nested(nested)
+        with pytest.raises(KeyError):
+            table['Al'][90]
+        with pytest.raises(KeyError):
+            table['Al'][60]['12']
+        with pytest.raises(KeyError):
+            table['Ag']
+        assert 90 not in table['Al']
+        assert len(table['Al']) == 1
+
+    def test_views_are_reused(self):
+        """Repeated indexing returns the same view object."""
+        table = PackedTable.from_nested(nested)
+        assert table['Cu'][90] is table['Cu'][90]
+
+    def test_fixed_labels(self):
+        """Passed labels fix the positions along an axis."""
+        table = PackedTable.from_nested(nested,
+                                        labels=(None, None, nec.cond_sizes))
+        assert table.data.shape == (2, 2, len(nec.cond_sizes))
+        assert table.data[0, 0, nec.cond_sizes.index('8')] == 40
+
+    def test_read_only(self):
+        """Packed arrays cannot be modified."""
+        table = PackedTable.from_nested(nested)
+        with pytest.raises(ValueError):
+            table.data[0, 0, 0] = 1
+
+    def test_indices(self):
+        """Labels are converted to positions, -1 when missing."""
+        table = nec.cable_ampacity_310_16
+        np.testing.assert_array_equal(
+            table.indices('cond_size', ['12', '4/0', '2000', '0000']),
+            [1, 12, 28, -1])
+        np.testing.assert_array_equal(
+            table.indices('insulation_temp', [[90, 60], [75, 45]]),
+            [[2, 0], [1, -1]])
+
+    def test_values_array(self):
+        """Views expose the packed values and mask."""
+        values, present = nec.cond_resistance_cu['PVC'].values_array()
+        assert values[nec.cond_sizes.index('1/0')] == 0.12
+        assert not present[nec.cond_sizes.index('700')]
+
+
+class TestNecTables:
+    """Tests of the packed NEC tables."""
+
+    def test_ampacity_values(self):
+        """Packed ampacity tables keep the original values and types."""
+        assert nec.cable_ampacity_310_16['Cu'][90]['4/0'] == 260
+        assert isinstance(nec.cable_ampacity_310_16['Cu'][90]['4/0'], int)
+        assert nec.cable_ampacity_310_17['Al'][75]['2000'] == 1150
+        assert len(nec.cable_ampacity_310_16['Al'][60]) == 27
+        sizes = list(nec.cable_ampacity_310_16['Cu'][75])
+        assert sizes[:3] == ['12', '10', '8']
+
+    def test_resistance_sizes(self):
+        """Chapter 9 Table 9 sizes are kept in order without gaps."""
+        sizes = list(nec.cond_resistance_alum['Steel'])
+        assert len(sizes) == 20
+        assert sizes[-2:] == ['750', '1000']
+        assert '700' not in nec.cond_reactance['PVC']
+
+    def test_conduit_area(self):
+        """Conduit areas are keyed by trade size."""
+        assert nec.conduit_area['PVC40'][2.0] == 3.291
+        assert list(nec.conduit_area['PVC-EB'])[0] == 2.0
+        assert len(nec.conduit_area['ENT']) == 6